@@ -1,17 +1,28 @@
 #!/usr/bin/env python3
 # ============================================================
-# backtest.py — Geçmişe Dönük Test (Backtesting)
+# backtest.py — Geçmişe Dönük Test (Backtesting) (v2 - Vektörel)
 # ============================================================
 # Sistemi geçmiş verilerde test ederek gerçek başarı oranını hesaplar.
+# Her hissenin tüm geçmişi bir kez indirilir; göstergeler ve skorlar
+# tüm günler için panel motoruyla tek seferde hesaplanır, ileri
+# getiriler dizi kaydırmasıyla bulunur.
 #
 # Kullanım:
 #   python backtest.py --start 2024-01-01 --end 2025-01-01
 #   python backtest.py --days 90
+#   python backtest.py --days 365 --sweep
+#   python backtest.py --days 1095 --walk-forward
+#   python backtest.py --days 1095 --portfolio
 # ============================================================
 
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from itertools import product
+from multiprocessing import shared_memory
+import time
 import yfinance as yf
+import numpy as np
 import pandas as pd
 import sys
 import os
@@ -19,195 +30,685 @@ import os
 # Module imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 import config
-from technical_analyzer import download_stock_data, score_technical
-from scorer import calculate_final_score
+from technical_analyzer import TechnicalAnalyzer
+from indicator_engine import PanelIndicatorEngine
 
 
-def backtest_single_day(test_date: str, tickers: list) -> dict:
+# Analiz için test tarihinden önce gereken takvim günü (eski sürümle aynı)
+WARMUP_DAYS = 200
+# Bir hissenin değerlendirilmesi için gereken minimum bar sayısı
+MIN_BARS = 60
+# Alım sinyali eşiği (teknik * 0.7 + nötr haber 50 * 0.3)
+MIN_SCORE = config.MIN_BUY_SCORE
+# Teknik skorun ağırlığı (kalanı nötr haber skoru 50)
+TECH_WEIGHT = 0.7
+# Her gün seçilen hisse sayısı
+TOP_N = 3
+# Çıkış: girişten sonraki kaçıncı işlem günü
+HORIZON_BARS = 7
+
+
+def load_history(tickers: list, start: str, end: str, warmup_days: int = WARMUP_DAYS,
+                 forward_days: int = 15) -> dict:
     """
-    Tek bir gün için backtest yap.
-    O günkü sinyallere göre öneri üretir, 7 gün sonraki performansı hesaplar.
+    Backtest aralığı + ısınma + ileri pencere için tüm geçmişi toplu indir.
+
+    Returns:
+        {ticker: DataFrame(close/high/low/volume)}
     """
-    
-    print(f"\n📅 Test Tarihi: {test_date}")
-    
-    # O tarihteki analizi yap (200 gün öncesinden itibaren veri al)
-    start = datetime.strptime(test_date, "%Y-%m-%d") - timedelta(days=200)
-    end = datetime.strptime(test_date, "%Y-%m-%d")
-    
-    recommendations = []
-    
-    for ticker in tickers:
+    start_dt = datetime.strptime(start, "%Y-%m-%d") - timedelta(days=warmup_days)
+    end_dt = min(datetime.strptime(end, "%Y-%m-%d") + timedelta(days=forward_days), datetime.now())
+
+    frames = {}
+    unique = list(dict.fromkeys(tickers))
+    chunk_size = max(1, config.BULK_DOWNLOAD_CHUNK_SIZE)
+
+    for i in range(0, len(unique), chunk_size):
+        chunk = unique[i:i + chunk_size]
         try:
-            # Veriyi çek
-            df = yf.download(
-                ticker,
-                start=start.strftime("%Y-%m-%d"),
-                end=end.strftime("%Y-%m-%d"),
-                progress=False,
-                auto_adjust=True
+            raw = yf.download(
+                chunk, group_by="ticker",
+                start=start_dt.strftime("%Y-%m-%d"), end=end_dt.strftime("%Y-%m-%d"),
+                progress=False, threads=True, auto_adjust=True, timeout=30
             )
-            
-            if df.empty or len(df) < 60:
-                continue
-            
-            # Column flatten
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = df.columns.get_level_values(0)
-            
-            # Teknik analiz
-            analysis = score_technical(df)
-            
-            if analysis["score"] == 0:
-                continue
-            
-            # Skor hesapla (haber analizi olmadan, sadece teknik)
-            # Basitleştirilmiş skor: teknik * 0.7 + momentum * 0.3
-            final_score = analysis["score"] * 0.7 + 50 * 0.3
-            
-            if final_score >= 55:  # Alım sinyali threshold
-                recommendations.append({
-                    "ticker": ticker,
-                    "date": test_date,
-                    "entry_price": analysis["current_price"],
-                    "score": round(final_score, 1),
-                    "rsi": analysis["rsi"],
-                    "support": analysis["fibonacci"].get("fib_0.382", 0),
-                    "resistance": analysis["fibonacci"].get("fib_0.618", 0)
-                })
-        
         except Exception as e:
+            print(f"  ⚠️  İndirme hatası ({len(chunk)} hisse): {str(e)[:60]}")
             continue
-    
-    # En iyi 3'ü seç
-    recommendations.sort(key=lambda x: x["score"], reverse=True)
-    top_recs = recommendations[:3]
-    
-    print(f"  📊 {len(recommendations)} hisse sinyal verdi, {len(top_recs)} seçildi")
-    
-    # 7 gün sonraki performansı hesapla
-    results = []
-    
-    for rec in top_recs:
-        ticker = rec["ticker"]
-        entry = rec["entry_price"]
-        
-        # 7 gün sonraki fiyatı al
-        future_start = datetime.strptime(test_date, "%Y-%m-%d") + timedelta(days=1)
-        future_end = future_start + timedelta(days=10)  # 7 iş günü için 10 takvim günü
-        
-        try:
-            future_df = yf.download(
-                ticker,
-                start=future_start.strftime("%Y-%m-%d"),
-                end=future_end.strftime("%Y-%m-%d"),
-                progress=False,
-                auto_adjust=True
-            )
-            
-            if future_df.empty or len(future_df) < 5:
-                continue
-            
-            if isinstance(future_df.columns, pd.MultiIndex):
-                future_df.columns = future_df.columns.get_level_values(0)
-            
-            # 7. günün (veya mevcut son günün) fiyatı
-            exit_price = float(future_df["Close"].iloc[min(6, len(future_df)-1)])
-            
-            # Return hesapla
-            return_pct = ((exit_price - entry) / entry) * 100
-            
-            # Outcome
-            if return_pct >= 5:
-                outcome = "SUCCESS"
-            elif return_pct >= 0:
-                outcome = "NEUTRAL"
-            else:
-                outcome = "LOSS"
-            
-            results.append({
-                "ticker": ticker,
-                "entry": entry,
-                "exit": exit_price,
-                "return": return_pct,
-                "outcome": outcome,
-                "score": rec["score"]
-            })
-            
-            # Sonuç göster
-            emoji = "✅" if outcome == "SUCCESS" else "⚖️" if outcome == "NEUTRAL" else "❌"
-            print(f"  {emoji} {ticker:12s} → {return_pct:+6.2f}% (Skor: {rec['score']:.0f})")
-        
-        except Exception as e:
+
+        if raw is None or raw.empty:
             continue
-    
-    return results
+
+        for ticker in chunk:
+            try:
+                df = TechnicalAnalyzer._extract_ticker_frame(raw, ticker, chunk)
+                df = TechnicalAnalyzer._prepare_ohlcv(df)
+                if df is not None:
+                    frames[ticker] = df
+            except Exception:
+                continue
+
+    return frames
 
 
-def run_backtest(start_date: str, end_date: str, tickers: list = None) -> dict:
+class BacktestEngine:
     """
-    Belirli bir tarih aralığında backtest yap.
+    Vektörel Backtest Motoru.
+
+    Tüm hisseler tarih × hisse paneline dizilir; her gün için göstergeler,
+    teknik skor ve ileri getiri bir kez hesaplanır. Farklı tarih aralıkları
+    ve seçim kuralları aynı panel üzerinde yeniden hesaplama yapmadan
+    değerlendirilir.
+    """
+
+    def __init__(self, frames: dict, params: dict = None):
+        panel = PanelIndicatorEngine.build_panel(frames)
+        self._setup(panel["index"], panel["tickers"], panel["close"], panel["high"], panel["low"], params)
+
+    @classmethod
+    def from_arrays(cls, index, tickers: list, close: np.ndarray, high: np.ndarray, low: np.ndarray,
+                    params: dict = None) -> "BacktestEngine":
+        """Hazır (tarih × hisse) dizilerinden motor kur (örn. paylaşımlı bellek)"""
+        engine = cls.__new__(cls)
+        engine._setup(pd.DatetimeIndex(index), list(tickers), close, high, low, params)
+        return engine
+
+    def _setup(self, index, tickers, close, high, low, params):
+        """
+        params: {"rsi_period", "sma_short", "sma_long"} (verilmeyenler config'ten)
+        """
+        params = params or {}
+        self.index = index
+        self.tickers = tickers
+        self.close = close
+        self.high = close if high is None else high
+        self.low = close if low is None else low
+
+        series = PanelIndicatorEngine.compute(
+            close, high, low,
+            rsi_period=params.get("rsi_period"),
+            sma_short=params.get("sma_short"),
+            sma_long=params.get("sma_long"),
+        )
+        self.valid = ~np.isnan(series["rsi"])
+        self.atr = series["atr"]
+        self.sma_long = series["sma_long"]
+        # Hissenin o güne kadarki bar sayısı
+        self.bars = np.cumsum(self.valid, axis=0)
+
+        # analyze_single_stock skorlamadan önce göstergeleri yuvarlar
+        self.rsi = np.round(series["rsi"], 1)
+        self.scores = TechnicalAnalyzer.calculate_technical_scores(
+            self.rsi,
+            np.round(series["macd_histogram"], 6),
+            series["bollinger_position"],
+            np.round(series["sma_short"], 2),
+            np.round(series["sma_long"], 2),
+            np.round(series["momentum_pct"], 2),
+            self.close,
+        )
+        self.scores = np.where(self.valid, self.scores, np.nan)
+        self._forward = {}
+
+    def forward_returns(self, horizon: int = HORIZON_BARS) -> np.ndarray:
+        """Girişten horizon işlem günü sonraki getiri (%) — dizi kaydırmasıyla"""
+        if horizon not in self._forward:
+            exit_price = PanelIndicatorEngine.shift_bars(self.close, -horizon, mask=self.valid)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                self._forward[horizon] = (exit_price - self.close) / self.close * 100
+        return self._forward[horizon]
+
+    def test_rows(self, start: str, end: str) -> np.ndarray:
+        """Aralıktaki hafta içi panel satırları"""
+        dates = self.index
+        in_range = (dates >= pd.Timestamp(start)) & (dates <= pd.Timestamp(end)) & (dates.weekday < 5)
+        return np.flatnonzero(in_range)
+
+    def daily_picks(self, rows: np.ndarray, top_n: int = TOP_N, min_score: float = MIN_SCORE,
+                    tech_weight: float = TECH_WEIGHT) -> tuple:
+        """
+        Verilen panel satırları için günlük seçimler.
+
+        Returns:
+            (final skorlar, seçilen sütunlar (satır × top_n), seçim geçerli mi maskesi)
+        """
+        final = self.scores[rows] * tech_weight + 50 * (1 - tech_weight)
+        eligible = self.valid[rows] & (self.bars[rows] >= MIN_BARS) & (final >= min_score)
+        ranked = np.where(eligible, final, -np.inf)
+
+        # Her gün skora göre azalan (eşitlikte girdi sırası) ilk top_n
+        picks = np.argsort(-ranked, axis=1, kind="stable")[:, :top_n]
+        picked = np.take_along_axis(eligible, picks, axis=1)
+        return final, picks, picked
+
+    def run(self, start: str, end: str, top_n: int = TOP_N, min_score: float = MIN_SCORE,
+            horizon: int = HORIZON_BARS, tech_weight: float = TECH_WEIGHT) -> list:
+        """
+        Aralıktaki her gün için sinyal ver, en iyi top_n hisseyi seç ve
+        horizon gün sonraki sonucu hesapla.
+
+        Returns:
+            [{"ticker", "date", "entry", "exit", "return", "outcome", "score", "rsi"}, ...]
+        """
+        rows = self.test_rows(start, end)
+        if len(rows) == 0 or not self.tickers:
+            return []
+
+        final, picks, picked = self.daily_picks(rows, top_n, min_score, tech_weight)
+
+        returns = self.forward_returns(horizon)
+        results = []
+        for r, row in enumerate(rows):
+            for col, ok in zip(picks[r], picked[r]):
+                if not ok:
+                    continue
+                ret = returns[row, col]
+                if np.isnan(ret):
+                    # İleri veri yok (aralık sonu) → değerlendirilemez
+                    continue
+                entry = float(self.close[row, col])
+                results.append({
+                    "ticker": self.tickers[col],
+                    "date": self.index[row].strftime("%Y-%m-%d"),
+                    "entry": entry,
+                    "exit": entry * (1 + ret / 100),
+                    "return": float(ret),
+                    "outcome": classify_return(ret),
+                    "score": round(float(final[r, col]), 1),
+                    "rsi": float(self.rsi[row, col]),
+                })
+
+        return results
+
+
+def classify_return(return_pct: float) -> str:
+    """Getiriyi sonuç etiketine çevir"""
+    if return_pct >= 5:
+        return "SUCCESS"
+    elif return_pct >= 0:
+        return "NEUTRAL"
+    return "LOSS"
+
+
+def daily_returns(results: list, horizon: int = HORIZON_BARS) -> np.ndarray:
+    """
+    İşlemleri tarihe göre grupla: günlük portföy getirisi (%).
+
+    Her günün seçimleri horizon bar tutulur, yani aynı anda horizon kadar
+    örtüşen pozisyon grubu açıktır. Sermaye bu gruplara eşit bölünmüş kabul
+    edilir: her günün ortalama getirisi 1/horizon ağırlıkla eğriye girer
+    (örtüşen N-bar getirileri ardışık günlük getiri gibi zincirlenmez).
+    """
+    by_date = {}
+    for r in results:
+        by_date.setdefault(r["date"], []).append(r["return"])
+    return np.array([np.mean(by_date[d]) for d in sorted(by_date)]) / max(1, horizon)
+
+
+def max_drawdown(returns_pct) -> float:
+    """Getiri serisinin bileşik sermaye eğrisindeki en büyük düşüş (%)"""
+    returns_pct = np.asarray(returns_pct, dtype=float)
+    if returns_pct.size == 0:
+        return 0.0
+    equity = np.cumprod(1 + returns_pct / 100, axis=-1)
+    peak = np.maximum.accumulate(np.maximum(equity, 1.0), axis=-1)
+    return np.max(1 - equity / peak, axis=-1) * 100
+
+
+def evaluate_results(results: list, horizon: int = HORIZON_BARS) -> dict:
+    """Sonuç listesinden özet metrikler (tarama tablosu için)"""
+    if not results:
+        return {"trades": 0, "win_rate": 0.0, "avg_return": 0.0, "max_drawdown": 0.0}
+    returns = np.array([r["return"] for r in results])
+    return {
+        "trades": len(results),
+        "win_rate": float(np.mean([classify_return(r) == "SUCCESS" for r in returns]) * 100),
+        "avg_return": float(returns.mean()),
+        "max_drawdown": float(max_drawdown(daily_returns(results, horizon))),
+    }
+
+
+# ─────────────────────────────────────────────
+# Parametre taraması (süreç havuzu + paylaşımlı bellek)
+# ─────────────────────────────────────────────
+
+DEFAULT_SWEEP_GRID = {
+    "rsi_period": [14, config.RSI_PERIOD],
+    "sma_short": [config.SMA_SHORT],
+    "sma_long": [50, config.SMA_LONG],
+    "min_score": [config.MIN_BUY_SCORE, 60],
+    "tech_weight": [0.6, TECH_WEIGHT, 0.8],
+}
+
+# Bu parametreler göstergeleri değiştirir (panel yeniden hesaplanır);
+# diğerleri aynı skorlar üzerinde sadece seçim kuralını değiştirir
+INDICATOR_PARAMS = ("rsi_period", "sma_short", "sma_long")
+RULE_PARAMS = ("min_score", "tech_weight")
+
+_SWEEP_PANEL = {}
+
+
+def _rank_key(row: dict) -> tuple:
+    """Parametre setlerinin sıralama ölçütü: başarı oranı, sonra ortalama getiri"""
+    return (row["win_rate"], row["avg_return"])
+
+
+def _split_params(combo: dict) -> tuple:
+    """Kombinasyonu (gösterge parametreleri anahtarı, seçim kuralları) olarak ayır"""
+    key = tuple((k, combo[k]) for k in INDICATOR_PARAMS if k in combo)
+    rules = {k: v for k, v in combo.items() if k not in INDICATOR_PARAMS}
+    return key, rules
+
+
+def validate_grid(grid: dict):
+    """Bilinmeyen ızgara anahtarlarını reddet (yazım hatası sessizce kural sayılmasın)"""
+    unknown = [k for k in grid if k not in INDICATOR_PARAMS + RULE_PARAMS]
+    if unknown:
+        raise ValueError(f"Bilinmeyen ızgara parametresi: {', '.join(unknown)} "
+                         f"(geçerli: {', '.join(INDICATOR_PARAMS + RULE_PARAMS)})")
+
+
+def expand_grid(grid: dict) -> list:
+    """{"param": [değerler]} → tüm kombinasyonlar listesi"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in product(*(grid[k] for k in keys))]
+
+
+def _init_sweep_worker(spec: dict):
+    """İşçi süreç: fiyat panelini paylaşımlı bellekten (kopyalamadan) bağla"""
+    shm = shared_memory.SharedMemory(name=spec["name"])
+    _SWEEP_PANEL["shm"] = shm
+    _SWEEP_PANEL["arrays"] = np.ndarray(spec["shape"], dtype="float64", buffer=shm.buf)
+    _SWEEP_PANEL["index"] = pd.DatetimeIndex(spec["index"])
+    _SWEEP_PANEL["tickers"] = spec["tickers"]
+
+
+def _evaluate_indicator_group(indicator_params: dict, rule_sets: list, start: str, end: str,
+                              top_n: int, horizon: int) -> list:
+    """Tek gösterge parametre seti için paneli kur, tüm seçim kurallarını değerlendir"""
+    close, high, low = _SWEEP_PANEL["arrays"]
+    engine = BacktestEngine.from_arrays(
+        _SWEEP_PANEL["index"], _SWEEP_PANEL["tickers"], close, high, low, params=indicator_params
+    )
+
+    rows = []
+    for rules in rule_sets:
+        results = engine.run(start, end, top_n=top_n, horizon=horizon,
+                             min_score=rules.get("min_score", MIN_SCORE),
+                             tech_weight=rules.get("tech_weight", TECH_WEIGHT))
+        rows.append({"params": {**indicator_params, **rules}, **evaluate_results(results, horizon)})
+    return rows
+
+
+def run_sweep(start_date: str, end_date: str, tickers: list = None, frames: dict = None,
+              grid: dict = None, workers: int = None, top_n: int = TOP_N,
+              horizon: int = HORIZON_BARS) -> list:
+    """
+    Parametre ızgarasını CPU çekirdeklerine dağıtarak backtest et.
+
+    Fiyat paneli bir kez paylaşımlı belleğe yazılır; işçiler görev başına
+    veri kopyalamadan bağlanır. Aynı gösterge parametrelerine sahip
+    kombinasyonlar tek görevde toplanır (panel bir kez hesaplanır).
+
+    Returns:
+        Başarı oranı, sonra ortalama getiriye göre sıralı
+        [{"params", "trades", "win_rate", "avg_return", "max_drawdown"}, ...]
     """
     if tickers is None:
         tickers = config.ALL_STOCKS
-    
+    if grid is None:
+        grid = DEFAULT_SWEEP_GRID
+    validate_grid(grid)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if frames is None:
+        print(f"\n  📥 Geçmiş veriler indiriliyor (hisse başına tek sefer)...")
+        frames = load_history(tickers, start_date, end_date, forward_days=horizon * 2 + 1)
+    frames = {t: frames[t] for t in tickers if t in frames}
+    panel = PanelIndicatorEngine.build_panel(frames)
+
+    # Kombinasyonları gösterge parametrelerine göre grupla
+    groups = {}
+    for combo in expand_grid(grid):
+        key, rules = _split_params(combo)
+        groups.setdefault(key, []).append(rules)
+
+    total = sum(len(v) for v in groups.values())
+    print(f"  🧪 {total} parametre seti, {len(groups)} gösterge grubu, {min(workers, len(groups))} işçi")
+
+    stacked = np.stack([panel["close"], panel["high"], panel["low"]])
+    shm = shared_memory.SharedMemory(create=True, size=max(stacked.nbytes, 1))
+    try:
+        shared = np.ndarray(stacked.shape, dtype="float64", buffer=shm.buf)
+        shared[:] = stacked
+        spec = {
+            "name": shm.name,
+            "shape": stacked.shape,
+            "index": panel["index"].to_numpy(),
+            "tickers": panel["tickers"],
+        }
+
+        rows = []
+        if workers <= 1 or len(groups) == 1:
+            _init_sweep_worker(spec)
+            try:
+                for key, rule_sets in groups.items():
+                    rows.extend(_evaluate_indicator_group(dict(key), rule_sets, start_date, end_date, top_n, horizon))
+            finally:
+                _SWEEP_PANEL.pop("arrays", None)
+                _SWEEP_PANEL.pop("shm").close()
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(groups)),
+                                     initializer=_init_sweep_worker, initargs=(spec,)) as pool:
+                futures = [
+                    pool.submit(_evaluate_indicator_group, dict(key), rule_sets,
+                                start_date, end_date, top_n, horizon)
+                    for key, rule_sets in groups.items()
+                ]
+                for future in futures:
+                    rows.extend(future.result())
+        del shared
+    finally:
+        shm.close()
+        shm.unlink()
+
+    rows.sort(key=_rank_key, reverse=True)
+    return rows
+
+
+def print_sweep_table(rows: list, limit: int = 20):
+    """Sıralı tarama sonuçlarını tablo olarak yazdır"""
     print("\n" + "=" * 70)
-    print(f"  🔬 BACKTEST BAŞLATILIYOR")
-    print(f"  📅 Tarih Aralığı: {start_date} → {end_date}")
-    print(f"  📊 Hisse Sayısı: {len(tickers)}")
+    print("  🧪 PARAMETRE TARAMASI SONUÇLARI")
     print("=" * 70)
-    
-    # Tarih listesi oluştur (hafta içi günler)
-    start = datetime.strptime(start_date, "%Y-%m-%d")
-    end = datetime.strptime(end_date, "%Y-%m-%d")
-    
-    test_dates = []
-    current = start
-    
-    while current <= end:
-        # Sadece hafta içi (Pzt-Cuma)
-        if current.weekday() < 5:
-            test_dates.append(current.strftime("%Y-%m-%d"))
-        current += timedelta(days=1)
-    
-    print(f"\n  🗓️  Test edilecek gün sayısı: {len(test_dates)}")
-    print(f"  ⏱️  Tahmini süre: {len(test_dates) * 2} dakika")
-    print("\n" + "-" * 70)
-    
-    all_results = []
-    
-    for i, test_date in enumerate(test_dates, 1):
-        print(f"\n[{i}/{len(test_dates)}]", end=" ")
-        
-        results = backtest_single_day(test_date, tickers)
-        all_results.extend(results)
-    
-    # Sonuçları analiz et
+
+    if not rows:
+        print("\n  ⚠️  Hiç sonuç bulunamadı!")
+        return
+
+    keys = list(rows[0]["params"])
+    header = " ".join(f"{k:>11}" for k in keys)
+    print(f"\n  {'#':>3} {header} {'İşlem':>7} {'Başarı %':>9} {'Ort. %':>8} {'MaxDD %':>8}")
+    print("  " + "-" * (40 + 12 * len(keys)))
+    for i, row in enumerate(rows[:limit], 1):
+        values = " ".join(f"{row['params'][k]:>11}" for k in keys)
+        print(f"  {i:>3} {values} {row['trades']:>7} {row['win_rate']:>8.1f}% "
+              f"{row['avg_return']:>+7.2f}% {row['max_drawdown']:>7.2f}%")
+
+
+def parse_grid(items: list) -> dict:
+    """["rsi_period=14,21", "tech_weight=0.6,0.7"] → ızgara dict'i"""
+    grid = {}
+    for item in items:
+        key, _, values = item.partition("=")
+        if not values:
+            raise ValueError(f"Geçersiz ızgara öğesi: {item} (örn. rsi_period=14,21)")
+        grid[key.strip()] = [float(v) if "." in v else int(v) for v in values.split(",")]
+    validate_grid(grid)
+    return grid
+
+
+# ─────────────────────────────────────────────
+# Walk-forward optimizasyonu
+# ─────────────────────────────────────────────
+
+# Eğitim / test penceresi uzunlukları (işlem günü)
+WF_TRAIN_BARS = 252
+WF_TEST_BARS = 63
+# Eğitimde bu kadar işlem yoksa varsayılan parametreler kullanılır
+WF_MIN_TRADES = 10
+
+# Varsayılan olarak sadece skor eşikleri yeniden optimize edilir
+DEFAULT_WALK_FORWARD_GRID = {
+    "min_score": [50, config.MIN_BUY_SCORE, 60, 65],
+    "tech_weight": [0.6, TECH_WEIGHT, 0.8],
+}
+
+
+def walk_forward_folds(index: pd.DatetimeIndex, start: str, end: str, train_bars: int = WF_TRAIN_BARS,
+                       test_bars: int = WF_TEST_BARS, horizon: int = HORIZON_BARS) -> list:
+    """
+    Kayan eğitim/test pencereleri.
+
+    Eğitim penceresi [start'tan itibaren] train_bars gün, ardından test_bars
+    günlük test penceresi gelir; pencereler test_bars adımla kayar. Eğitimin
+    son horizon günü atılır: bu günlerin çıkışı test penceresine taşar
+    (ileriye bakma sızıntısı).
+
+    Returns:
+        [{"train": (başlangıç, bitiş), "test": (başlangıç, bitiş)}, ...] (YYYY-MM-DD)
+    """
+    rows = np.flatnonzero((index >= pd.Timestamp(start)) & (index <= pd.Timestamp(end)))
+    fmt = lambda r: index[r].strftime("%Y-%m-%d")
+
+    folds = []
+    pos = 0
+    while pos + train_bars < len(rows):
+        train = rows[pos:pos + train_bars]
+        test = rows[pos + train_bars:pos + train_bars + test_bars]
+        purged = train[:max(1, len(train) - horizon)]
+        folds.append({"train": (fmt(purged[0]), fmt(purged[-1])), "test": (fmt(test[0]), fmt(test[-1]))})
+        pos += test_bars
+    return folds
+
+
+def run_walk_forward(start_date: str, end_date: str, tickers: list = None, frames: dict = None,
+                     grid: dict = None, train_bars: int = WF_TRAIN_BARS, test_bars: int = WF_TEST_BARS,
+                     top_n: int = TOP_N, horizon: int = HORIZON_BARS) -> dict:
+    """
+    Walk-forward backtest: her eğitim penceresinde en iyi parametreleri seç,
+    sadece ardından gelen test penceresinde (örneklem dışı) değerlendir.
+
+    Göstergeler ve ileri getiriler her gösterge parametre seti için tüm
+    geçmişte bir kez hesaplanır (her gün sadece geçmiş barlara bağlıdır);
+    örtüşen pencereler aynı panelin satır dilimlerini kullanır.
+
+    Returns:
+        {"folds": [...], "results": örneklem dışı işlemler, "summary": evaluate_results}
+    """
+    if tickers is None:
+        tickers = config.ALL_STOCKS
+    if grid is None:
+        grid = DEFAULT_WALK_FORWARD_GRID
+    validate_grid(grid)
+
+    if frames is None:
+        print(f"\n  📥 Geçmiş veriler indiriliyor (hisse başına tek sefer)...")
+        frames = load_history(tickers, start_date, end_date, forward_days=horizon * 2 + 1)
+    frames = {t: frames[t] for t in tickers if t in frames}
+    panel = PanelIndicatorEngine.build_panel(frames)
+
+    engines = {}
+
+    def engine_for(key: tuple) -> BacktestEngine:
+        if key not in engines:
+            engines[key] = BacktestEngine.from_arrays(
+                panel["index"], panel["tickers"], panel["close"], panel["high"], panel["low"], params=dict(key)
+            )
+        return engines[key]
+
+    combos = [_split_params(combo) for combo in expand_grid(grid)]
+    folds = walk_forward_folds(panel["index"], start_date, end_date, train_bars, test_bars, horizon)
+    print(f"  🔁 {len(folds)} pencere, pencere başına {len(combos)} parametre seti")
+
+    oos_results = []
+    for fold in folds:
+        candidates = []
+        for key, rules in combos:
+            results = engine_for(key).run(*fold["train"], top_n=top_n, horizon=horizon,
+                                          min_score=rules.get("min_score", MIN_SCORE),
+                                          tech_weight=rules.get("tech_weight", TECH_WEIGHT))
+            metrics = evaluate_results(results, horizon)
+            if metrics["trades"] >= WF_MIN_TRADES:
+                candidates.append((key, rules, metrics))
+
+        if candidates:
+            key, rules, train_metrics = max(candidates, key=lambda c: _rank_key(c[2]))
+        else:
+            key, rules, train_metrics = (), {}, evaluate_results([])
+
+        results = engine_for(key).run(*fold["test"], top_n=top_n, horizon=horizon,
+                                      min_score=rules.get("min_score", MIN_SCORE),
+                                      tech_weight=rules.get("tech_weight", TECH_WEIGHT))
+        fold.update({
+            "params": {**dict(key), **rules},
+            "train_metrics": train_metrics,
+            "test_metrics": evaluate_results(results, horizon),
+        })
+        oos_results.extend(results)
+
+    return {"folds": folds, "results": oos_results, "summary": evaluate_results(oos_results, horizon)}
+
+
+def print_walk_forward(report: dict):
+    """Pencere bazında seçilen parametreleri ve örneklem dışı sonuçları yazdır"""
+    print("\n" + "=" * 70)
+    print("  🔁 WALK-FORWARD SONUÇLARI (sadece örneklem dışı)")
+    print("=" * 70)
+
+    if not report["folds"]:
+        print("\n  ⚠️  Pencere oluşturmak için yeterli veri yok!")
+        return
+
+    for i, fold in enumerate(report["folds"], 1):
+        params = ", ".join(f"{k}={v}" for k, v in fold["params"].items()) or "varsayılan"
+        test = fold["test_metrics"]
+        print(f"\n  #{i} Test {fold['test'][0]} → {fold['test'][1]}  ({params})")
+        print(f"     Eğitim başarı: {fold['train_metrics']['win_rate']:.1f}%  |  "
+              f"Test: {test['trades']} işlem, {test['win_rate']:.1f}% başarı, "
+              f"{test['avg_return']:+.2f}% ort., {test['max_drawdown']:.2f}% maks. düşüş")
+
+    summary = report["summary"]
+    print(f"\n  📈 TOPLAM ÖRNEKLEM DIŞI: {summary['trades']} işlem, {summary['win_rate']:.1f}% başarı, "
+          f"{summary['avg_return']:+.2f}% ort., {summary['max_drawdown']:.2f}% maks. düşüş")
+
+
+# ─────────────────────────────────────────────
+# Bootstrap güven aralıkları
+# ─────────────────────────────────────────────
+
+BOOTSTRAP_SAMPLES = 10000
+# Günlük getirilerde blok uzunluğu (ardışık günlerin bağımlılığını korur)
+BOOTSTRAP_BLOCK = 5
+BOOTSTRAP_CONFIDENCE = 0.95
+BOOTSTRAP_SEED = 42
+# Bir seferde üretilen indeks matrisi boyutu (bellek sınırı)
+_BOOTSTRAP_CHUNK_CELLS = 2_000_000
+
+
+def bootstrap_indices(n: int, samples: int, block: int = 1, rng: np.random.Generator = None) -> np.ndarray:
+    """
+    Yeniden örnekleme indeks matrisi (samples × n).
+
+    block > 1 ise dairesel hareketli blok bootstrap: rastgele başlangıçlardan
+    block uzunluğunda ardışık indeksler uç uca eklenir.
+    """
+    rng = rng or np.random.default_rng(BOOTSTRAP_SEED)
+    if block <= 1:
+        return rng.integers(0, n, size=(samples, n))
+    blocks = -(-n // block)
+    starts = rng.integers(0, n, size=(samples, blocks, 1))
+    return ((starts + np.arange(block)) % n).reshape(samples, blocks * block)[:, :n]
+
+
+def _bootstrap_statistic(values: np.ndarray, statistic, samples: int, block: int,
+                         rng: np.random.Generator) -> np.ndarray:
+    """statistic(values[indeks matrisi]) → örnek başına değer (parça parça)"""
+    chunk = max(1, _BOOTSTRAP_CHUNK_CELLS // max(len(values), 1))
+    out = []
+    for done in range(0, samples, chunk):
+        idx = bootstrap_indices(len(values), min(chunk, samples - done), block, rng)
+        out.append(statistic(values[idx]))
+    return np.concatenate(out)
+
+
+def bootstrap_confidence(results: list, samples: int = BOOTSTRAP_SAMPLES, block: int = BOOTSTRAP_BLOCK,
+                         confidence: float = BOOTSTRAP_CONFIDENCE, seed: int = BOOTSTRAP_SEED,
+                         horizon: int = HORIZON_BARS) -> dict:
+    """
+    İşlem listesinden başarı oranı, ortalama getiri ve maksimum düşüş için
+    yüzdelik bootstrap güven aralıkları.
+
+    Başarı oranı ve ortalama getiri işlemler (tarih sıralı) üzerinden,
+    maksimum düşüş günlük portföy getirileri (daily_returns, 1/horizon
+    ağırlıklı) üzerinden blok bootstrap ile örneklenir.
+
+    Returns:
+        {"win_rate" | "avg_return" | "max_drawdown": {"value", "low", "high"},
+         "samples", "confidence"} — sonuç yoksa {}
+    """
+    if not results:
+        return {}
+
+    rng = np.random.default_rng(seed)
+    ordered = sorted(results, key=lambda r: r["date"])
+    returns = np.array([r["return"] for r in ordered])
+    daily = daily_returns(ordered, horizon)
+    trade_block = min(block, len(returns))
+    day_block = min(block, len(daily))
+
+    distributions = {
+        "win_rate": (
+            (returns >= 5).mean() * 100,
+            _bootstrap_statistic((returns >= 5).astype(float), lambda m: m.mean(axis=1) * 100,
+                                 samples, trade_block, rng),
+        ),
+        "avg_return": (
+            returns.mean(),
+            _bootstrap_statistic(returns, lambda m: m.mean(axis=1), samples, trade_block, rng),
+        ),
+        "max_drawdown": (
+            max_drawdown(daily),
+            _bootstrap_statistic(daily, max_drawdown, samples, day_block, rng),
+        ),
+    }
+
+    tail = (1 - confidence) / 2 * 100
+    report = {"samples": samples, "confidence": confidence}
+    for key, (value, dist) in distributions.items():
+        low, high = np.percentile(dist, [tail, 100 - tail])
+        report[key] = {"value": float(value), "low": float(low), "high": float(high)}
+    return report
+
+
+def print_confidence_intervals(report: dict):
+    """Bootstrap güven aralıklarını yazdır"""
+    if not report:
+        return
+    print(f"\n  🎲 BOOTSTRAP GÜVEN ARALIKLARI (%{report['confidence'] * 100:.0f}, {report['samples']} örnek):")
+    labels = [("win_rate", "Başarı Oranı"), ("avg_return", "Ortalama Getiri"), ("max_drawdown", "Maksimum Düşüş")]
+    for key, label in labels:
+        ci = report[key]
+        print(f"     {label:<17}: {ci['value']:>7.2f}%  [{ci['low']:.2f}% — {ci['high']:.2f}%]")
+
+
+def summarize_results(all_results: list) -> dict:
+    """Backtest sonuçlarını yazdır ve özet istatistikleri döndür"""
     print("\n\n" + "=" * 70)
     print("  📊 BACKTEST SONUÇLARI")
     print("=" * 70)
-    
+
     if not all_results:
         print("\n  ⚠️  Hiç sonuç bulunamadı!")
         return {}
-    
+
     total = len(all_results)
     success = len([r for r in all_results if r["outcome"] == "SUCCESS"])
     neutral = len([r for r in all_results if r["outcome"] == "NEUTRAL"])
     loss = len([r for r in all_results if r["outcome"] == "LOSS"])
-    
+
     win_rate = (success / total * 100) if total > 0 else 0
-    
+
     avg_return = sum([r["return"] for r in all_results]) / total if total > 0 else 0
     avg_success_return = sum([r["return"] for r in all_results if r["outcome"] == "SUCCESS"]) / success if success > 0 else 0
     avg_loss_return = sum([r["return"] for r in all_results if r["outcome"] == "LOSS"]) / loss if loss > 0 else 0
-    
+
     print(f"\n  📈 GENEL İSTATİSTİKLER:")
     print(f"     Toplam İşlem       : {total}")
     print(f"     Başarılı (>=%5)    : {success} ({success/total*100:.1f}%)")
     print(f"     Nötr (0-5%)        : {neutral} ({neutral/total*100:.1f}%)")
     print(f"     Zarar (<0%)        : {loss} ({loss/total*100:.1f}%)")
-    
+
     # Win rate değerlendirmesi
     if win_rate >= 60:
         wr_label = "🔥 MÜKEMMEL"
@@ -217,62 +718,62 @@ def run_backtest(start_date: str, end_date: str, tickers: list = None) -> dict:
         wr_label = "⚠️ ORTA"
     else:
         wr_label = "❌ DÜŞÜK"
-    
+
     print(f"\n  🎯 BAŞARI ORANI: {win_rate:.2f}% {wr_label}")
-    
+
     print(f"\n  💰 GETİRİ ANALİZİ:")
     print(f"     Ortalama Getiri    : {avg_return:+.2f}%")
     print(f"     Başarılı Ort.      : {avg_success_return:+.2f}%")
     print(f"     Zararlı Ort.       : {avg_loss_return:+.2f}%")
-    
+
     # Risk/Reward
     if abs(avg_loss_return) > 0:
         rr_ratio = abs(avg_success_return / avg_loss_return)
         print(f"     Risk/Reward Ratio  : {rr_ratio:.2f}")
-    
+
     # En iyi ve en kötü performanslar
     best = max(all_results, key=lambda x: x["return"])
     worst = min(all_results, key=lambda x: x["return"])
-    
+
     print(f"\n  🏆 EN İYİ İŞLEM:")
-    print(f"     {best['ticker']:12s} → {best['return']:+.2f}% (Skor: {best['score']:.0f})")
-    
+    print(f"     {best['ticker']:12s} → {best['return']:+.2f}% (Skor: {best['score']:.0f}, {best['date']})")
+
     print(f"\n  📉 EN KÖTÜ İŞLEM:")
-    print(f"     {worst['ticker']:12s} → {worst['return']:+.2f}% (Skor: {worst['score']:.0f})")
-    
+    print(f"     {worst['ticker']:12s} → {worst['return']:+.2f}% (Skor: {worst['score']:.0f}, {worst['date']})")
+
     # Hisse bazlı analiz
     ticker_stats = {}
     for r in all_results:
         ticker = r["ticker"]
         if ticker not in ticker_stats:
             ticker_stats[ticker] = {"total": 0, "success": 0, "returns": []}
-        
+
         ticker_stats[ticker]["total"] += 1
         if r["outcome"] == "SUCCESS":
             ticker_stats[ticker]["success"] += 1
         ticker_stats[ticker]["returns"].append(r["return"])
-    
+
     print(f"\n  📊 HİSSE BAZLI ANALİZ (Top 10):")
     print(f"     {'Ticker':<12} {'İşlem':<8} {'Başarı %':<12} {'Ort. Getiri':<12}")
     print("     " + "-" * 50)
-    
+
     # Başarı oranına göre sırala
     sorted_tickers = sorted(
         ticker_stats.items(),
         key=lambda x: x[1]["success"] / x[1]["total"] if x[1]["total"] > 0 else 0,
         reverse=True
     )
-    
+
     for ticker, stats in sorted_tickers[:10]:
-        total = stats["total"]
-        success = stats["success"]
-        success_rate = (success / total * 100) if total > 0 else 0
+        count = stats["total"]
+        wins = stats["success"]
+        success_rate = (wins / count * 100) if count > 0 else 0
         avg_ret = sum(stats["returns"]) / len(stats["returns"]) if stats["returns"] else 0
-        
-        print(f"     {ticker:<12} {total:<8} {success_rate:>6.1f}%     {avg_ret:>+7.2f}%")
-    
+
+        print(f"     {ticker:<12} {count:<8} {success_rate:>6.1f}%     {avg_ret:>+7.2f}%")
+
     print("\n" + "=" * 70)
-    
+
     return {
         "total": total,
         "success": success,
@@ -284,15 +785,69 @@ def run_backtest(start_date: str, end_date: str, tickers: list = None) -> dict:
     }
 
 
+def run_backtest(start_date: str, end_date: str, tickers: list = None, frames: dict = None,
+                 top_n: int = TOP_N, horizon: int = HORIZON_BARS, bootstrap: int = BOOTSTRAP_SAMPLES) -> dict:
+    """
+    Belirli bir tarih aralığında backtest yap.
+
+    frames verilirse indirme yapılmaz ({ticker: OHLCV DataFrame}).
+    bootstrap > 0 ise özet "confidence" altında güven aralıklarını içerir.
+    """
+    if tickers is None:
+        tickers = config.ALL_STOCKS
+
+    print("\n" + "=" * 70)
+    print(f"  🔬 BACKTEST BAŞLATILIYOR")
+    print(f"  📅 Tarih Aralığı: {start_date} → {end_date}")
+    print(f"  📊 Hisse Sayısı: {len(tickers)}")
+    print("=" * 70)
+
+    started = time.perf_counter()
+
+    if frames is None:
+        print(f"\n  📥 Geçmiş veriler indiriliyor (hisse başına tek sefer)...")
+        frames = load_history(tickers, start_date, end_date, forward_days=horizon * 2 + 1)
+    frames = {t: frames[t] for t in tickers if t in frames}
+    print(f"  ✅ {len(frames)}/{len(tickers)} hisse verisi hazır")
+
+    engine = BacktestEngine(frames)
+    test_days = len(engine.test_rows(start_date, end_date))
+    print(f"  🗓️  Test edilecek gün sayısı: {test_days}")
+
+    all_results = engine.run(start_date, end_date, top_n=top_n, horizon=horizon)
+    print(f"  ⏱️  Süre: {time.perf_counter() - started:.1f} saniye")
+
+    summary = summarize_results(all_results)
+    if summary and bootstrap > 0:
+        summary["confidence"] = bootstrap_confidence(all_results, samples=bootstrap, horizon=horizon)
+        print_confidence_intervals(summary["confidence"])
+    return summary
+
+
 def main():
     parser = argparse.ArgumentParser(description="Borsa Bot Backtesting")
     parser.add_argument("--start", type=str, help="Başlangıç tarihi (YYYY-MM-DD)")
     parser.add_argument("--end", type=str, help="Bitiş tarihi (YYYY-MM-DD)")
     parser.add_argument("--days", type=int, help="Bugünden geriye kaç gün test edilsin")
     parser.add_argument("--tickers", type=str, nargs="+", help="Test edilecek hisseler (boş ise tümü)")
-    
+    parser.add_argument("--top", type=int, default=TOP_N, help="Her gün seçilecek hisse sayısı")
+    parser.add_argument("--horizon", type=int, default=HORIZON_BARS, help="Çıkış için işlem günü sayısı")
+    parser.add_argument("--bootstrap", type=int, default=BOOTSTRAP_SAMPLES,
+                        help="Güven aralıkları için bootstrap örnek sayısı (0: kapalı)")
+    parser.add_argument("--sweep", action="store_true", help="Parametre taraması yap")
+    parser.add_argument("--grid", type=str, nargs="+",
+                        help="Tarama ızgarası, örn. rsi_period=14,21 sma_long=50,63 tech_weight=0.6,0.7")
+    parser.add_argument("--workers", type=int, help="Tarama işçi süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--portfolio", action="store_true",
+                        help="Seçimleri PortfolioEngine ile portföy olarak simüle et")
+    parser.add_argument("--capital", type=float, default=100000, help="Portföy simülasyonu başlangıç sermayesi")
+    parser.add_argument("--regime", type=str, help="Sabit piyasa rejimi (boş ise piyasa genişliğinden)")
+    parser.add_argument("--walk-forward", action="store_true", help="Walk-forward optimizasyonu yap")
+    parser.add_argument("--train-bars", type=int, default=WF_TRAIN_BARS, help="Eğitim penceresi (işlem günü)")
+    parser.add_argument("--test-bars", type=int, default=WF_TEST_BARS, help="Test penceresi (işlem günü)")
+
     args = parser.parse_args()
-    
+
     # Tarihleri belirle
     if args.days:
         end_date = datetime.now()
@@ -308,13 +863,37 @@ def main():
         start_date = end_date - timedelta(days=30)
         start_str = start_date.strftime("%Y-%m-%d")
         end_str = end_date.strftime("%Y-%m-%d")
-    
+
     # Ticker listesi
     tickers = args.tickers if args.tickers else config.ALL_STOCKS
-    
+
+    if args.sweep:
+        grid = parse_grid(args.grid) if args.grid else None
+        rows = run_sweep(start_str, end_str, tickers, grid=grid, workers=args.workers,
+                         top_n=args.top, horizon=args.horizon)
+        print_sweep_table(rows)
+        print(f"\n✅ Tarama tamamlandı!")
+        return
+
+    if args.portfolio:
+        from portfolio_simulator import run_portfolio_simulation
+        run_portfolio_simulation(start_str, end_str, tickers, initial_capital=args.capital,
+                                 top_n=args.top, horizon=args.horizon, regime=args.regime)
+        print(f"\n✅ Simülasyon tamamlandı!")
+        return
+
+    if args.walk_forward:
+        grid = parse_grid(args.grid) if args.grid else None
+        report = run_walk_forward(start_str, end_str, tickers, grid=grid, train_bars=args.train_bars,
+                                  test_bars=args.test_bars, top_n=args.top, horizon=args.horizon)
+        print_walk_forward(report)
+        print(f"\n✅ Walk-forward tamamlandı!")
+        return
+
     # Backtest çalıştır
-    results = run_backtest(start_str, end_str, tickers)
-    
+    results = run_backtest(start_str, end_str, tickers, top_n=args.top, horizon=args.horizon,
+                           bootstrap=args.bootstrap)
+
     print(f"\n✅ Backtest tamamlandı!")
 
 
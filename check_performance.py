@@ -75,7 +75,7 @@ def print_history(history: list):
         date = item['date']
         ticker = item['ticker']
         entry = f"{item['entry_price']:.2f}" if item['entry_price'] else "N/A"
-        rating = item['rating'][:12]
+        rating = (item['rating'] or 'N/A')[:12]
         score = f"{item['score']:.0f}" if item['score'] else "N/A"
         days = str(item['days_held']) if item['days_held'] else "-"
         exit_p = f"{item['exit_price']:.2f}" if item['exit_price'] else "Bekl..."
@@ -143,6 +143,8 @@ def main():
         history = tracker.get_detailed_history(args.limit)
         print_history(history)
 
+    tracker.close()
+
 
 if __name__ == "__main__":
     main()
@@ -18,6 +18,7 @@ except ImportError:
 
 import config
 from technical_analyzer import TechnicalAnalyzer
+from price_store import download_history
 
 
 class CommodityAnalyzer:
@@ -27,7 +28,7 @@ class CommodityAnalyzer:
     def analyze_single_commodity(name: str, ticker: str) -> dict:
         """Tek emtia analiz et"""
         try:
-            df = yf.download(ticker, period="250d", progress=False, timeout=30)
+            df = download_history(ticker, config.LOOKBACK_DAYS, timeout=30)
 
             if df is None or df.empty:
                 return {"name": name, "ticker": ticker, "skip": True, "reason": "Veri alınamadı"}
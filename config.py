@@ -18,6 +18,28 @@ NEWS_API_KEY = os.getenv("NEWS_API_KEY", "YOUR_NEWS_API_KEY_HERE")
 ALPHA_VANTAGE_KEY = os.getenv("ALPHA_VANTAGE_KEY", "")
 POLYGON_API_KEY = os.getenv("POLYGON_API_KEY", "")
 
+# NewsAPI uç noktası (testlerde yerel sunucuya yönlendirilebilir)
+NEWS_API_URL = os.getenv("NEWS_API_URL", "https://newsapi.org/v2/everything")
+# NewsAPI istek zaman aşımı (saniye)
+NEWS_API_TIMEOUT = 10
+# Eşzamanlı haber sorgusu sayısı (sektör + jeopolitik sorgular birlikte)
+NEWS_FETCH_WORKERS = int(os.getenv("NEWS_FETCH_WORKERS", "16"))
+# Sektör ve jeopolitik anahtar kelimeleri OR ile birleşik sorgularda topla
+NEWS_COALESCE_QUERIES = os.getenv("NEWS_COALESCE_QUERIES", "true").lower() == "true"
+# NewsAPI sorgu uzunluğu sınırı (karakter) ve birleşik sorgu sayfa boyutu
+NEWS_QUERY_MAX_LENGTH = 500
+NEWS_PAGE_SIZE = 100
+# Birleşik sorgu başına terim sınırı (genel terimler tek sayfayı doldurup
+# diğer konuları dışarıda bırakmasın); eşleşmesiz konular tek tek yeniden sorgulanır
+NEWS_QUERY_MAX_TERMS = 15
+# Eşleşmesiz birincil sektörler için tek tek yeniden sorgu sınırı (çalıştırma başına)
+NEWS_REQUERY_MAX = int(os.getenv("NEWS_REQUERY_MAX", "3"))
+# Haber cache'i (SQLite) dizini; ilk kullanımda oluşturulur
+NEWS_CACHE_DIR = os.getenv("NEWS_CACHE_DIR", "cache/news")
+# Haber cache'inin bellek katmanı sınırları (LRU; aşan girişler yalnızca diskte kalır)
+CACHE_MEMORY_MAX_ITEMS = 512
+CACHE_MEMORY_MAX_MB = 16
+
 # ═══════════════════════════════════════════════════════════
 # EMAIL AYARLARI (Gmail SMTP)
 # ═══════════════════════════════════════════════════════════
@@ -41,6 +63,9 @@ DAILY_RUN_MINUTE = 30
 # Verbose mode (tüm detayları yazsın mı?)
 VERBOSE = True
 
+# run_analysis aşamalarını paralel çalıştıran işçi sayısı
+PIPELINE_MAX_WORKERS = 5
+
 # ═══════════════════════════════════════════════════════════
 # TEKNİK ANALİZ PARAMETRELERİ
 # ═══════════════════════════════════════════════════════════
@@ -48,6 +73,27 @@ VERBOSE = True
 # Veri alınacak dönem (gün cinsinden)
 LOOKBACK_DAYS = 250
 
+# Toplu indirmede tek istekte çekilecek hisse sayısı
+BULK_DOWNLOAD_CHUNK_SIZE = 50
+
+# Paralel teknik analiz (1 = sıralı çalışma)
+TECHNICAL_MAX_WORKERS = int(os.getenv("TECHNICAL_MAX_WORKERS", "8"))
+# Hisse başına maksimum analiz süresi (saniye)
+TECHNICAL_TICKER_TIMEOUT = 60
+
+# Yerel fiyat deposu (ilk çalıştırmadan sonra sadece eksik barlar indirilir)
+USE_PRICE_STORE = os.getenv("USE_PRICE_STORE", "true").lower() == "true"
+PRICE_STORE_DIR = os.getenv("PRICE_STORE_DIR", "data/prices")
+# Bu süreden yeni kayıtlar için ağ çağrısı yapılmaz (saat)
+PRICE_STORE_REFRESH_HOURS = 6
+# Artımlı indirmede örtüşen barın kapanışı bu orandan fazla farklıysa (bölünme /
+# temettü düzeltmesi) geçmiş tamamen yeniden indirilir
+PRICE_STORE_REBASE_TOLERANCE = 0.001
+
+# Artımlı gösterge durumu (her çalıştırmada sadece yeni bar işlenir)
+USE_INDICATOR_STATE = os.getenv("USE_INDICATOR_STATE", "false").lower() == "true"
+INDICATOR_STATE_DIR = os.getenv("INDICATOR_STATE_DIR", "data/indicator_state")
+
 # RSI parametreleri
 RSI_PERIOD = 21
 RSI_OVERSOLD = 35
@@ -93,6 +139,19 @@ NEUTRAL_SCORE_MAX = 55
 # Maksimum öneri sayısı
 MAX_RECOMMENDATIONS = 3
 
+# Seçimde korelasyon çeşitlendirmesi: seçilmiş bir hisseyle getiri korelasyonu
+# eşiği aşan aday cezalandırılır (tam korelasyonda DIVERSIFY_PENALTY puan)
+DIVERSIFY_SELECTION = os.getenv("DIVERSIFY_SELECTION", "true").lower() == "true"
+DIVERSIFY_MAX_CORRELATION = 0.8
+DIVERSIFY_CORRELATION_WINDOW = 63
+DIVERSIFY_PENALTY = 50
+
+# Portföy dağıtım modu: "confidence" (güven oranı), "risk_parity" veya "min_variance"
+PORTFOLIO_ALLOCATION_MODE = os.getenv("PORTFOLIO_ALLOCATION_MODE", "confidence")
+
+# Kovaryans için kullanılan günlük getiri sayısı (fiyat deposundan)
+PORTFOLIO_COVARIANCE_LOOKBACK = 126
+
 # ═══════════════════════════════════════════════════════════
 # HİSSE LİSTESİ (BIST & GLOBAL)
 # ═══════════════════════════════════════════════════════════
@@ -458,6 +517,22 @@ if USE_PROXY and PROXY_URL:
         "https": PROXY_URL,
     }
 
+# ═══════════════════════════════════════════════════════════
+# HTTP İSTEMCİSİ (paylaşılan oturum)
+# ═══════════════════════════════════════════════════════════
+
+# Bağlantı havuzu boyutu (host başına açık tutulan keep-alive bağlantı)
+HTTP_POOL_SIZE = 16
+# Aynı host'a eşzamanlı en fazla istek
+HTTP_MAX_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", "16"))
+# Bağlantı hatası ve 502/503/504 için tekrar deneme sayısı
+HTTP_RETRIES = 2
+# Tekrar denemede bekleme: rastgele [0, taban * 2^deneme] saniye
+HTTP_BACKOFF_BASE = 0.5
+HTTP_RETRY_STATUSES = (502, 503, 504)
+# Gecikme histogramı kova üst sınırları (saniye)
+HTTP_LATENCY_BUCKETS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
 # ═══════════════════════════════════════════════════════════
 # VALIDATION
 # ═══════════════════════════════════════════════════════════
@@ -15,7 +15,6 @@
 # 11. Jeopolitik NewsAPI Integration
 # ============================================================
 
-import requests
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -37,6 +36,7 @@ except:
     import yfinance as yf
 
 import config
+from http_client import get_http_client
 
 
 class USDebtAnalyzer:
@@ -53,7 +53,7 @@ class USDebtAnalyzer:
                 "date": "2020:2026"
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = get_http_client().get(url, params=params, timeout=10)
             data = response.json()
             
             if len(data) < 2:
@@ -889,56 +889,58 @@ class CommodityStockCorrelation:
 class GeopoliticalNewsIntegration:
     """Jeopolitik Haberler + NewsAPI Entegrasyonu"""
     
+    KEYWORDS = [
+        "Russia Ukraine war",
+        "Hamas Israel conflict",
+        "Iran nuclear",
+        "China Taiwan",
+        "Trump tariffs",
+        "North Korea",
+        "Middle East",
+        "US sanctions",
+        "BRICS",
+        "NATO"
+    ]
+    
+    @staticmethod
+    def select_news(articles_by_keyword: dict) -> list:
+        """Her anahtar kelime için en güncel haberi özet formatına çevir"""
+        all_news = []
+        for keyword in GeopoliticalNewsIntegration.KEYWORDS:
+            for article in (articles_by_keyword.get(keyword) or [])[:1]:
+                all_news.append({
+                    "keyword": keyword,
+                    "title": article.get("title", ""),
+                    "description": (article.get("description") or "")[:100],
+                    "source": article.get("source", {}).get("name", ""),
+                    "published_at": article.get("publishedAt", ""),
+                    "url": article.get("url", "")
+                })
+        return all_news
+    
     @staticmethod
     def get_geopolitical_news():
-        """Jeopolitik haberlerini NewsAPI'den çek"""
+        """Jeopolitik haberlerini NewsAPI'den çek (eşzamanlı, RateLimiter kotası ve cache fallback ile)"""
         try:
+            from news_analyzer import NewsAnalyzer, plan_news_queries, attribute_articles
+
             api_key = config.NEWS_API_KEY
             
             if not api_key or api_key == "YOUR_NEWS_API_KEY_HERE":
                 return None
             
-            keywords = [
-                "Russia Ukraine war",
-                "Hamas Israel conflict",
-                "Iran nuclear",
-                "China Taiwan",
-                "Trump tariffs",
-                "North Korea",
-                "Middle East",
-                "US sanctions",
-                "BRICS",
-                "NATO"
-            ]
-            
-            all_news = []
+            keywords = GeopoliticalNewsIntegration.KEYWORDS
             
-            for keyword in keywords:
-                url = "https://newsapi.org/v2/everything"
-                params = {
-                    "q": keyword,
-                    "sortBy": "publishedAt",
-                    "language": "en",
-                    "apiKey": api_key,
-                    "pageSize": 3
-                }
-                
-                try:
-                    response = requests.get(url, params=params, timeout=10)
-                    data = response.json()
-                    
-                    if data.get("articles"):
-                        for article in data["articles"][:1]:
-                            all_news.append({
-                                "keyword": keyword,
-                                "title": article.get("title", ""),
-                                "description": article.get("description", "")[:100],
-                                "source": article.get("source", {}).get("name", ""),
-                                "published_at": article.get("publishedAt", ""),
-                                "url": article.get("url", "")
-                            })
-                except:
-                    continue
+            if config.NEWS_COALESCE_QUERIES:
+                # Tüm anahtar kelimeler birkaç OR sorgusunda, makaleler yerelde eşleştirilir
+                topics = {keyword: [keyword] for keyword in keywords}
+                queries = plan_news_queries(topics)
+                results = NewsAnalyzer.fetch_news_batch(queries, days_back=None, page_size=config.NEWS_PAGE_SIZE)
+                articles = [article for query in queries for article in results[query]]
+                all_news = GeopoliticalNewsIntegration.select_news(attribute_articles(articles, topics))
+            else:
+                results = NewsAnalyzer.fetch_news_batch(keywords, days_back=None, page_size=3)
+                all_news = GeopoliticalNewsIntegration.select_news(results)
             
             return all_news if all_news else None
         
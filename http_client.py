@@ -0,0 +1,155 @@
+# ============================================================
+# http_client.py — Paylaşılan HTTP İstemcisi (v1)
+# ============================================================
+# Tüm dış API çağrıları (NewsAPI, Dünya Bankası) tek bir
+# requests.Session üzerinden gider:
+#   - Bağlantı havuzu + keep-alive (her istekte yeni TCP/TLS yok)
+#   - config.PROXIES desteği
+#   - Bağlantı hatası ve 502/503/504 için rastgele (jitter) beklemeli
+#     tekrar deneme; zaman aşımı tekrar denenmez (cache fallback'e düşer)
+#   - Kotalı uç noktalar için before_retry: her tekrar denemeden önce
+#     kota ayrılır, kota yoksa tekrar denenmez
+#   - Host başına eşzamanlı istek sınırı
+#   - Host bazında istek sayısı, durum kodu ve gecikme histogramı
+# ============================================================
+
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+
+
+class HttpClient:
+    """Havuzlu, tekrar denemeli ve ölçümlü HTTP istemcisi"""
+
+    def __init__(self, proxies: dict = None, pool_size: int = None, max_per_host: int = None,
+                 retries: int = None, backoff_base: float = None):
+        self.proxies = proxies
+        self.max_per_host = max_per_host or config.HTTP_MAX_PER_HOST
+        self.retries = config.HTTP_RETRIES if retries is None else retries
+        self.backoff_base = config.HTTP_BACKOFF_BASE if backoff_base is None else backoff_base
+        self.buckets = list(config.HTTP_LATENCY_BUCKETS)
+
+        pool_size = pool_size or config.HTTP_POOL_SIZE
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if proxies:
+            self.session.proxies.update(proxies)
+
+        self._lock = threading.Lock()
+        self._host_limits = {}
+        self._stats = {}
+
+    def _host_limit(self, host: str) -> threading.BoundedSemaphore:
+        """Host başına eşzamanlılık semaforu"""
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_limits[host]
+
+    def _record(self, host: str, elapsed: float, status=None, retried: bool = False):
+        """İstek sonucunu host istatistiklerine işle"""
+        with self._lock:
+            stats = self._stats.setdefault(host, {
+                "requests": 0,
+                "errors": 0,
+                "retries": 0,
+                "total_seconds": 0.0,
+                "status": {},
+                "histogram": [0] * (len(self.buckets) + 1),
+            })
+            stats["requests"] += 1
+            stats["total_seconds"] += elapsed
+            if retried:
+                stats["retries"] += 1
+            if status is None:
+                stats["errors"] += 1
+            else:
+                stats["status"][status] = stats["status"].get(status, 0) + 1
+            slot = next((i for i, bound in enumerate(self.buckets) if elapsed <= bound), len(self.buckets))
+            stats["histogram"][slot] += 1
+
+    def _backoff(self, attempt: int):
+        """Rastgele üstel bekleme (full jitter)"""
+        time.sleep(random.uniform(0, self.backoff_base * (2 ** attempt)))
+
+    def request(self, method: str, url: str, before_retry=None, **kwargs) -> requests.Response:
+        """
+        HTTP isteği (havuzlu oturum, host sınırı, tekrar deneme).
+
+        Zaman aşımı hemen yükseltilir; bağlantı hataları ve geçici sunucu
+        hataları HTTP_RETRIES kez tekrar denenir. before_retry verilirse her
+        tekrar denemeden önce çağrılır (örn. RateLimiter kotası ayırır);
+        False dönerse tekrar denenmez, son yanıt/hata döner.
+        """
+        host = urlparse(url).netloc
+        limit = self._host_limit(host)
+
+        for attempt in range(self.retries + 1):
+            retried = attempt > 0
+            started = time.perf_counter()
+            try:
+                with limit:
+                    response = self.session.request(method, url, **kwargs)
+            except requests.exceptions.Timeout:
+                self._record(host, time.perf_counter() - started, retried=retried)
+                raise
+            except requests.exceptions.ConnectionError:
+                self._record(host, time.perf_counter() - started, retried=retried)
+                if attempt >= self.retries or (before_retry is not None and not before_retry()):
+                    raise
+                self._backoff(attempt)
+                continue
+
+            self._record(host, time.perf_counter() - started, response.status_code, retried)
+            if (response.status_code in config.HTTP_RETRY_STATUSES and attempt < self.retries
+                    and (before_retry is None or before_retry())):
+                self._backoff(attempt)
+                continue
+            return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET isteği"""
+        return self.request("GET", url, **kwargs)
+
+    def get_stats(self) -> dict:
+        """Host bazında istek sayıları ve gecikme histogramı"""
+        labels = [f"<={bound}s" for bound in self.buckets] + [f">{self.buckets[-1]}s"]
+        with self._lock:
+            return {
+                host: {
+                    "requests": stats["requests"],
+                    "errors": stats["errors"],
+                    "retries": stats["retries"],
+                    "avg_latency": round(stats["total_seconds"] / stats["requests"], 3),
+                    "status": dict(stats["status"]),
+                    "latency_histogram": dict(zip(labels, stats["histogram"])),
+                }
+                for host, stats in self._stats.items()
+            }
+
+    def close(self):
+        """Havuzdaki bağlantıları kapat"""
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Paylaşılan HttpClient örneği (config.PROXIES değişirse yenilenir)"""
+    global _client
+    with _client_lock:
+        if _client is None or _client.proxies != config.PROXIES:
+            if _client is not None:
+                _client.close()
+            _client = HttpClient(proxies=config.PROXIES)
+        return _client
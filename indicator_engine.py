@@ -0,0 +1,306 @@
+# ============================================================
+# indicator_engine.py — Kesitsel Gösterge Motoru (v1)
+# ============================================================
+# Tüm hisse evreni için (tarih × hisse) 2-D fiyat paneli üzerinde
+# RSI, MACD, Bollinger, SMA, Momentum ve ATR'yi tek NumPy geçişinde
+# hesaplar. Çıktılar TechnicalAnalyzer.calculate_* fonksiyonlarıyla
+# birebir aynı anlamdadır: her tarih için değer, hissenin o tarihe
+# kadarki (NaN'sız) verisiyle tek tek hesaplansa dönecek olan değerdir.
+# ============================================================
+
+import numpy as np
+import pandas as pd
+
+import config
+
+
+# Bollinger konum kodları (skorlama/backtest için sayısal karşılık)
+BOLLINGER_POSITION_CODES = {"alt": -1, "orta": 0, "üst": 1}
+BOLLINGER_POSITION_NAMES = {code: name for name, code in BOLLINGER_POSITION_CODES.items()}
+
+
+def _compact(values: np.ndarray, mask: np.ndarray):
+    """
+    Her sütunun geçerli satırlarını (sıra korunarak) alta topla.
+
+    Tek hisse fonksiyonları dropna() sonrası seri üzerinde çalışır; panelde
+    tatil/eksik günler NaN olduğundan sütunlar önce sıkıştırılır.
+    """
+    order = np.argsort(mask, axis=0, kind="stable")
+    return np.take_along_axis(values, order, axis=0), order
+
+
+def _expand(values: np.ndarray, order: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """_compact'in tersi: sonuçları orijinal tarih satırlarına geri yerleştir"""
+    out = np.empty_like(values)
+    np.put_along_axis(out, order, values, axis=0)
+    out[~mask] = np.nan
+    return out
+
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """Kayan toplam (pencerede NaN varsa NaN) — kümülatif toplam farkı ile"""
+    T = values.shape[0]
+    out = np.full(values.shape, np.nan)
+    if T < window:
+        return out
+
+    nan = np.isnan(values)
+    zero_row = np.zeros((1,) + values.shape[1:])
+    csum = np.concatenate([zero_row, np.cumsum(np.where(nan, 0.0, values), axis=0)])
+    cnan = np.concatenate([zero_row, np.cumsum(nan, axis=0)])
+
+    sums = csum[window:] - csum[:-window]
+    gaps = cnan[window:] - cnan[:-window]
+    out[window - 1:] = np.where(gaps == 0, sums, np.nan)
+    return out
+
+
+def _rolling_mean_std(values: np.ndarray, window: int):
+    """
+    Kayan ortalama ve örneklem std (ddof=1).
+
+    Sayısal kayıp olmaması için her sütun son değerine göre kaydırılarak
+    toplanır.
+    """
+    ref = values[-1]
+    ref = np.where(np.isnan(ref), 0.0, ref)
+    shifted = values - ref
+
+    s1 = _rolling_sum(shifted, window)
+    s2 = _rolling_sum(shifted ** 2, window)
+
+    mean = ref + s1 / window
+    var = (s2 - s1 ** 2 / window) / (window - 1)
+    return mean, np.sqrt(np.maximum(var, 0.0))
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Kayan ortalama (tamamen sıfır pencerede tam 0 döner)"""
+    mean = _rolling_sum(values, window) / window
+    nonzero = _rolling_sum((values != 0).astype(float), window)
+    return np.where(nonzero == 0, 0.0, mean)
+
+
+def _ewm(values: np.ndarray, span: int) -> np.ndarray:
+    """pandas ewm(span, adjust=False).mean() ile aynı özyineleme (sütun bazlı)"""
+    alpha = 1.0 / (1.0 + (span - 1) / 2.0)
+    old_wt = 1.0 - alpha
+
+    out = np.full(values.shape, np.nan)
+    weighted = np.full(values.shape[1:], np.nan)
+    for t in range(values.shape[0]):
+        cur = values[t]
+        observed = ~np.isnan(cur)
+        started = ~np.isnan(weighted)
+        update = observed & started & (weighted != cur)
+        blended = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+        weighted = np.where(update, blended, np.where(observed & ~started, cur, weighted))
+        out[t] = weighted
+    return out
+
+
+def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+    """Satırları aşağı kaydır (üst satırlar NaN)"""
+    out = np.full(values.shape, np.nan)
+    if periods < values.shape[0]:
+        out[periods:] = values[:values.shape[0] - periods]
+    return out
+
+
+class PanelIndicatorEngine:
+    """Kesitsel (tarih × hisse) Gösterge Motoru"""
+
+    @staticmethod
+    def build_panel(frames: dict) -> dict:
+        """
+        {ticker: DataFrame} → tarih birleşimine hizalanmış 2-D diziler.
+
+        Returns:
+            {"index": DatetimeIndex, "tickers": list,
+             "close": ndarray, "high": ndarray, "low": ndarray}
+        """
+        tickers = [t for t, df in frames.items() if df is not None and len(df) > 0]
+        if not tickers:
+            return {"index": pd.DatetimeIndex([]), "tickers": [],
+                    "close": np.empty((0, 0)), "high": np.empty((0, 0)), "low": np.empty((0, 0))}
+
+        panel = {"tickers": tickers}
+        for col in ["close", "high", "low"]:
+            wide = pd.concat(
+                {t: frames[t][col].astype(float) for t in tickers if col in frames[t].columns},
+                axis=1, sort=True
+            ).reindex(columns=tickers)
+            panel[col] = wide.to_numpy(dtype="float64")
+            panel["index"] = wide.index
+
+        return panel
+
+    @staticmethod
+    def compute(close: np.ndarray, high: np.ndarray = None, low: np.ndarray = None,
+                rsi_period: int = None, sma_short: int = None, sma_long: int = None) -> dict:
+        """
+        Tüm göstergeleri tüm hisseler için tek geçişte hesapla.
+
+        Girdi (tarih × hisse) dizileridir; NaN satırlar o hisse için yok
+        sayılır. Her çıktı aynı şekildedir ve her hücre, tek hisse
+        fonksiyonunun o tarihe kadarki veriyle döndüreceği değeri (yetersiz
+        veride onun varsayılanını) taşır. Değerler yuvarlanmamıştır.
+        Periyotlar verilmezse config değerleri kullanılır (parametre taraması).
+        """
+        rsi_period = rsi_period or config.RSI_PERIOD
+        sma_short = sma_short or config.SMA_SHORT
+        sma_long = sma_long or config.SMA_LONG
+        close = np.asarray(close, dtype="float64")
+        if close.ndim == 1:
+            close = close[:, None]
+        T, N = close.shape
+
+        has_range = high is not None and low is not None
+        mask = ~np.isnan(close)
+        if has_range:
+            high = np.asarray(high, dtype="float64").reshape(T, N)
+            low = np.asarray(low, dtype="float64").reshape(T, N)
+            mask &= ~np.isnan(high) & ~np.isnan(low)
+
+        c, order = _compact(np.where(mask, close, np.nan), mask)
+        n_valid = mask.sum(axis=0)
+        # Sıkıştırılmış seride her satırın (0'dan başlayan) bar numarası
+        bars = np.arange(T)[:, None] - (T - n_valid)[None, :] + 1
+
+        out = {}
+
+        # RSI (basit kayan ortalama — calculate_rsi ile aynı)
+        period = rsi_period
+        delta = c - _shift(c, 1)
+        avg_gain = _rolling_mean(np.clip(delta, 0, None), period)
+        avg_loss = _rolling_mean(-np.clip(delta, None, 0), period)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+        rsi = np.where(avg_loss == 0, np.where(avg_gain > 0, 100.0, 0.0), rsi)
+        rsi = np.where(np.isfinite(rsi), np.clip(rsi, 0, 100), 50.0)
+        out["rsi"] = np.where(bars >= period + 1, rsi, 50.0)
+
+        # MACD
+        macd_line = _ewm(c, config.MACD_FAST) - _ewm(c, config.MACD_SLOW)
+        signal_line = _ewm(macd_line, config.MACD_SIGNAL)
+        enough = bars >= 26
+        out["macd_line"] = np.where(enough, macd_line, 0.0)
+        out["signal_line"] = np.where(enough, signal_line, 0.0)
+        out["macd_histogram"] = np.where(enough, macd_line - signal_line, 0.0)
+
+        # Bollinger
+        period = config.BOLLINGER_PERIOD
+        middle, std = _rolling_mean_std(c, period)
+        upper = middle + 2 * std
+        lower = middle - 2 * std
+        enough = bars >= period
+        position = np.where(c > upper * 0.95, 1, np.where(c < lower * 1.05, -1, 0))
+        out["bollinger_upper"] = np.where(enough, upper, 0.0)
+        out["bollinger_middle"] = np.where(enough, middle, 0.0)
+        out["bollinger_lower"] = np.where(enough, lower, 0.0)
+        out["bollinger_position"] = np.where(enough, position, 0)
+
+        # SMA
+        for key, period in [("sma_short", sma_short), ("sma_long", sma_long)]:
+            if period == config.BOLLINGER_PERIOD:
+                sma = middle
+            else:
+                sma, _ = _rolling_mean_std(c, period)
+            out[key] = np.where((bars >= period) & ~np.isnan(sma), sma, 0.0)
+
+        # Momentum (iloc[-period] → period-1 bar öncesi)
+        period = config.MOMENTUM_PERIOD
+        past = _shift(c, period - 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            momentum = (c - past) / past * 100
+        momentum = np.where((past == 0) | ~np.isfinite(momentum), 0.0, momentum)
+        out["momentum_pct"] = np.where(bars >= period, momentum, 0.0)
+
+        # ATR
+        if has_range:
+            h, _ = _compact(np.where(mask, high, np.nan), mask)
+            l, _ = _compact(np.where(mask, low, np.nan), mask)
+            prev_close = _shift(c, 1)
+            tr = np.fmax(h - l, np.fmax(np.abs(h - prev_close), np.abs(l - prev_close)))
+            atr = _rolling_sum(tr, 14) / 14
+            out["atr"] = np.where((bars >= 15) & ~np.isnan(atr), atr, 0.0)
+        else:
+            out["atr"] = np.zeros((T, N))
+
+        # Orijinal tarih satırlarına geri yerleştir
+        return {key: _expand(values.astype("float64"), order, mask) for key, values in out.items()}
+
+    @staticmethod
+    def shift_bars(values: np.ndarray, periods: int, mask: np.ndarray = None) -> np.ndarray:
+        """
+        Her hisseyi kendi geçerli barları üzerinde kaydır.
+
+        Pozitif periods geçmişe (t - periods. bar), negatif periods geleceğe
+        (t + |periods|. bar) bakar; tatil/eksik günler atlanır.
+        """
+        values = np.asarray(values, dtype="float64")
+        if mask is None:
+            mask = ~np.isnan(values)
+        compact, order = _compact(np.where(mask, values, np.nan), mask)
+        if periods >= 0:
+            shifted = _shift(compact, periods)
+        else:
+            shifted = np.full(compact.shape, np.nan)
+            shifted[:periods] = compact[-periods:]
+        return _expand(shifted, order, mask)
+
+    @staticmethod
+    def latest(series: dict, tickers: list) -> dict:
+        """
+        Her hissenin son geçerli tarihteki değerleri, analyze_single_stock
+        çıktısındaki alan adları ve yuvarlamalarıyla.
+        """
+        results = {}
+        rsi = series["rsi"]
+        valid = ~np.isnan(rsi)
+        last_rows = rsi.shape[0] - 1 - np.argmax(valid[::-1], axis=0)
+
+        for j, ticker in enumerate(tickers):
+            if not valid[:, j].any():
+                continue
+            row = last_rows[j]
+            value = lambda key: float(series[key][row, j])
+            results[ticker] = {
+                "rsi": round(value("rsi"), 1),
+                "macd_line": round(value("macd_line"), 6),
+                "signal_line": round(value("signal_line"), 6),
+                "macd_histogram": round(value("macd_histogram"), 6),
+                "bollinger_upper": round(value("bollinger_upper"), 2),
+                "bollinger_middle": round(value("bollinger_middle"), 2),
+                "bollinger_lower": round(value("bollinger_lower"), 2),
+                "bollinger_position": BOLLINGER_POSITION_NAMES[int(value("bollinger_position"))],
+                "sma_short": round(value("sma_short"), 2),
+                "sma_long": round(value("sma_long"), 2),
+                "momentum_pct": round(value("momentum_pct"), 2),
+                "atr": round(value("atr"), 2),
+            }
+
+        return results
+
+    @staticmethod
+    def analyze_frames(frames: dict) -> dict:
+        """{ticker: DataFrame} → {ticker: son gösterge değerleri}"""
+        panel = PanelIndicatorEngine.build_panel(frames)
+        if not panel["tickers"]:
+            return {}
+        series = PanelIndicatorEngine.compute(panel["close"], panel["high"], panel["low"])
+        return PanelIndicatorEngine.latest(series, panel["tickers"])
+
+
+if __name__ == "__main__":
+    import time
+    print("🧪 Panel Gösterge Motoru Testi")
+    rng = np.random.default_rng(42)
+    T, N = 250, 500
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (T, N)), axis=0))
+    high = close * (1 + rng.uniform(0, 0.02, (T, N)))
+    low = close * (1 - rng.uniform(0, 0.02, (T, N)))
+    start = time.perf_counter()
+    PanelIndicatorEngine.compute(close, high, low)
+    print(f"   {N} hisse × {T} bar: {time.perf_counter() - start:.3f}s")
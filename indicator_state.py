@@ -0,0 +1,507 @@
+# ============================================================
+# indicator_state.py — Artımlı Gösterge Durumu (v1)
+# ============================================================
+# Her hisse için göstergelerin ara durumu (EMA'lar, kayan toplamlar,
+# halka tamponlar, kayan max/min kuyrukları) saklanır. Yeni bar
+# geldiğinde geçmiş yeniden hesaplanmaz; durum tek barı O(1) işler ve
+# TechnicalAnalyzer.calculate_indicators ile aynı değerleri üretir.
+# Durum JSON olarak diske yazılır, sonraki çalıştırmada devam eder.
+# ============================================================
+
+import json
+import math
+import os
+import re
+from collections import deque
+
+import pandas as pd
+
+import config
+
+
+def _ema_step(prev, value: float, alpha: float) -> float:
+    """pandas ewm(adjust=False) özyinelemesinin tek adımı"""
+    if prev is None:
+        return value
+    return prev + alpha * (value - prev)
+
+
+def _span_alpha(span: int) -> float:
+    return 1.0 / (1.0 + (span - 1) / 2.0)
+
+
+class IndicatorState:
+    """
+    Tek hisse için artımlı gösterge durumu.
+
+    Aynı bar dizisiyle beslendiğinde values(), calculate_indicators(df)
+    ile aynı sonucu verir. Aynı tarihli bar tekrar gelirse (seans içi
+    güncelleme) önceki bar geri alınıp yenisi işlenir.
+    """
+
+    # Kayan toplamlar bu kadar barda bir tampondan yeniden hesaplanır
+    RESYNC_BARS = 250
+
+    def __init__(self):
+        self.params = self.current_params()
+        self.bars = 0
+        self.last_date = None
+        self.closes = deque(maxlen=self._close_window())
+        self.anchor = None
+        self.sums = {period: [0.0, 0.0] for period in self._mean_windows()}
+        self.same_run = 0
+        self.deltas = deque(maxlen=config.RSI_PERIOD)
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        self.gain_count = 0
+        self.loss_count = 0
+        self.ema = [None, None, None]
+        self.trs = deque(maxlen=14)
+        self.tr_sum = 0.0
+        self.highs = deque()
+        self.lows = deque()
+        self.volumes = deque(maxlen=20)
+        self.volume_sum = 0.0
+        self.since_resync = 0
+        self.previous = None
+
+    @staticmethod
+    def current_params() -> dict:
+        """Durumun geçerli olduğu gösterge parametreleri"""
+        return {
+            "rsi": config.RSI_PERIOD,
+            "macd": [config.MACD_FAST, config.MACD_SLOW, config.MACD_SIGNAL],
+            "bollinger": config.BOLLINGER_PERIOD,
+            "sma": [config.SMA_SHORT, config.SMA_LONG],
+            "momentum": config.MOMENTUM_PERIOD,
+            "fibonacci": config.FIBONACCI_LOOKBACK,
+        }
+
+    @staticmethod
+    def _mean_windows() -> list:
+        return sorted({config.SMA_SHORT, config.SMA_LONG, config.BOLLINGER_PERIOD})
+
+    @staticmethod
+    def _close_window() -> int:
+        return max(IndicatorState._mean_windows() + [config.MOMENTUM_PERIOD]) + 1
+
+    # ─────────────────────────────────────────
+    # Bar işleme
+    # ─────────────────────────────────────────
+
+    def update(self, date, close: float, high: float, low: float, volume: float,
+               keep_previous: bool = True) -> bool:
+        """
+        Tek bar işle.
+
+        Returns:
+            True  → bar işlendi
+            False → bar zaten işlenmiş tarihten eski (yok sayıldı)
+        """
+        date = pd.Timestamp(date).strftime("%Y-%m-%d")
+        if self.last_date is not None:
+            if date < self.last_date:
+                return False
+            if date == self.last_date:
+                if self.previous is None:
+                    return False
+                # Seans içi güncelleme: son bar geri alınıp yeniden işlenir
+                self._load(self.previous)
+                keep_previous = True
+
+        snapshot = self.to_dict(include_previous=False) if keep_previous else None
+        self._apply(float(close), float(high), float(low), float(volume))
+        self.previous = snapshot
+        self.last_date = date
+        return True
+
+    def absorb(self, df: pd.DataFrame) -> int:
+        """DataFrame barlarını sırayla işle (geri alma kaydı sadece son bar için)"""
+        index = df.index
+        close = df["close"].to_numpy(dtype=float)
+        high = df["high"].to_numpy(dtype=float)
+        low = df["low"].to_numpy(dtype=float)
+        volume = df["volume"].to_numpy(dtype=float)
+
+        applied = 0
+        last = len(df) - 1
+        for i in range(len(df)):
+            if self.update(index[i], close[i], high[i], low[i], volume[i], keep_previous=(i == last)):
+                applied += 1
+        return applied
+
+    def _apply(self, close: float, high: float, low: float, volume: float):
+        prev_close = self.closes[-1] if self.closes else None
+        index = self.bars
+
+        # SMA / Bollinger kayan toplamları (sayısal kayıp için anchor'a göre)
+        if self.anchor is None:
+            self.anchor = close
+        x = close - self.anchor
+        for period, sums in self.sums.items():
+            sums[0] += x
+            sums[1] += x * x
+            if len(self.closes) >= period:
+                old = self.closes[-period] - self.anchor
+                sums[0] -= old
+                sums[1] -= old * old
+        self.same_run = self.same_run + 1 if prev_close == close else 1
+        self.closes.append(close)
+
+        # RSI kazanç/kayıp halka tamponu
+        if prev_close is not None:
+            delta = close - prev_close
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+            if len(self.deltas) == self.deltas.maxlen:
+                old_gain, old_loss = self.deltas[0]
+                self.gain_sum -= old_gain
+                self.loss_sum -= old_loss
+                self.gain_count -= old_gain > 0
+                self.loss_count -= old_loss > 0
+            self.deltas.append([gain, loss])
+            self.gain_sum += gain
+            self.loss_sum += loss
+            self.gain_count += gain > 0
+            self.loss_count += loss > 0
+
+        # MACD EMA'ları
+        fast = _ema_step(self.ema[0], close, _span_alpha(config.MACD_FAST))
+        slow = _ema_step(self.ema[1], close, _span_alpha(config.MACD_SLOW))
+        signal = _ema_step(self.ema[2], fast - slow, _span_alpha(config.MACD_SIGNAL))
+        self.ema = [fast, slow, signal]
+
+        # ATR true range halka tamponu
+        ranges = [high - low]
+        if prev_close is not None:
+            ranges += [abs(high - prev_close), abs(low - prev_close)]
+        ranges = [r for r in ranges if not math.isnan(r)]
+        tr = max(ranges) if ranges else float("nan")
+        if len(self.trs) == self.trs.maxlen:
+            self.tr_sum -= self.trs[0]
+        self.trs.append(tr)
+        self.tr_sum += tr
+
+        # Fibonacci kayan max/min (monoton kuyruklar)
+        lookback = config.FIBONACCI_LOOKBACK
+        while self.highs and self.highs[-1][1] <= high:
+            self.highs.pop()
+        self.highs.append([index, high])
+        while self.highs[0][0] <= index - lookback:
+            self.highs.popleft()
+        while self.lows and self.lows[-1][1] >= low:
+            self.lows.pop()
+        self.lows.append([index, low])
+        while self.lows[0][0] <= index - lookback:
+            self.lows.popleft()
+
+        # Breakout hacim ortalaması
+        if len(self.volumes) == self.volumes.maxlen:
+            self.volume_sum -= self.volumes[0]
+        self.volumes.append(volume)
+        self.volume_sum += volume
+
+        self.bars += 1
+        self.since_resync += 1
+        if self.since_resync >= self.RESYNC_BARS:
+            self._resync()
+
+    def _resync(self):
+        """Birikmiş yuvarlama hatasını sıfırla: toplamları tampondan yeniden hesapla"""
+        closes = list(self.closes)
+        self.anchor = closes[-1]
+        for period, sums in self.sums.items():
+            window = [c - self.anchor for c in closes[-period:]]
+            sums[0] = math.fsum(window)
+            sums[1] = math.fsum(v * v for v in window)
+        self.gain_sum = math.fsum(g for g, _ in self.deltas)
+        self.loss_sum = math.fsum(l for _, l in self.deltas)
+        self.tr_sum = math.fsum(self.trs)
+        self.volume_sum = math.fsum(self.volumes)
+        self.since_resync = 0
+
+    # ─────────────────────────────────────────
+    # Değerler
+    # ─────────────────────────────────────────
+
+    def _window_mean(self, period: int) -> float:
+        # Sabit pencerede pandas değeri aynen döndürür
+        if self.same_run >= period:
+            return self.closes[-1]
+        return self.anchor + self.sums[period][0] / period
+
+    def values(self) -> dict:
+        """calculate_indicators ile aynı formatta güncel gösterge değerleri"""
+        n = self.bars
+        current = self.closes[-1] if self.closes else 0.0
+        out = {}
+
+        # RSI
+        period = config.RSI_PERIOD
+        rsi = 50.0
+        if n >= period + 1:
+            avg_gain = self.gain_sum / period if self.gain_count else 0.0
+            avg_loss = self.loss_sum / period if self.loss_count else 0.0
+            if avg_loss == 0:
+                rsi = 100.0 if avg_gain > 0 else 0.0
+            else:
+                value = 100 - (100 / (1 + avg_gain / avg_loss))
+                if not (math.isnan(value) or math.isinf(value)):
+                    rsi = round(max(0, min(100, value)), 1)
+        out["rsi"] = rsi
+
+        # MACD
+        if n >= 26:
+            macd_line = self.ema[0] - self.ema[1]
+            signal_line = self.ema[2]
+            out["macd_line"] = round(macd_line, 6)
+            out["signal_line"] = round(signal_line, 6)
+            out["macd_histogram"] = round(macd_line - signal_line, 6)
+        else:
+            out.update({"macd_line": 0, "signal_line": 0, "macd_histogram": 0})
+
+        # Bollinger
+        period = config.BOLLINGER_PERIOD
+        if n >= period:
+            middle = self._window_mean(period)
+            if self.same_run >= period:
+                std = 0.0
+            else:
+                s1, s2 = self.sums[period]
+                std = math.sqrt(max((s2 - s1 * s1 / period) / (period - 1), 0.0))
+            upper = middle + 2 * std
+            lower = middle - 2 * std
+            if current > upper * 0.95:
+                position = "üst"
+            elif current < lower * 1.05:
+                position = "alt"
+            else:
+                position = "orta"
+            out.update({
+                "bollinger_upper": round(upper, 2),
+                "bollinger_middle": round(middle, 2),
+                "bollinger_lower": round(lower, 2),
+                "bollinger_position": position,
+            })
+        else:
+            out.update({"bollinger_upper": 0, "bollinger_middle": 0, "bollinger_lower": 0,
+                        "bollinger_position": "orta"})
+
+        # SMA
+        for key, period in [("sma_short", config.SMA_SHORT), ("sma_long", config.SMA_LONG)]:
+            out[key] = round(self._window_mean(period), 2) if n >= period else 0.0
+
+        # Momentum
+        period = config.MOMENTUM_PERIOD
+        momentum = 0.0
+        if n >= period:
+            past = self.closes[-period]
+            if past != 0:
+                value = ((current - past) / past) * 100
+                if not (math.isnan(value) or math.isinf(value)):
+                    momentum = round(value, 2)
+        out["momentum_pct"] = momentum
+
+        # ATR
+        atr = 0.0
+        if n >= 15 and not math.isnan(self.tr_sum):
+            atr = round(self.tr_sum / 14, 2)
+        out["atr"] = atr
+
+        # Fibonacci
+        fibonacci = {}
+        if n >= config.FIBONACCI_LOOKBACK:
+            hi = self.highs[0][1]
+            lo = self.lows[0][1]
+            distance = hi - lo
+            fibonacci = {
+                "current": round(current, 2),
+                "fib_0.236": round(hi - (distance * 0.236), 2),
+                "fib_0.382": round(hi - (distance * 0.382), 2),
+                "fib_0.618": round(hi - (distance * 0.618), 2),
+                "fib_0.786": round(hi - (distance * 0.786), 2),
+                "fib_1.0": round(lo, 2),
+            }
+        out["fibonacci"] = fibonacci
+
+        # Trend
+        trend = {"trend": "Nötr", "strength": "N/A"}
+        if n >= config.SMA_LONG:
+            sma_s_val = self._window_mean(config.SMA_SHORT)
+            sma_l_val = self._window_mean(config.SMA_LONG)
+            if current > sma_s_val > sma_l_val:
+                trend = {"trend": "Güçlü Yükseliş", "strength": "Very Strong"}
+            elif current > sma_s_val:
+                trend = {"trend": "Yükseliş", "strength": "Strong"}
+            elif current < sma_s_val < sma_l_val:
+                trend = {"trend": "Güçlü Düşüş", "strength": "Very Strong"}
+            elif current < sma_s_val:
+                trend = {"trend": "Düşüş", "strength": "Strong"}
+            else:
+                trend = {"trend": "Nötr", "strength": "Balanced"}
+        out["trend"] = trend["trend"]
+        out["trend_strength"] = trend["strength"]
+
+        # Breakout hacim kontrolü
+        volume_surge = False
+        if n >= 20:
+            volume_surge = self.volumes[-1] > (self.volume_sum / 20) * 1.5
+        out["volume_surge"] = volume_surge
+
+        return out
+
+    # ─────────────────────────────────────────
+    # Serileştirme
+    # ─────────────────────────────────────────
+
+    def to_dict(self, include_previous: bool = True) -> dict:
+        data = {
+            "params": self.params,
+            "bars": self.bars,
+            "last_date": self.last_date,
+            "closes": list(self.closes),
+            "anchor": self.anchor,
+            "sums": {str(period): list(sums) for period, sums in self.sums.items()},
+            "same_run": self.same_run,
+            "deltas": [list(d) for d in self.deltas],
+            "gain_sum": self.gain_sum,
+            "loss_sum": self.loss_sum,
+            "gain_count": self.gain_count,
+            "loss_count": self.loss_count,
+            "ema": list(self.ema),
+            "trs": list(self.trs),
+            "tr_sum": self.tr_sum,
+            "highs": [list(h) for h in self.highs],
+            "lows": [list(l) for l in self.lows],
+            "volumes": list(self.volumes),
+            "volume_sum": self.volume_sum,
+            "since_resync": self.since_resync,
+        }
+        if include_previous:
+            data["previous"] = self.previous
+        return data
+
+    def _load(self, data: dict):
+        self.params = data["params"]
+        self.bars = data["bars"]
+        self.last_date = data["last_date"]
+        self.closes = deque(data["closes"], maxlen=self._close_window())
+        self.anchor = data["anchor"]
+        self.sums = {int(period): list(sums) for period, sums in data["sums"].items()}
+        self.same_run = data["same_run"]
+        self.deltas = deque([list(d) for d in data["deltas"]], maxlen=config.RSI_PERIOD)
+        self.gain_sum = data["gain_sum"]
+        self.loss_sum = data["loss_sum"]
+        self.gain_count = data["gain_count"]
+        self.loss_count = data["loss_count"]
+        self.ema = list(data["ema"])
+        self.trs = deque(data["trs"], maxlen=14)
+        self.tr_sum = data["tr_sum"]
+        self.highs = deque(list(h) for h in data["highs"])
+        self.lows = deque(list(l) for l in data["lows"])
+        self.volumes = deque(data["volumes"], maxlen=20)
+        self.volume_sum = data["volume_sum"]
+        self.since_resync = data["since_resync"]
+        if "previous" in data:
+            self.previous = data["previous"]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IndicatorState":
+        state = cls()
+        state._load(data)
+        return state
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "IndicatorState":
+        state = cls()
+        state.absorb(df)
+        return state
+
+    def can_extend(self, df: pd.DataFrame) -> bool:
+        """
+        df bu durumun devamı mı?
+
+        Son işlenen tarih df'te olmalı. Ondan önceki (tamamlanmış) barın
+        kapanışı ve o bar df'in son barı değilse kendi kapanışı da aynı olmalı;
+        aksi halde geçmiş düzeltilmiştir (örn. temettü), yeni bar gelmemiş
+        olsa bile durum yeniden kurulur.
+        """
+        if self.last_date is None or not self.closes or df is None or df.empty:
+            return False
+        dates = pd.DatetimeIndex(df.index).strftime("%Y-%m-%d")
+        matches = (dates == self.last_date).nonzero()[0]
+        if len(matches) == 0:
+            return False
+        position = matches[-1]
+        closes = df["close"]
+        if position > 0 and len(self.closes) > 1 and float(closes.iloc[position - 1]) != self.closes[-2]:
+            return False
+        if position == len(df) - 1:
+            return True
+        return float(closes.iloc[position]) == self.closes[-1]
+
+
+class IndicatorStateStore:
+    """Hisse başına gösterge durumu deposu (JSON)"""
+
+    def __init__(self, store_dir: str = None):
+        self.store_dir = store_dir or config.INDICATOR_STATE_DIR
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    def _path(self, ticker: str) -> str:
+        safe = re.sub(r"[^A-Za-z0-9._-]", "_", ticker)
+        return os.path.join(self.store_dir, f"{safe}.json")
+
+    def load(self, ticker: str) -> IndicatorState:
+        """Kayıtlı durumu oku (parametreler değiştiyse None)"""
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("params") != IndicatorState.current_params():
+                return None
+            return IndicatorState.from_dict(data)
+        except Exception:
+            return None
+
+    def save(self, ticker: str, state: IndicatorState):
+        """Durumu atomik olarak diske yaz"""
+        path = self._path(ticker)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    def sync(self, ticker: str, df: pd.DataFrame, cancel=None) -> dict:
+        """
+        Durumu df'e göre güncelle ve gösterge değerlerini döndür.
+
+        Kayıtlı durum df'in devamıysa sadece yeni (ve seans içi değişen son)
+        bar işlenir; değilse durum df'ten yeniden kurulur. cancel
+        (threading.Event) set edildiyse güncel durum diske yazılmaz.
+        """
+        state = self.load(ticker)
+        if state is not None and state.can_extend(df):
+            dates = pd.DatetimeIndex(df.index).strftime("%Y-%m-%d")
+            new_bars = df[dates > state.last_date]
+            # Yeni bar yoksa son bar seans içinde değişmiş olabilir
+            state.absorb(new_bars if len(new_bars) else df.iloc[-1:])
+        else:
+            state = IndicatorState.from_frame(df)
+
+        if cancel is None or not cancel.is_set():
+            self.save(ticker, state)
+        return state.values()
+
+
+_store = None
+
+
+def get_indicator_state_store() -> IndicatorStateStore:
+    """Paylaşılan IndicatorStateStore örneği (config.INDICATOR_STATE_DIR değişirse yenilenir)"""
+    global _store
+    if _store is None or _store.store_dir != config.INDICATOR_STATE_DIR:
+        _store = IndicatorStateStore(config.INDICATOR_STATE_DIR)
+    return _store
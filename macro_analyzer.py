@@ -18,6 +18,7 @@ except ImportError:
 
 import config
 from technical_analyzer import TechnicalAnalyzer
+from price_store import download_history
 
 
 class MacroAnalyzer:
@@ -29,7 +30,7 @@ class MacroAnalyzer:
         try:
             import pandas as pd
             ticker = config.DXY_TICKER
-            df = yf.download(ticker, period="250d", progress=False, timeout=30)
+            df = download_history(ticker, config.LOOKBACK_DAYS, timeout=30)
 
             if df is None or df.empty:
                 return {"ticker": ticker, "skip": True, "reason": "Veri alınamadı"}
@@ -19,13 +19,15 @@ import traceback
 import config
 
 # Tüm moduller
-from technical_analyzer import analyze_all_stocks
+from technical_analyzer import analyze_all_stocks, AnalysisRegistry
 from news_analyzer import analyze_news
 from scorer import select_top_stocks, generate_recommendation_text
 from mail_sender import generate_html_body, send_email
 from chart_generator import generate_charts
 from commodity_analyzer import CommodityAnalyzer
 from macro_analyzer import MacroAnalyzer
+from stage_scheduler import StageScheduler
+from performance_tracker import PerformanceTracker
 
 # QUICK MODE - Hızlı test için (GÜVENLİ HİSSELER)
 QUICK_STOCKS = [
@@ -184,6 +186,141 @@ def get_stocks_by_sectors(target_sectors: list) -> list:
     return stocks
 
 
+# ═══════════════════════════════════════════════════════════
+# PIPELINE AŞAMALARI (StageScheduler ile paralel çalışır)
+# ═══════════════════════════════════════════════════════════
+
+def _stage_news(inputs: dict) -> dict:
+    """Haber analizi aşaması"""
+    try:
+        sector_scores = analyze_news(days_back=1)
+        print(f"✅ Haber analizi tamamlandı")
+        return sector_scores
+    except Exception as e:
+        print(f"⚠️  Haber analizi yapılamadı: {e}")
+        return {}
+
+
+def _stage_commodities(inputs: dict) -> dict:
+    """Emtia analizi aşaması"""
+    try:
+        commodity_data = CommodityAnalyzer.analyze_all_commodities()
+        print(f"✅ Emtia analizi tamamlandı")
+        return commodity_data
+    except Exception as e:
+        print(f"⚠️  Emtia analizi yapılamadı: {e}")
+        return None
+
+
+def _stage_dxy(inputs: dict) -> dict:
+    """DXY analizi aşaması"""
+    return MacroAnalyzer.analyze_dxy()
+
+
+def _stage_holidays(inputs: dict) -> list:
+    """Tatil kontrolü aşaması"""
+    return MacroAnalyzer.check_upcoming_holidays(days_ahead=14)
+
+
+def _stage_macro(inputs: dict) -> dict:
+    """Makro veri birleştirme aşaması (haber + DXY + ABD borç)"""
+    try:
+        sector_scores = inputs.get("news") or {}
+        macro_data = {
+            "us_debt": MacroAnalyzer.get_us_debt_analysis(),
+            "dxy": inputs.get("dxy"),
+            "geopolitical_risk": sector_scores.get("geopolitical_risk", {}),
+            "supply_demand_trends": sector_scores.get("supply_demand_trends", []),
+        }
+        print(f"✅ Makro analiz tamamlandı")
+        return macro_data
+    except Exception as e:
+        print(f"⚠️  Makro analiz yapılamadı: {e}")
+        return None
+
+
+def _stage_sectors(inputs: dict) -> dict:
+    """Hedef sektör belirleme aşaması"""
+    sector_scores = inputs.get("news") or {}
+    try:
+        target_sectors, sector_reasoning = determine_target_sectors(
+            sector_scores=sector_scores,
+            commodity_data=inputs.get("commodities"),
+            macro_data=inputs.get("macro"),
+            geo_risk=sector_scores.get("geopolitical_risk", {}),
+            supply_demand=sector_scores.get("supply_demand_trends", []),
+        )
+        target_stocks = get_stocks_by_sectors(target_sectors)
+        print(f"🎯 Hedef sektörler: {target_sectors}")
+        print(f"📋 Analiz edilecek hisse sayısı: {len(target_stocks)} ({len(config.ALL_STOCKS)} yerine)")
+    except Exception as e:
+        print(f"⚠️  Sektör belirleme hatası: {e} — tüm hisseler analiz edilecek")
+        traceback.print_exc()
+        target_sectors = []
+        sector_reasoning = {}
+        target_stocks = config.ALL_STOCKS
+
+    return {
+        "target_sectors": target_sectors,
+        "reasoning": sector_reasoning,
+        "stocks": target_stocks if target_stocks else config.ALL_STOCKS,
+    }
+
+
+def _run_technical(stocks_to_analyze: list, quick: bool, registry: AnalysisRegistry = None) -> dict:
+    """Teknik analiz (sonuç yoksa tüm hisselere fallback)"""
+    try:
+        technical_results = analyze_all_stocks(stocks_to_analyze, registry=registry)
+        successful_tech = len([r for r in technical_results if not r.get('skip')])
+        
+        if successful_tech == 0:
+            print(f"⚠️  Hiçbir hisse analiz edilmedi, fallback aktive ediliyor...")
+            # Fallback: tüm hisseleri dene
+            if not quick and stocks_to_analyze != config.ALL_STOCKS:
+                print(f"   Fallback: Tüm hisseler analiz ediliyor...")
+                technical_results = analyze_all_stocks(config.ALL_STOCKS, registry=registry)
+                successful_tech = len([r for r in technical_results if not r.get('skip')])
+        else:
+            print(f"✅ {successful_tech}/{len(stocks_to_analyze)} hisse analiz edildi")
+    
+    except Exception as e:
+        print(f"❌ Teknik analiz hatası: {e}")
+        technical_results = []
+        successful_tech = 0
+
+    return {"results": technical_results, "successful": successful_tech}
+
+
+def build_analysis_pipeline(quick: bool = False, registry: AnalysisRegistry = None) -> StageScheduler:
+    """
+    run_analysis aşama grafiği.
+
+    news, commodities, dxy ve holidays birbirinden bağımsızdır ve paralel
+    çalışır. Normal modda teknik analiz hedef sektörler belli olur olmaz,
+    quick modda ise hiçbir şey beklemeden başlar.
+    """
+    scheduler = StageScheduler(max_workers=config.PIPELINE_MAX_WORKERS)
+    scheduler.add("news", _stage_news, default={})
+    scheduler.add("commodities", _stage_commodities)
+    scheduler.add("dxy", _stage_dxy)
+    scheduler.add("holidays", _stage_holidays, default=[])
+    scheduler.add("macro", _stage_macro, deps=["news", "dxy"])
+
+    if quick:
+        scheduler.add(
+            "technical", lambda inputs: _run_technical(QUICK_STOCKS, quick=True, registry=registry),
+            default={"results": [], "successful": 0},
+        )
+    else:
+        scheduler.add("sectors", _stage_sectors, deps=["news", "commodities", "macro"])
+        scheduler.add(
+            "technical", lambda inputs: _run_technical(inputs["sectors"]["stocks"], quick=False, registry=registry),
+            deps=["sectors"], default={"results": [], "successful": 0},
+        )
+
+    return scheduler
+
+
 def run_analysis(quick: bool = False):
     """Ana analiz fonksiyonu"""
     
@@ -197,102 +334,28 @@ def run_analysis(quick: bool = False):
         print(f"Başlangıç: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
 
         # ═══════════════════════════════════════════════════════════
-        # ADIM 1: SEKTÖR TAHMİNİ (Makro + Haber + Emtia)
+        # ADIM 1-3: Sektör Tahmini + Hedef Sektör + Teknik Analiz
+        # (bağımsız aşamalar paralel, teknik analiz sektörler belli olunca)
         # ═══════════════════════════════════════════════════════════
-        target_sectors = []
-        sector_reasoning = {}
-        sector_scores = {}
-        commodity_data = None
-        macro_data = None
-        holiday_alerts = []
+        print_section("ADIM 1-3: Haber + Emtia + Makro + Sektör + Teknik Analiz (paralel)"
+                      if not quick else "ADIM 1: Teknik Analiz + Haber/Emtia/Makro (Quick Mode, paralel)")
 
-        if not quick:
-            print_section("ADIM 1: Sektör Tahmini (Makro + Haber + Emtia)")
+        # Çalıştırma kapsamlı kayıt: hiçbir hisse iki kez indirilip skorlanmaz
+        registry = AnalysisRegistry()
+        pipeline = build_analysis_pipeline(quick=quick, registry=registry)
+        stage_results = pipeline.run()
 
-            # 1a. Haber analizi
-            try:
-                sector_scores = analyze_news(days_back=1)
-                print(f"✅ Haber analizi tamamlandı")
-            except Exception as e:
-                print(f"⚠️  Haber analizi yapılamadı: {e}")
-                sector_scores = {}
+        sector_scores = stage_results["news"] or {}
+        commodity_data = stage_results["commodities"]
+        macro_data = stage_results["macro"]
+        holiday_alerts = stage_results["holidays"] or []
 
-            # 1b. Emtia analizi
-            try:
-                commodity_data = CommodityAnalyzer.analyze_all_commodities()
-                print(f"✅ Emtia analizi tamamlandı")
-            except Exception as e:
-                print(f"⚠️  Emtia analizi yapılamadı: {e}")
-
-            # 1c. Makro analiz
-            try:
-                dxy_result = MacroAnalyzer.analyze_dxy()
-                debt_result = MacroAnalyzer.get_us_debt_analysis()
-                geo_risk = sector_scores.get("geopolitical_risk", {})
-                supply_demand = sector_scores.get("supply_demand_trends", [])
-                macro_data = {
-                    "us_debt": debt_result,
-                    "dxy": dxy_result,
-                    "geopolitical_risk": geo_risk,
-                    "supply_demand_trends": supply_demand,
-                }
-                holiday_alerts = MacroAnalyzer.check_upcoming_holidays(days_ahead=14)
-                print(f"✅ Makro analiz tamamlandı")
-            except Exception as e:
-                print(f"⚠️  Makro analiz yapılamadı: {e}")
-                geo_risk = {}
-                supply_demand = []
-
-            # ═══════════════════════════════════════════════════════════
-            # ADIM 2: HEDEF SEKTÖR BELİRLE
-            # ═══════════════════════════════════════════════════════════
-            print_section("ADIM 2: Hedef Sektör Belirleme")
-
-            try:
-                target_sectors, sector_reasoning = determine_target_sectors(
-                    sector_scores=sector_scores,
-                    commodity_data=commodity_data,
-                    macro_data=macro_data,
-                    geo_risk=sector_scores.get("geopolitical_risk", {}),
-                    supply_demand=sector_scores.get("supply_demand_trends", []),
-                )
-                target_stocks = get_stocks_by_sectors(target_sectors)
-                print(f"🎯 Hedef sektörler: {target_sectors}")
-                print(f"📋 Analiz edilecek hisse sayısı: {len(target_stocks)} ({len(config.ALL_STOCKS)} yerine)")
-            except Exception as e:
-                print(f"⚠️  Sektör belirleme hatası: {e} — tüm hisseler analiz edilecek")
-                traceback.print_exc()
-                target_sectors = []
-                sector_reasoning = {}
-                target_stocks = config.ALL_STOCKS
+        sectors = stage_results.get("sectors") or {}
+        target_sectors = sectors.get("target_sectors", [])
+        sector_reasoning = sectors.get("reasoning", {})
 
-            stocks_to_analyze = target_stocks if target_stocks else config.ALL_STOCKS
-        else:
-            stocks_to_analyze = QUICK_STOCKS
-
-        # ═══════════════════════════════════════════════════════════
-        # ADIM 3: Teknik Analiz (Hedef Sektör hisseleri)
-        # ═══════════════════════════════════════════════════════════
-        print_section("ADIM 3: Teknik Analiz (Hedef Sektör)" if not quick else "ADIM 1: Teknik Analiz (Quick Mode)")
-        
-        try:
-            technical_results = analyze_all_stocks(stocks_to_analyze)
-            successful_tech = len([r for r in technical_results if not r.get('skip')])
-            
-            if successful_tech == 0:
-                print(f"⚠️  Hiçbir hisse analiz edilmedi, fallback aktive ediliyor...")
-                # Fallback: tüm hisseleri dene
-                if not quick and stocks_to_analyze != config.ALL_STOCKS:
-                    print(f"   Fallback: Tüm hisseler analiz ediliyor...")
-                    technical_results = analyze_all_stocks(config.ALL_STOCKS)
-                    successful_tech = len([r for r in technical_results if not r.get('skip')])
-            else:
-                print(f"✅ {successful_tech}/{len(stocks_to_analyze)} hisse analiz edildi")
-        
-        except Exception as e:
-            print(f"❌ Teknik analiz hatası: {e}")
-            technical_results = []
-            successful_tech = 0
+        technical_results = stage_results["technical"]["results"]
+        successful_tech = stage_results["technical"]["successful"]
         
         # ═══════════════════════════════════════════════════════════
         # ADIM 4: Skor Hesaplama ve Seçim
@@ -300,7 +363,8 @@ def run_analysis(quick: bool = False):
         print_section("ADIM 4: Skor Hesaplama")
         
         try:
-            selected = select_top_stocks(technical_results, sector_scores, max_count=config.MAX_RECOMMENDATIONS)
+            selected = select_top_stocks(technical_results, sector_scores, max_count=config.MAX_RECOMMENDATIONS,
+                                         registry=registry)
             
             # Her seçilen hisseye kaynak havuzu etiketini ekle
             for stock in selected:
@@ -316,8 +380,10 @@ def run_analysis(quick: bool = False):
                 print(f"🔄 Kalan hisseler analiz ediliyor (eksik: {shortage})...")
 
                 if remaining_stocks:
-                    remaining_results = analyze_all_stocks(remaining_stocks)
-                    remaining_selected = select_top_stocks(remaining_results, sector_scores, max_count=shortage)
+                    remaining_results = analyze_all_stocks(remaining_stocks, registry=registry)
+                    # Önceden seçilenler korelasyon cezasına dahil (aynı hareket eden hisse eklenmesin)
+                    remaining_selected = select_top_stocks(remaining_results, sector_scores, max_count=shortage,
+                                                           registry=registry, selected=selected)
                     for stock in remaining_selected:
                         stock["source_pool"] = "🌍 Genel Havuz"
                     print(f"✅ Kalan hisselerden {len(remaining_selected)} hisse daha seçildi")
@@ -340,8 +406,9 @@ def run_analysis(quick: bool = False):
                 # Fallback: tüm hisselerden seç
                 if not quick and target_sectors:
                     print(f"   Fallback: Tüm hisseler arasından seçim yapılıyor...")
-                    all_results = analyze_all_stocks(config.ALL_STOCKS)
-                    selected = select_top_stocks(all_results, sector_scores, max_count=config.MAX_RECOMMENDATIONS)
+                    all_results = analyze_all_stocks(config.ALL_STOCKS, registry=registry)
+                    selected = select_top_stocks(all_results, sector_scores, max_count=config.MAX_RECOMMENDATIONS,
+                                                 registry=registry)
                     for stock in selected:
                         stock["source_pool"] = "🌍 Genel Havuz"
                     technical_results = all_results
@@ -377,29 +444,15 @@ def run_analysis(quick: bool = False):
             traceback.print_exc()
             recommendations = {"recommendations": [], "total_selected": 0}
 
-        # Quick mode'da emtia/makro analizi burada yap (sektör tahminine gerek yok)
-        if quick:
-            try:
-                sector_scores = analyze_news(days_back=1)
-            except Exception as e:
-                print(f"⚠️  Haber analizi yapılamadı: {e}")
+        # Önerileri performans takibi için tek işlemde kaydet
+        if config.ENABLE_DATABASE and recommendations.get("recommendations"):
             try:
-                commodity_data = CommodityAnalyzer.analyze_all_commodities()
+                with PerformanceTracker() as tracker:
+                    ids = tracker.save_recommendations(recommendations["recommendations"])
+                print(f"💾 {len([i for i in ids if i])} öneri performans veritabanına kaydedildi")
             except Exception as e:
-                print(f"⚠️  Emtia analizi yapılamadı: {e}")
-            try:
-                dxy_result = MacroAnalyzer.analyze_dxy()
-                debt_result = MacroAnalyzer.get_us_debt_analysis()
-                macro_data = {
-                    "us_debt": debt_result,
-                    "dxy": dxy_result,
-                    "geopolitical_risk": sector_scores.get("geopolitical_risk", {}),
-                    "supply_demand_trends": sector_scores.get("supply_demand_trends", []),
-                }
-                holiday_alerts = MacroAnalyzer.check_upcoming_holidays(days_ahead=14)
-            except Exception as e:
-                print(f"⚠️  Makro analiz yapılamadı: {e}")
-        
+                print(f"⚠️  Öneriler kaydedilemedi: {e}")
+
         # ═══════════════════════════════════════════════════════════
         # ADIM 5: Email Hazırlama ve Gönderme
         # ═══════════════════════════════════════════════════════════
@@ -463,8 +516,12 @@ def run_analysis(quick: bool = False):
             print(f"   🎯 Hedef sektörler: {', '.join(target_sectors)}")
         print(f"   ✅ Seçilen hisseler: {len(selected)}")
         print(f"   ✅ Öneriler: {len(recommendations.get('recommendations', []))}")
+        registry_stats = registry.stats()
+        print(f"   ♻️  Analiz kaydı: {registry_stats['hits']} isabet / {registry_stats['misses']} ıska "
+              f"(skor: {registry_stats['candidate_hits']} isabet / {registry_stats['candidate_misses']} ıska)")
         print(f"   ✅ Süre: {duration:.1f} saniye")
         print(f"   ✅ Bitiş: {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
+        pipeline.print_timeline()
         
     except Exception as e:
         print_header("HATA OLUŞTU")
@@ -3,22 +3,27 @@
 # ============================================================
 # Optimizasyonlar:
 # 1. Smart Rate Limiting (API limit yönetimi)
-# 2. Multi-Layer Caching (bellek + disk)
+# 2. Multi-Layer Caching (bellek + SQLite)
 # 3. Fallback Mechanisms (manuel mood'a geçiş)
 # 4. Batch Processing (grup işleme)
 # 5. Error Recovery (hata kurtarma)
-# 6. Request Pooling (istek havuzu)
-# 7. Async-like Processing (seri işleme optimize)
+# 6. Request Pooling (paylaşılan keep-alive HTTP oturumu)
+# 7. Eşzamanlı sorgular (tüm sektör + jeopolitik istekler paralel)
 # ============================================================
 
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import json
 import os
 import time
 import hashlib
+import re
+import sqlite3
+import threading
 import config
+from http_client import get_http_client
 
 try:
     from nltk.sentiment import SentimentIntensityAnalyzer
@@ -44,9 +49,15 @@ class RateLimiter:
         # Each entry is a (timestamp, keyword) tuple for detailed history tracking
         self.requests = []
         self.blocked_until = None
+        # Eşzamanlı sorgular aynı kotayı paylaşır
+        self._lock = threading.RLock()
     
     def can_request(self) -> bool:
         """İstek yapılabilir mi?"""
+        with self._lock:
+            return self._can_request()
+    
+    def _can_request(self) -> bool:
         now = datetime.now().timestamp()
         
         # Block kontrolü
@@ -63,7 +74,16 @@ class RateLimiter:
     
     def add_request(self, keyword: str = ""):
         """İstek ekle (keyword ile izleme)"""
-        self.requests.append((datetime.now().timestamp(), keyword))
+        with self._lock:
+            self.requests.append((datetime.now().timestamp(), keyword))
+    
+    def try_acquire(self, keyword: str = "") -> bool:
+        """Kota varsa tek adımda istek hakkı ayır (eşzamanlı çağrılar için)"""
+        with self._lock:
+            if not self._can_request():
+                return False
+            self.requests.append((datetime.now().timestamp(), keyword))
+            return True
     
     def block_until(self, seconds: int = 3600):
         """Belirtilen süre block et"""
@@ -72,9 +92,10 @@ class RateLimiter:
     def requests_remaining(self) -> int:
         """Kalan istek sayısı"""
         now = datetime.now().timestamp()
-        self.requests = [req for req in self.requests
-                        if now - req[0] < self.period_seconds]
-        used = len(self.requests)
+        with self._lock:
+            self.requests = [req for req in self.requests
+                            if now - req[0] < self.period_seconds]
+            used = len(self.requests)
         return max(0, self.max_requests - used)
     
     def get_request_history(self) -> list:
@@ -90,69 +111,157 @@ class RateLimiter:
         ]
 
 
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key_hash TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache(expires_at);
+"""
+
+
 class CacheManager:
-    """Çok Katmanlı Cache Yönetimi"""
+    """Çok Katmanlı Cache Yönetimi (sınırlı LRU bellek + tek dosyalık SQLite)"""
+    
+    DB_FILENAME = "cache.db"
     
-    def __init__(self, cache_dir: str = "cache", ttl_hours: int = 24):
+    def __init__(self, cache_dir: str = "cache", ttl_hours: int = 24,
+                 max_items: int = None, max_mb: float = None):
         self.cache_dir = cache_dir
         self.ttl_seconds = ttl_hours * 3600
-        self.memory_cache = {}  # Bellek cache
         
-        # Cache klasörü oluştur
+        # Bellek cache: en eski kullanılan başta (LRU), boyut set anında hesaplanır
+        self.memory_cache = OrderedDict()
+        self.max_items = max_items or config.CACHE_MEMORY_MAX_ITEMS
+        self.max_bytes = int((max_mb or config.CACHE_MEMORY_MAX_MB) * 1024 * 1024)
+        self.memory_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        # Cache klasörü ve veritabanı
         os.makedirs(cache_dir, exist_ok=True)
+        self.db_path = os.path.join(cache_dir, self.DB_FILENAME)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock, self._conn:
+            self._conn.executescript(CACHE_SCHEMA)
+        self._migrate_json_files()
     
     def _get_cache_key(self, key: str) -> str:
         """Cache anahtarı oluştur"""
         return hashlib.md5(key.encode()).hexdigest()
     
-    def _get_cache_path(self, key: str) -> str:
-        """Cache dosya yolu"""
-        cache_key = self._get_cache_key(key)
-        return os.path.join(self.cache_dir, f"{cache_key}.json")
+    def _migrate_json_files(self):
+        """Eski <md5>.json dosyalarını veritabanına taşı (tek seferlik)"""
+        try:
+            legacy = [f for f in os.listdir(self.cache_dir)
+                      if f.endswith(".json") and len(f) == 37]
+        except OSError:
+            return
+        if not legacy:
+            return
+        
+        rows = []
+        for filename in legacy:
+            filepath = os.path.join(self.cache_dir, filename)
+            try:
+                with open(filepath, 'r') as f:
+                    item = json.load(f)
+                rows.append((filename[:-5], json.dumps(item["data"]),
+                             item["timestamp"], item["timestamp"] + self.ttl_seconds))
+            except Exception:
+                pass
+            try:
+                os.remove(filepath)
+            except OSError:
+                pass
+        
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO cache (key_hash, data, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+    
+    def _remember(self, key: str, item: dict):
+        """Bellek katmanına ekle, sınır aşılırsa en eski kullanılanları çıkar"""
+        with self._lock:
+            self._forget(key)
+            self.memory_cache[key] = item
+            self.memory_bytes += item["size"]
+            while self.memory_cache and (len(self.memory_cache) > self.max_items
+                                         or self.memory_bytes > self.max_bytes):
+                _, evicted = self.memory_cache.popitem(last=False)
+                self.memory_bytes -= evicted["size"]
+                self.evictions += 1
+    
+    def _forget(self, key: str):
+        """Bellek katmanından çıkar (boyut muhasebesiyle)"""
+        with self._lock:
+            item = self.memory_cache.pop(key, None)
+            if item is not None:
+                self.memory_bytes -= item["size"]
     
     def get(self, key: str):
         """Cache'den al"""
         # 1. Bellek cache'ten kontrol et
-        if key in self.memory_cache:
-            item = self.memory_cache[key]
-            if time.time() - item["timestamp"] < self.ttl_seconds:
-                return item["data"]
-            else:
-                del self.memory_cache[key]
+        with self._lock:
+            item = self.memory_cache.get(key)
+            if item is not None:
+                if time.time() - item["timestamp"] < self.ttl_seconds:
+                    self.memory_cache.move_to_end(key)
+                    self.hits += 1
+                    return item["data"]
+                self._forget(key)
         
-        # 2. Disk cache'ten kontrol et
-        cache_path = self._get_cache_path(key)
-        if os.path.exists(cache_path):
-            try:
-                with open(cache_path, 'r') as f:
-                    item = json.load(f)
-                    if time.time() - item["timestamp"] < self.ttl_seconds:
-                        # Bellek cache'e kopyala
-                        self.memory_cache[key] = item
-                        return item["data"]
-                    else:
-                        os.remove(cache_path)
-            except:
-                pass
+        # 2. Disk cache'ten kontrol et (birincil anahtarla tek satır)
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT data, created_at FROM cache WHERE key_hash = ? AND expires_at > ?",
+                    (self._get_cache_key(key), time.time()),
+                ).fetchone()
+            if row is not None:
+                # Bellek cache'e kopyala
+                item = {"timestamp": row[1], "data": json.loads(row[0]), "size": len(row[0])}
+                with self._lock:
+                    self._remember(key, item)
+                    self.disk_hits += 1
+                return item["data"]
+        except Exception:
+            pass
         
+        with self._lock:
+            self.misses += 1
         return None
     
     def set(self, key: str, data):
         """Cache'e kaydet"""
+        payload = json.dumps(data)
         item = {
             "timestamp": time.time(),
-            "data": data
+            "data": data,
+            # Yaklaşık bellek boyutu: JSON uzunluğu (bir kez, set anında)
+            "size": len(payload)
         }
         
         # Bellek cache'e kaydet
-        self.memory_cache[key] = item
+        self._remember(key, item)
         
         # Disk cache'e kaydet
         try:
-            cache_path = self._get_cache_path(key)
-            with open(cache_path, 'w') as f:
-                json.dump(item, f)
-        except:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (key_hash, data, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                    (self._get_cache_key(key), payload,
+                     item["timestamp"], item["timestamp"] + self.ttl_seconds),
+                )
+        except Exception:
             pass
     
     def clear_expired(self):
@@ -160,31 +269,39 @@ class CacheManager:
         now = time.time()
         
         # Bellek cache
-        expired_keys = [k for k, v in self.memory_cache.items() 
-                       if now - v["timestamp"] > self.ttl_seconds]
-        for key in expired_keys:
-            del self.memory_cache[key]
+        with self._lock:
+            expired_keys = [k for k, v in self.memory_cache.items() 
+                           if now - v["timestamp"] > self.ttl_seconds]
+            for key in expired_keys:
+                self._forget(key)
         
-        # Disk cache
+        # Disk cache (expires_at indeksi üzerinden tek sorgu)
         try:
-            for filename in os.listdir(self.cache_dir):
-                filepath = os.path.join(self.cache_dir, filename)
-                try:
-                    with open(filepath, 'r') as f:
-                        item = json.load(f)
-                        if now - item["timestamp"] > self.ttl_seconds:
-                            os.remove(filepath)
-                except:
-                    pass
-        except:
+            with self._lock, self._conn:
+                self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        except Exception:
             pass
     
+    def close(self):
+        """Veritabanı bağlantısını kapat"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
     def get_memory_usage(self) -> dict:
-        """Bellek kullanımı"""
-        return {
-            "cached_items": len(self.memory_cache),
-            "estimated_size_mb": len(json.dumps(self.memory_cache)) / (1024 * 1024)
-        }
+        """Bellek kullanımı ve isabet/ıska/çıkarma sayaçları"""
+        with self._lock:
+            return {
+                "cached_items": len(self.memory_cache),
+                "estimated_size_mb": round(self.memory_bytes / (1024 * 1024), 3),
+                "max_items": self.max_items,
+                "max_size_mb": round(self.max_bytes / (1024 * 1024), 3),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
 
 
 class NewsAnalyzer:
@@ -234,9 +351,16 @@ class NewsAnalyzer:
     
     # Statik değişkenler
     _rate_limiter = RateLimiter(max_requests=100, period_hours=24)
-    _cache = CacheManager(cache_dir="cache/news", ttl_hours=24)
+    _cache = None
     _sentiment_analyzer = None
     
+    @classmethod
+    def _get_cache(cls) -> CacheManager:
+        """Haber cache'i (lazy load; config.NEWS_CACHE_DIR)"""
+        if cls._cache is None:
+            cls._cache = CacheManager(cache_dir=config.NEWS_CACHE_DIR, ttl_hours=24)
+        return cls._cache
+    
     @classmethod
     def _get_sentiment_analyzer(cls):
         """Sentiment analyzer (lazy load)"""
@@ -245,8 +369,14 @@ class NewsAnalyzer:
         return cls._sentiment_analyzer
     
     @staticmethod
-    def get_news(keyword: str, days_back: int = 1, use_cache: bool = True) -> list:
-        """NewsAPI'den haber çek (API-FIRST, cache fallback)"""
+    def get_news(keyword: str, days_back: int = 1, use_cache: bool = True, page_size: int = 5,
+                 sort_by: str = "publishedAt") -> list:
+        """NewsAPI'den haber çek (API-FIRST, cache fallback)
+
+        days_back=None ise tarih aralığı gönderilmez (en güncel haberler).
+        sort_by="relevancy" birleşik OR sorgularında tek konunun sayfayı
+        doldurmasını azaltır.
+        """
         
         cache_key = f"news_{keyword}_{days_back}"
         
@@ -260,43 +390,46 @@ class NewsAnalyzer:
             
             print(f"   🔑 API key mevcut ({len(api_key)} karakter)")
             
-            # Rate limit kontrolü (API çağrısından önce)
-            if not NewsAnalyzer._rate_limiter.can_request():
+            # Rate limit kontrolü (API çağrısından önce; eşzamanlı sorgular için
+            # kontrol ve kota ayırma tek adımda)
+            if not NewsAnalyzer._rate_limiter.try_acquire(keyword):
                 remaining = NewsAnalyzer._rate_limiter.requests_remaining()
                 print(f"   ⚠️  API LİMİT: {remaining} istek kaldı, cache fallback kullanılıyor")
                 if use_cache:
-                    return NewsAnalyzer._cache.get(cache_key) or []
+                    return NewsAnalyzer._get_cache().get(cache_key) or []
                 return []
             
             # API çağrısı yap (API-FIRST stratejisi)
-            to_date = datetime.now()
-            from_date = to_date - timedelta(days=days_back)
-            
-            url = "https://newsapi.org/v2/everything"
+            url = config.NEWS_API_URL
             params = {
                 "q": keyword,
-                "from": from_date.strftime("%Y-%m-%d"),
-                "to": to_date.strftime("%Y-%m-%d"),
-                "sortBy": "publishedAt",
+                "sortBy": sort_by,
                 "language": "en",
                 "apiKey": api_key,
-                "pageSize": 5
+                "pageSize": page_size
             }
+            if days_back is not None:
+                to_date = datetime.now()
+                from_date = to_date - timedelta(days=days_back)
+                params["from"] = from_date.strftime("%Y-%m-%d")
+                params["to"] = to_date.strftime("%Y-%m-%d")
             
-            print(f"   🌐 API isteği: {url}?q={keyword}&from={params['from']}&to={params['to']}")
+            print(f"   🌐 API isteği: {url}?q={keyword}&from={params.get('from', '-')}&to={params.get('to', '-')}")
             
-            response = requests.get(url, params=params, timeout=10)
+            # Her tekrar deneme de NewsAPI kotasından düşer → RateLimiter'dan ayrılır
+            response = get_http_client().get(
+                url, params=params, timeout=config.NEWS_API_TIMEOUT,
+                before_retry=lambda: NewsAnalyzer._rate_limiter.try_acquire(keyword),
+            )
             print(f"   📡 HTTP status: {response.status_code}")
             data = response.json()
             
-            NewsAnalyzer._rate_limiter.add_request(keyword)
-            
             if data.get("status") == "ok":
                 articles = data.get("articles", [])
                 print(f"   ✅ API'den {len(articles)} haber alındı: {keyword}")
                 
                 # Başarılı sonucu cache'e kaydet
-                NewsAnalyzer._cache.set(cache_key, articles)
+                NewsAnalyzer._get_cache().set(cache_key, articles)
                 
                 return articles
             else:
@@ -311,17 +444,17 @@ class NewsAnalyzer:
                 
                 # API başarısız → cache'e fallback
                 if use_cache:
-                    cached = NewsAnalyzer._cache.get(cache_key)
+                    cached = NewsAnalyzer._get_cache().get(cache_key)
                     if cached:
                         print(f"   💾 Cache fallback: {len(cached)} haber")
                         return cached
                 return []
         
         except requests.exceptions.Timeout:
-            print(f"   ⏱️  API timeout: {keyword} (10s)")
+            print(f"   ⏱️  API timeout: {keyword} ({config.NEWS_API_TIMEOUT}s)")
             # Timeout → cache fallback
             if use_cache:
-                cached = NewsAnalyzer._cache.get(cache_key)
+                cached = NewsAnalyzer._get_cache().get(cache_key)
                 if cached:
                     print(f"   💾 Timeout fallback: cache'den {len(cached)} haber")
                     return cached
@@ -331,6 +464,29 @@ class NewsAnalyzer:
             print(f"   ❌ API istek hatası [{type(e).__name__}]: {str(e)[:60]}")
             return []
     
+    @staticmethod
+    def fetch_news_batch(keywords: list, days_back: int = 1, use_cache: bool = True,
+                         page_size: int = 5, sort_by: str = "publishedAt") -> dict:
+        """
+        Birden çok sorguyu eşzamanlı çek.
+
+        Her sorgu get_news üzerinden gider (aynı RateLimiter kotası ve cache
+        fallback); en kötü durumda toplam süre N zaman aşımı yerine tek
+        zaman aşımıdır.
+
+        Returns:
+            {keyword: [makaleler]} (sorgu sırasıyla)
+        """
+        if not keywords:
+            return {}
+        workers = max(1, min(config.NEWS_FETCH_WORKERS, len(keywords)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                lambda keyword: NewsAnalyzer.get_news(keyword, days_back, use_cache, page_size, sort_by),
+                keywords,
+            )
+            return dict(zip(keywords, results))
+    
     @staticmethod
     def analyze_sentiment(text: str) -> float:
         """Sentiment analizi (VADER)"""
@@ -377,13 +533,30 @@ class NewsAnalyzer:
         try:
             # Cache kontrol – sadece önceki başarılı sonucu dön
             cache_key = f"sector_{sector}_{days_back}"
-            cached = NewsAnalyzer._cache.get(cache_key)
+            cached = NewsAnalyzer._get_cache().get(cache_key)
             if cached and cached.get("status") == "success":
                 return cached
             
             # Haber çek (API-FIRST)
             articles = NewsAnalyzer.get_news(sector, days_back, use_cache=True)
-            
+            return NewsAnalyzer.summarize_sector_news(sector, articles, days_back)
+        
+        except Exception as e:
+            print(f"   ❌ {sector.upper()}: {str(e)[:40]}")
+            return {
+                "sector": sector,
+                "articles_count": 0,
+                "sentiment_score": 0.0,
+                "sentiment": "neutral",
+                "articles": [],
+                "status": "error"
+            }
+    
+    @staticmethod
+    def summarize_sector_news(sector: str, articles: list, days_back: int = 1) -> dict:
+        """Sektör makalelerinden sentiment sonucu (başarılıysa cache'e yazılır)"""
+        
+        try:
             if not articles:
                 result = {
                     "sector": sector,
@@ -456,7 +629,7 @@ class NewsAnalyzer:
             }
             
             # Cache'e kaydet
-            NewsAnalyzer._cache.set(cache_key, result)
+            NewsAnalyzer._get_cache().set(f"sector_{sector}_{days_back}", result)
             return result
         
         except Exception as e:
@@ -485,6 +658,167 @@ class GlobalSectorAnalyzer:
         return NewsAnalyzer.SECTOR_MOODS_2026.copy()
 
 
+def _query_term(keyword: str) -> str:
+    """Anahtar kelime → NewsAPI sorgu terimi (çok kelimeli ise AND grubu)"""
+    words = keyword.split()
+    if len(words) == 1:
+        return words[0]
+    return "(" + " AND ".join(words) + ")"
+
+
+def plan_news_queries(topics: dict, max_length: int = None, max_terms: int = None) -> list:
+    """
+    Konu anahtar kelimelerini en az sayıda OR sorgusunda birleştir.
+
+    Args:
+        topics: {konu: [anahtar kelimeler]}
+        max_length: Sorgu başına karakter sınırı (NewsAPI q parametresi)
+        max_terms: Sorgu başına terim sınırı
+
+    Returns:
+        Sorgu metinleri listesi (tekrarlanan terimler bir kez)
+    """
+    max_length = max_length or config.NEWS_QUERY_MAX_LENGTH
+    max_terms = max_terms or config.NEWS_QUERY_MAX_TERMS
+    terms = list(dict.fromkeys(_query_term(kw) for keywords in topics.values() for kw in keywords))
+
+    queries = []
+    current = []
+    for term in terms:
+        if current and (len(current) >= max_terms or len(" OR ".join(current + [term])) > max_length):
+            queries.append(" OR ".join(current))
+            current = []
+        current.append(term)
+    if current:
+        queries.append(" OR ".join(current))
+    return queries
+
+
+def attribute_articles(articles: list, topics: dict) -> dict:
+    """
+    Birleşik sorgu makalelerini konulara yerel anahtar kelime eşleşmesiyle dağıt.
+
+    Bir makale başlık + açıklamasında konunun anahtar kelimelerinden biri
+    geçiyorsa (çok kelimelilerde tüm kelimeler, kelime sınırıyla) o konuya
+    atanır; aynı makale birden çok konuya girebilir.
+
+    Returns:
+        {konu: [makaleler]} (her konu anahtarı bulunur)
+    """
+    matchers = {
+        topic: [[re.compile(rf"\b{re.escape(word)}\b", re.IGNORECASE) for word in kw.split()]
+                for kw in keywords]
+        for topic, keywords in topics.items()
+    }
+    attributed = {topic: [] for topic in topics}
+    seen = set()
+
+    for article in articles:
+        identity = article.get("url") or article.get("title")
+        if identity in seen:
+            continue
+        seen.add(identity)
+
+        text = f"{article.get('title') or ''} {article.get('description') or ''}"
+        for topic, keyword_patterns in matchers.items():
+            if any(all(p.search(text) for p in patterns) for patterns in keyword_patterns):
+                attributed[topic].append(article)
+
+    return attributed
+
+
+def _fetch_geopolitical_news():
+    """Jeopolitik haberler (hata durumunda None)"""
+    try:
+        from global_market_analyzer import GeopoliticalNewsIntegration
+        return GeopoliticalNewsIntegration.get_geopolitical_news()
+    except Exception:
+        return None
+
+
+def _fetch_per_sector(days_back: int) -> tuple:
+    """Birincil sektör başına bir sorgu + jeopolitik sorgular (eşzamanlı)"""
+    remaining = NewsAnalyzer._rate_limiter.requests_remaining()
+    available_slots = min(len(NewsAnalyzer.PRIMARY_SECTORS), remaining)
+    print(f"   📊 API limit: {remaining}/100 istek mevcut, {available_slots} slot kullanılacak")
+    
+    # Sektör ve jeopolitik sorguları eşzamanlı: en kötü durumda tek zaman aşımı
+    sectors = list(NewsAnalyzer.PRIMARY_SECTORS.keys())[:available_slots]
+    with ThreadPoolExecutor(max_workers=len(sectors) + 1) as executor:
+        geo_future = executor.submit(_fetch_geopolitical_news)
+        sector_results = list(executor.map(
+            lambda sector: NewsAnalyzer.analyze_sector_news(sector, days_back), sectors))
+        geo_news = geo_future.result()
+    
+    return dict(zip(sectors, sector_results)), geo_news
+
+
+def _fetch_coalesced(days_back: int) -> tuple:
+    """
+    Tüm sektörler (birincil + ikincil) ve jeopolitik konular için birleşik
+    OR sorguları; makaleler konulara yerelde dağıtılır.
+
+    Cache'te başarılı sonucu olan konular sorguya eklenmez. Birleşik
+    sorgular alaka düzeyine göre sıralanır; hiç makale eşleşmeyen birincil
+    sektörler kendi anahtar kelimeleriyle tek tek yeniden sorgulanır
+    (NEWS_REQUERY_MAX, RateLimiter kotası ve sektör başına sorgu modunun
+    istek sayısı ile sınırlı).
+    """
+    from global_market_analyzer import GeopoliticalNewsIntegration
+    
+    results = {}
+    topics = {}
+    all_sectors = {**NewsAnalyzer.PRIMARY_SECTORS, **NewsAnalyzer.SECONDARY_SECTORS}
+    for sector, keywords in all_sectors.items():
+        cached = NewsAnalyzer._get_cache().get(f"sector_{sector}_{days_back}")
+        if cached and cached.get("status") == "success":
+            results[sector] = cached
+        else:
+            topics[sector] = keywords
+    
+    geo_key = f"geopolitical_{days_back}"
+    geo_news = NewsAnalyzer._get_cache().get(geo_key)
+    geo_topics = {} if geo_news else {kw: [kw] for kw in GeopoliticalNewsIntegration.KEYWORDS}
+    
+    if not topics and not geo_topics:
+        print("   💾 Tüm konular cache'ten, API sorgusu yok")
+        return results, geo_news
+    
+    all_topics = {**topics, **geo_topics}
+    queries = plan_news_queries(all_topics)
+    remaining = NewsAnalyzer._rate_limiter.requests_remaining()
+    print(f"   🔗 {len(all_topics)} konu → {len(queries)} birleşik sorgu (API limit: {remaining}/100)")
+    
+    fetched = NewsAnalyzer.fetch_news_batch(queries, days_back, page_size=config.NEWS_PAGE_SIZE,
+                                            sort_by="relevancy")
+    articles = [article for query in queries for article in fetched[query]]
+    matched = attribute_articles(articles, all_topics)
+    
+    # Sayfayı başka konular doldurduysa eşleşmesiz birincil sektörleri tek tek
+    # sorgula; toplam istek sektör başına sorgu modunu aşmaz
+    per_sector_calls = len(NewsAnalyzer.PRIMARY_SECTORS) + len(GeopoliticalNewsIntegration.KEYWORDS)
+    budget = min(config.NEWS_REQUERY_MAX, per_sector_calls - len(queries),
+                 NewsAnalyzer._rate_limiter.requests_remaining())
+    missing = [topic for topic in topics if topic in NewsAnalyzer.PRIMARY_SECTORS and not matched[topic]]
+    missing = missing[:max(0, budget)]
+    if missing:
+        print(f"   🔁 {len(missing)} birincil sektör eşleşmesiz, tek tek yeniden sorgulanıyor")
+        topic_queries = {topic: plan_news_queries({topic: all_topics[topic]})[0] for topic in missing}
+        refetched = NewsAnalyzer.fetch_news_batch(list(dict.fromkeys(topic_queries.values())), days_back)
+        for topic, query in topic_queries.items():
+            matched[topic] = attribute_articles(refetched[query], {topic: all_topics[topic]})[topic]
+    
+    for sector in topics:
+        results[sector] = NewsAnalyzer.summarize_sector_news(sector, matched[sector], days_back)
+    
+    if geo_topics:
+        geo_news = GeopoliticalNewsIntegration.select_news(matched) or None
+        if geo_news:
+            NewsAnalyzer._get_cache().set(geo_key, geo_news)
+    
+    return results, geo_news
+
+
 def analyze_news(days_back: int = 1) -> dict:
     """Ana haber analizi (ULTRA OPTİMİZE)"""
     
@@ -492,23 +826,25 @@ def analyze_news(days_back: int = 1) -> dict:
     
     sector_scores = {}
     
-    # ADIM 1: Primary sectors (sadece 4 sektör = max 4 API çağrısı)
+    # ADIM 1: Canlı haberler (birleşik OR sorguları veya birincil sektör başına sorgu)
     print("\n   🎯 Birincil Sektörler (API):")
     
-    remaining = NewsAnalyzer._rate_limiter.requests_remaining()
-    available_slots = min(len(NewsAnalyzer.PRIMARY_SECTORS), remaining)
-    print(f"   📊 API limit: {remaining}/100 istek mevcut, {available_slots} slot kullanılacak")
+    if config.NEWS_COALESCE_QUERIES:
+        live_results, geo_news = _fetch_coalesced(days_back)
+    else:
+        live_results, geo_news = _fetch_per_sector(days_back)
     
-    if available_slots > 0:
-        for sector in list(NewsAnalyzer.PRIMARY_SECTORS.keys())[:available_slots]:
-            result = NewsAnalyzer.analyze_sector_news(sector, days_back)
-            # Sadece başarılı API sonuçlarını kullan; başarısız olursa
-            # aşağıdaki fallback döngüsü manuel mood'u uygulayacak
-            if result.get("status") == "success":
-                sector_scores[sector] = result["sentiment_score"]
-                print(f"   ✅ {sector.upper():15s}: {result['sentiment_score']:+.3f} (API, {result.get('articles_count', 0)} haber)")
-            else:
-                print(f"   ⭕ {sector.upper():15s}: API verisi yok (status={result.get('status', 'error')}), manual mood kullanılacak")
+    for sector in NewsAnalyzer.PRIMARY_SECTORS.keys():
+        result = live_results.get(sector)
+        if result is None:
+            continue
+        # Sadece başarılı API sonuçlarını kullan; başarısız olursa
+        # aşağıdaki fallback döngüsü manuel mood'u uygulayacak
+        if result.get("status") == "success":
+            sector_scores[sector] = result["sentiment_score"]
+            print(f"   ✅ {sector.upper():15s}: {result['sentiment_score']:+.3f} (API, {result.get('articles_count', 0)} haber)")
+        else:
+            print(f"   ⭕ {sector.upper():15s}: API verisi yok (status={result.get('status', 'error')}), manual mood kullanılacak")
     
     # Boş kalan sektörleri manuel mood ile doldur
     # (API'den veri gelmeyenler veya API limiti aşılanlar için)
@@ -518,14 +854,20 @@ def analyze_news(days_back: int = 1) -> dict:
             sector_scores[sector] = mood
             print(f"   ⭕ {sector.upper():15s}: {mood:+.3f} (manual mood)")
     
-    # ADIM 2: Secondary sectors (hiç API çağrısı YOK)
-    print("\n   📊 İkincil Sektörler (Manual Mood):")
+    # ADIM 2: Secondary sectors (birleşik sorgudan eşleşen haber yoksa manuel mood)
+    print("\n   📊 İkincil Sektörler (API / Manual Mood):")
     
     for sector in NewsAnalyzer.SECONDARY_SECTORS.keys():
-        mood = GlobalSectorAnalyzer.get_sector_mood(sector)
+        result = live_results.get(sector) or {}
+        if result.get("status") == "success":
+            mood = result["sentiment_score"]
+            source = f"API, {result.get('articles_count', 0)} haber"
+        else:
+            mood = GlobalSectorAnalyzer.get_sector_mood(sector)
+            source = "manual mood"
         sector_scores[sector] = mood
         emoji = "🟢" if mood > 0.3 else "🔴" if mood < -0.2 else "🟡"
-        print(f"   {emoji} {sector.upper():20s}: {mood:+.3f}")
+        print(f"   {emoji} {sector.upper():20s}: {mood:+.3f} ({source})")
     
     # ADIM 3: Genel skor
     if sector_scores:
@@ -537,17 +879,14 @@ def analyze_news(days_back: int = 1) -> dict:
     # ADIM 4: Jeopolitik risk ve arz-talep analizi
     try:
         from macro_analyzer import MacroAnalyzer
-        from global_market_analyzer import GeopoliticalAnalyzer, GeopoliticalNewsIntegration
+        from global_market_analyzer import GeopoliticalAnalyzer
         all_articles = []
-        for sector in list(NewsAnalyzer.PRIMARY_SECTORS.keys()):
-            cache_key = f"sector_{sector}_{days_back}"
-            cached = NewsAnalyzer._cache.get(cache_key)
-            if cached and cached.get("articles"):
-                all_articles.extend(cached["articles"])
+        for result in live_results.values():
+            if result.get("status") == "success" and result.get("articles"):
+                all_articles.extend(result["articles"])
 
-        # Jeopolitik haberleri doğrudan API'den çek
+        # Jeopolitik haberler (sektör sorgularıyla birlikte çekildi)
         try:
-            geo_news = GeopoliticalNewsIntegration.get_geopolitical_news()
             if geo_news:
                 for news_item in geo_news:
                     all_articles.append({
@@ -621,7 +960,10 @@ def analyze_news(days_back: int = 1) -> dict:
     sector_count = len([k for k in sector_scores if k not in non_meta_keys])
     print(f"\n✅ {sector_count} sektör analiz edildi")
     print(f"   📊 API limit: {remaining}/100 istek kaldı")
-    print(f"   💾 Cache bellek: {NewsAnalyzer._cache.get_memory_usage()}")
+    print(f"   💾 Cache bellek: {NewsAnalyzer._get_cache().get_memory_usage()}")
+    for host, stats in get_http_client().get_stats().items():
+        print(f"   🌐 {host}: {stats['requests']} istek, ort. {stats['avg_latency']:.2f}s, "
+              f"{stats['errors']} hata, {stats['retries']} tekrar")
     print("\n   📈 Sektör Sentiment Özeti:")
     scored_sectors = [(k, v) for k, v in sector_scores.items()
                       if k not in non_meta_keys and isinstance(v, (int, float))]
@@ -658,7 +1000,7 @@ def get_worst_sectors(sector_scores: dict, top_n: int = 5) -> list:
 
 def clear_cache():
     """Cache'i temizle"""
-    NewsAnalyzer._cache.clear_expired()
+    NewsAnalyzer._get_cache().clear_expired()
     print("✅ Süresi geçen cache'ler temizlendi")
 
 
@@ -6,89 +6,572 @@
 # 2) 7, 14, 30 gün sonra gerçek sonuçları kontrol eder
 # 3) Başarı oranını hesaplar ve raporlar
 # 4) Hangi sinyallerin daha başarılı olduğunu analiz eder
+#
+# Veritabanı kalıcıdır (her açılışta silinmez). WAL modunda tek
+# bağlantı kullanılır; raporlar indeksli SQL sorgularıyla üretilir.
 # ============================================================
 
 import sqlite3
+import json
 import os
-from datetime import datetime
+import sys
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import config
+from backtest import load_history
+from portfolio_engine import signal_key
+
+
+# Raporlarda esas alınan değerlendirme süresi (gün)
+PRIMARY_HORIZON = 7
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recommendations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    entry_price REAL,
+    rating TEXT,
+    technical_score REAL,
+    final_score REAL,
+    sector TEXT,
+    support REAL,
+    resistance REAL,
+    risk_reward REAL,
+    signals TEXT,
+    created_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS performance_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recommendation_id INTEGER NOT NULL REFERENCES recommendations(id) ON DELETE CASCADE,
+    days INTEGER NOT NULL,
+    check_date TEXT,
+    exit_price REAL,
+    return_pct REAL,
+    max_price REAL,
+    min_price REAL,
+    hit_resistance INTEGER,
+    hit_support INTEGER,
+    outcome TEXT,
+    UNIQUE (recommendation_id, days)
+);
+
+CREATE TABLE IF NOT EXISTS statistics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    generated_at TEXT,
+    period_days INTEGER,
+    total_recommendations INTEGER,
+    total_checked INTEGER,
+    success_count INTEGER,
+    neutral_count INTEGER,
+    loss_count INTEGER,
+    win_rate REAL,
+    avg_return_pct REAL,
+    best_sector TEXT,
+    worst_sector TEXT
+);
+
+CREATE TABLE IF NOT EXISTS signal_statistics (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    days INTEGER NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    success INTEGER NOT NULL DEFAULT 0,
+    neutral INTEGER NOT NULL DEFAULT 0,
+    loss INTEGER NOT NULL DEFAULT 0,
+    return_sum REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, key, days)
+);
+
+CREATE INDEX IF NOT EXISTS idx_recommendations_date ON recommendations (date);
+CREATE INDEX IF NOT EXISTS idx_recommendations_ticker_date ON recommendations (ticker, date);
+CREATE INDEX IF NOT EXISTS idx_recommendations_sector ON recommendations (sector);
+CREATE INDEX IF NOT EXISTS idx_performance_days ON performance_results (days, recommendation_id);
+"""
+
+INSERT_RECOMMENDATION = """
+    INSERT INTO recommendations (
+        date, ticker, entry_price, rating, technical_score, final_score,
+        sector, support, resistance, risk_reward, signals, created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Sonuç geldikçe artımlı güncellenen sayaçlar (boyut, anahtar, süre)
+UPSERT_SIGNAL_STATISTICS = """
+    INSERT INTO signal_statistics (dimension, key, days, total, success, neutral, loss, return_sum)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (dimension, key, days) DO UPDATE SET
+        total = total + excluded.total,
+        success = success + excluded.success,
+        neutral = neutral + excluded.neutral,
+        loss = loss + excluded.loss,
+        return_sum = return_sum + excluded.return_sum
+"""
+
+# İstatistik boyutları
+STAT_DIMENSIONS = ("signal", "sector", "score_bucket")
+# Önbellekteki istatistiklere girmek için gereken minimum sonuç sayısı
+MIN_STAT_SAMPLES = 5
+
+# Eski şemadan (sadece date/ticker/entry_price/rating) yükseltmede eklenecek kolonlar
+RECOMMENDATION_COLUMNS = {
+    "technical_score": "REAL",
+    "final_score": "REAL",
+    "sector": "TEXT",
+    "support": "REAL",
+    "resistance": "REAL",
+    "risk_reward": "REAL",
+    "signals": "TEXT",
+    "created_at": "TEXT",
+}
+
+
+def classify_outcome(return_pct: float) -> str:
+    """Getiriyi sonuç etiketine çevir (PERFORMANS_REHBERI başarı kriterleri)"""
+    if return_pct >= 5:
+        return "SUCCESS"
+    elif return_pct >= 0:
+        return "NEUTRAL"
+    return "LOSS"
 
 
 class PerformanceTracker:
-    def __init__(self, db_path="performance.db"):
-        self.db_path = db_path
-        
-        # Eski DB'yi sil
-        if os.path.exists(self.db_path):
-            try:
-                os.remove(self.db_path)
-            except:
-                pass
-        
+    """
+    Kalıcı performans veritabanı.
+
+    Tracker başına tek SQLite bağlantısı açılır (WAL, thread'ler arası
+    kilitle paylaşılır); close() ile veya context manager olarak kapatılır.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or config.DATABASE_FILE
+        self._lock = threading.RLock()
+        self._stats_cache = {}
+
+        directory = os.path.dirname(os.path.abspath(self.db_path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+
         self.init_database()
-    
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Bağlantıyı kapat"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
     def init_database(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS recommendations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT,
-                ticker TEXT,
-                entry_price REAL,
-                rating TEXT
-            )
-        """)
-        
-        conn.commit()
-        conn.close()
-    
-    def save_recommendation(self, rec):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        """Tabloları ve indeksleri oluştur, eski şemayı yükselt"""
+        with self._lock:
+            existing = {row["name"] for row in self._conn.execute("PRAGMA table_info(recommendations)")}
+            if existing:
+                for column, kind in RECOMMENDATION_COLUMNS.items():
+                    if column not in existing:
+                        self._conn.execute(f"ALTER TABLE recommendations ADD COLUMN {column} {kind}")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+            # Sayaç tablosu sonradan eklendiyse mevcut sonuçlardan bir kez doldur
+            has_results = self._conn.execute("SELECT 1 FROM performance_results LIMIT 1").fetchone()
+            has_stats = self._conn.execute("SELECT 1 FROM signal_statistics LIMIT 1").fetchone()
+            if has_results and not has_stats:
+                self.rebuild_statistics()
+
+    # ─────────────────────────────────────────
+    # Kayıt
+    # ─────────────────────────────────────────
+
+    @staticmethod
+    def _recommendation_row(rec: dict, date: str, created_at: str) -> tuple:
+        """Öneri dict'ini INSERT parametrelerine çevir (fiyat yoksa/geçersizse None)"""
         entry_price = rec.get("price") or rec.get("current_price")
-        if entry_price is None:
-            conn.close()
-            return 0
-        
         try:
             entry_price = float(entry_price)
-        except:
-            conn.close()
-            return 0
-        
-        cursor.execute("""
-            INSERT INTO recommendations (date, ticker, entry_price, rating)
-            VALUES (?, ?, ?, ?)
-        """, (
-            datetime.now().strftime("%Y-%m-%d"),
+        except (TypeError, ValueError):
+            return None
+
+        return (
+            date,
             rec.get("ticker", "N/A"),
             entry_price,
-            rec.get("rating", "N/A")
-        ))
-        
-        rec_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return rec_id
-    
-    def check_performance(self, days_to_check):
-        return []
-    
-    def generate_report(self, days):
-        return {
+            rec.get("rating", "N/A"),
+            rec.get("technical_score"),
+            rec.get("final_score", rec.get("score")),
+            rec.get("sector"),
+            rec.get("support"),
+            rec.get("resistance"),
+            rec.get("reward_risk_ratio"),
+            json.dumps(rec.get("signals") or [], ensure_ascii=False),
+            created_at,
+        )
+
+    def save_recommendations(self, recs: list, date: str = None) -> list:
+        """
+        Bir çalışmanın tüm önerilerini tek işlemde kaydet.
+
+        Aynı hazırlanmış INSERT ifadesi paylaşılan bağlantıda tekrar
+        kullanılır; herhangi bir hata olursa hiçbir satır yazılmaz.
+
+        Returns:
+            Her öneri için kayıt id'si (fiyatı yok/geçersiz olanlar için 0)
+        """
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        created_at = datetime.now().isoformat(timespec="seconds")
+        rows = [self._recommendation_row(rec, date, created_at) for rec in recs]
+
+        ids = []
+        with self._lock, self._conn:
+            cursor = self._conn.cursor()
+            for row in rows:
+                if row is None:
+                    ids.append(0)
+                    continue
+                cursor.execute(INSERT_RECOMMENDATION, row)
+                ids.append(cursor.lastrowid)
+        return ids
+
+    def save_recommendation(self, rec: dict, date: str = None) -> int:
+        """
+        Tek öneriyi kaydet.
+
+        Returns:
+            Kayıt id'si (fiyat yoksa/geçersizse 0)
+        """
+        return self.save_recommendations([rec], date)[0]
+
+    # ─────────────────────────────────────────
+    # Sonuç kontrolü
+    # ─────────────────────────────────────────
+
+    def pending_checks(self, days: int, today: datetime = None) -> list:
+        """days gün önce (veya daha eski) yapılmış, henüz değerlendirilmemiş öneriler"""
+        today = today or datetime.now()
+        cutoff = (today - timedelta(days=days)).strftime("%Y-%m-%d")
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT r.id, r.date, r.ticker, r.entry_price, r.support, r.resistance,
+                       r.sector, r.final_score, r.signals
+                FROM recommendations r
+                LEFT JOIN performance_results p ON p.recommendation_id = r.id AND p.days = ?
+                WHERE r.date <= ? AND p.id IS NULL AND r.entry_price > 0
+                ORDER BY r.ticker, r.date
+            """, (days, cutoff)).fetchall()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def evaluate_ticker(recs: list, horizons: list, df) -> list:
+        """
+        Tek hissenin tüm bekleyen (öneri, süre) çiftlerini tek vektör geçişinde değerlendir.
+
+        Her çift için çıkış, öneri tarihinden days gün sonraki ilk işlem
+        günüdür; max/min fiyat ve destek/direnç teması giriş–çıkış
+        aralığındaki barlardan hesaplanır.
+
+        Args:
+            recs: pending_checks satırları
+            horizons: her satır için gün sayısı (recs ile aynı uzunlukta)
+            df: close/high/low DataFrame'i (DatetimeIndex)
+
+        Returns:
+            performance_results satırları (henüz vadesi gelmemiş/verisi olmayanlar hariç)
+        """
+        if df is None or df.empty or not recs:
+            return []
+
+        dates = df.index.values.astype("datetime64[D]")
+        close = df["close"].to_numpy(dtype=float)
+        high = df["high"].to_numpy(dtype=float) if "high" in df else close
+        low = df["low"].to_numpy(dtype=float) if "low" in df else close
+
+        start = np.array([r["date"] for r in recs], dtype="datetime64[D]")
+        days = np.asarray(horizons)
+        entry = np.array([r["entry_price"] for r in recs], dtype=float)
+        support = np.array([r.get("support") or np.nan for r in recs], dtype=float)
+        resistance = np.array([r.get("resistance") or np.nan for r in recs], dtype=float)
+
+        first = np.searchsorted(dates, start, side="left")
+        last = np.searchsorted(dates, start + days.astype("timedelta64[D]"), side="left")
+        # Hedef tarihe ulaşılmamış veya öneri tarihinden sonra hiç bar yok
+        ok = (last < len(dates)) & (first < len(dates))
+        if not ok.any():
+            return []
+
+        first, last = first[ok], last[ok]
+        # (çift × pencere) indeks matrisi ile aralık max/min
+        span = np.arange(int((last - first).max()) + 1)
+        idx = first[:, None] + span
+        inside = idx <= last[:, None]
+        idx = np.minimum(idx, len(dates) - 1)
+        max_price = np.where(inside, high[idx], -np.inf).max(axis=1)
+        min_price = np.where(inside, low[idx], np.inf).min(axis=1)
+        exit_price = close[last]
+        return_pct = (exit_price - entry[ok]) / entry[ok] * 100
+        hit_resistance = max_price >= resistance[ok]
+        hit_support = min_price <= support[ok]
+
+        rows = []
+        for k, i in enumerate(np.flatnonzero(ok)):
+            rows.append({
+                "recommendation_id": recs[i]["id"],
+                "days": int(days[i]),
+                "check_date": str(dates[last[k]]),
+                "exit_price": round(float(exit_price[k]), 4),
+                "return_pct": round(float(return_pct[k]), 2),
+                "max_price": round(float(max_price[k]), 4),
+                "min_price": round(float(min_price[k]), 4),
+                "hit_resistance": int(hit_resistance[k]),
+                "hit_support": int(hit_support[k]),
+                "outcome": classify_outcome(return_pct[k]),
+            })
+        return rows
+
+    def check_performance(self, days_to_check) -> list:
+        """
+        Bekleyen önerilerin 7/14/30 gün sonraki sonuçlarını hesapla ve kaydet.
+
+        Tüm bekleyen (öneri, süre) çiftleri hisse bazında gruplanır; fiyat
+        geçmişi tek toplu indirmeyle alınır, her hisse tek vektör geçişinde
+        değerlendirilir ve sonuçlar tek executemany işlemiyle yazılır.
+
+        Returns:
+            [{"ticker", "days", "return", "outcome"}, ...] (yeni hesaplananlar)
+        """
+        if isinstance(days_to_check, int):
+            days_to_check = [days_to_check]
+
+        today = datetime.now()
+        by_ticker = {}
+        for days in days_to_check:
+            for rec in self.pending_checks(days, today):
+                by_ticker.setdefault(rec["ticker"], []).append((rec, days))
+
+        if not by_ticker:
+            return []
+
+        earliest = min(rec["date"] for pairs in by_ticker.values() for rec, _ in pairs)
+        try:
+            prices = load_history(list(by_ticker), earliest, today.strftime("%Y-%m-%d"),
+                                  warmup_days=0, forward_days=1)
+        except Exception as e:
+            print(f"  ⚠️  Fiyat verisi alınamadı: {str(e)[:60]}")
+            return []
+
+        rows = []
+        meta = {}
+        for ticker, pairs in by_ticker.items():
+            evaluated = self.evaluate_ticker([rec for rec, _ in pairs], [days for _, days in pairs],
+                                             prices.get(ticker))
+            for rec, _ in pairs:
+                meta[rec["id"]] = rec
+            rows.extend(evaluated)
+
+        if not rows:
+            return []
+
+        with self._lock, self._conn:
+            self._conn.executemany("""
+                INSERT OR REPLACE INTO performance_results (
+                    recommendation_id, days, check_date, exit_price, return_pct,
+                    max_price, min_price, hit_resistance, hit_support, outcome
+                ) VALUES (:recommendation_id, :days, :check_date, :exit_price, :return_pct,
+                          :max_price, :min_price, :hit_resistance, :hit_support, :outcome)
+            """, rows)
+            # Sadece yeni sonuçların katkısı sayaçlara eklenir
+            self._conn.executemany(UPSERT_SIGNAL_STATISTICS, self._stat_increments(rows, meta))
+            self._stats_cache.clear()
+
+        return [
+            {"ticker": meta[row["recommendation_id"]]["ticker"], "days": row["days"],
+             "return": row["return_pct"], "outcome": row["outcome"]}
+            for row in rows
+        ]
+
+    # ─────────────────────────────────────────
+    # Sinyal / sektör / skor istatistikleri
+    # ─────────────────────────────────────────
+
+    @staticmethod
+    def _stat_keys(rec: dict) -> list:
+        """Bir önerinin katkı yaptığı (boyut, anahtar) çiftleri"""
+        keys = []
+        try:
+            signals = json.loads(rec.get("signals") or "[]")
+        except (TypeError, ValueError):
+            signals = []
+        for signal in dict.fromkeys(signal_key(s) for s in signals):
+            keys.append(("signal", signal))
+        if rec.get("sector"):
+            keys.append(("sector", rec["sector"]))
+        score = rec.get("final_score")
+        if score is not None:
+            low = int(score // 10 * 10)
+            keys.append(("score_bucket", f"{low}-{low + 10}"))
+        return keys
+
+    @classmethod
+    def _stat_increments(cls, rows: list, meta: dict) -> list:
+        """Sonuç satırlarını (boyut, anahtar, süre) sayaç artışlarına topla"""
+        totals = {}
+        for row in rows:
+            rec = meta[row["recommendation_id"]]
+            outcome = row["outcome"]
+            for dimension, key in cls._stat_keys(rec):
+                counts = totals.setdefault((dimension, key, row["days"]), [0, 0, 0, 0, 0.0])
+                counts[0] += 1
+                counts[1] += outcome == "SUCCESS"
+                counts[2] += outcome == "NEUTRAL"
+                counts[3] += outcome == "LOSS"
+                counts[4] += row["return_pct"]
+        return [(*key, *counts) for key, counts in totals.items()]
+
+    def rebuild_statistics(self):
+        """Sayaçları tüm geçmişten yeniden oluştur (tek seferlik/bakım)"""
+        with self._lock:
+            joined = self._conn.execute("""
+                SELECT p.recommendation_id, p.days, p.return_pct, p.outcome,
+                       r.id, r.sector, r.final_score, r.signals
+                FROM performance_results p
+                JOIN recommendations r ON r.id = p.recommendation_id
+            """).fetchall()
+            rows = [dict(row) for row in joined]
+            meta = {row["id"]: row for row in rows}
+            with self._conn:
+                self._conn.execute("DELETE FROM signal_statistics")
+                self._conn.executemany(UPSERT_SIGNAL_STATISTICS, self._stat_increments(rows, meta))
+            self._stats_cache.clear()
+
+    def get_statistics(self, dimension: str = "signal", days: int = PRIMARY_HORIZON,
+                       min_samples: int = MIN_STAT_SAMPLES) -> dict:
+        """
+        Boyut bazında başarı istatistikleri (önbellekli; yeni sonuçlar gelince yenilenir).
+
+        Returns:
+            {anahtar: {"total", "success", "win_rate", "avg_return"}}
+        """
+        cache_key = (dimension, days, min_samples)
+        cached = self._stats_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT key, total, success, return_sum
+                FROM signal_statistics
+                WHERE dimension = ? AND days = ? AND total >= ?
+            """, (dimension, days, min_samples)).fetchall()
+
+        stats = {
+            row["key"]: {
+                "total": row["total"],
+                "success": row["success"],
+                "win_rate": round(row["success"] / row["total"] * 100, 1),
+                "avg_return": round(row["return_sum"] / row["total"], 2),
+            }
+            for row in rows
+        }
+        self._stats_cache[cache_key] = stats
+        return stats
+
+    def get_signal_stats(self, days: int = PRIMARY_HORIZON) -> dict:
+        """PortfolioEngine.calculate_confidence için sinyal bazlı başarı oranları"""
+        return self.get_statistics("signal", days)
+
+    # ─────────────────────────────────────────
+    # Raporlama
+    # ─────────────────────────────────────────
+
+    def generate_report(self, days: int, horizon: int = PRIMARY_HORIZON) -> dict:
+        """
+        Son days gündeki önerilerin özet istatistikleri (horizon günlük sonuçlara göre).
+        Rapor statistics tablosuna da kaydedilir.
+        """
+        since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+
+        with self._lock:
+            totals = self._conn.execute("""
+                SELECT
+                    COUNT(*) AS total_recommendations,
+                    COUNT(p.id) AS total_checked,
+                    COALESCE(SUM(p.outcome = 'SUCCESS'), 0) AS success_count,
+                    COALESCE(SUM(p.outcome = 'NEUTRAL'), 0) AS neutral_count,
+                    COALESCE(SUM(p.outcome = 'LOSS'), 0) AS loss_count,
+                    AVG(p.return_pct) AS avg_return_pct
+                FROM recommendations r
+                LEFT JOIN performance_results p ON p.recommendation_id = r.id AND p.days = ?
+                WHERE r.date >= ?
+            """, (horizon, since)).fetchone()
+
+            sectors = self._conn.execute("""
+                SELECT r.sector AS sector, AVG(p.return_pct) AS avg_return
+                FROM recommendations r
+                JOIN performance_results p ON p.recommendation_id = r.id AND p.days = ?
+                WHERE r.date >= ? AND r.sector IS NOT NULL
+                GROUP BY r.sector
+                ORDER BY avg_return DESC
+            """, (horizon, since)).fetchall()
+
+        checked = totals["total_checked"]
+        report = {
             "period_days": days,
-            "total_recommendations": 0,
-            "win_rate": 0,
-            "avg_return_pct": 0,
-            "best_sector": "N/A",
-            "worst_sector": "N/A"
+            "total_recommendations": totals["total_recommendations"],
+            "total_checked": checked,
+            "success_count": totals["success_count"],
+            "neutral_count": totals["neutral_count"],
+            "loss_count": totals["loss_count"],
+            "win_rate": round(totals["success_count"] / checked * 100, 1) if checked else 0,
+            "avg_return_pct": round(totals["avg_return_pct"] or 0, 2),
+            "best_sector": sectors[0]["sector"] if sectors else "N/A",
+            "worst_sector": sectors[-1]["sector"] if sectors else "N/A",
         }
-    
-    def get_detailed_history(self, limit):
-        return []
+
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO statistics (
+                    generated_at, period_days, total_recommendations, total_checked,
+                    success_count, neutral_count, loss_count, win_rate, avg_return_pct,
+                    best_sector, worst_sector
+                ) VALUES (:generated_at, :period_days, :total_recommendations, :total_checked,
+                          :success_count, :neutral_count, :loss_count, :win_rate, :avg_return_pct,
+                          :best_sector, :worst_sector)
+            """, {**report, "generated_at": datetime.now().isoformat(timespec="seconds")})
+            self._conn.commit()
+
+        return report
+
+    def get_detailed_history(self, limit: int, horizon: int = PRIMARY_HORIZON) -> list:
+        """
+        Son limit öneri (yeniden eskiye), horizon günlük sonuçlarıyla.
+
+        Returns:
+            [{"date", "ticker", "entry_price", "rating", "score", "days_held",
+              "exit_price", "return_pct", "outcome"}, ...]
+        """
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT r.date, r.ticker, r.entry_price, r.rating, r.final_score AS score,
+                       p.days AS days_held, p.exit_price, p.return_pct, p.outcome
+                FROM recommendations r
+                LEFT JOIN performance_results p ON p.recommendation_id = r.id AND p.days = ?
+                ORDER BY r.date DESC, r.id DESC
+                LIMIT ?
+            """, (horizon, limit)).fetchall()
+        return [dict(row) for row in rows]
 
 
 def generate_performance_email(report, history):
@@ -1,6 +1,136 @@
 import math
+import re
 from typing import List, Dict
 
+import numpy as np
+import pandas as pd
+
+import config
+from price_store import get_price_store
+
+
+ALLOCATION_MODES = ("confidence", "risk_parity", "min_variance")
+
+# Kovaryans tahmini için bir hissede gereken minimum getiri sayısı
+MIN_RETURN_OBSERVATIONS = 20
+# Bu örneklem varyansının altındaki getiri serisi sabit sayılır (işlem durdurma)
+MIN_RETURN_VARIANCE = 1e-10
+
+
+def signal_key(signal: str) -> str:
+    """Sinyal metnindeki sayısal değerleri at (örn. "RSI 28.4 → ..." → "RSI # → ...")"""
+    return re.sub(r"[+-]?\d+(?:\.\d+)?%?", "#", signal)
+
+
+def ledoit_wolf_covariance(returns: np.ndarray) -> tuple:
+    """
+    Ledoit-Wolf büzülmeli kovaryans (hedef: ölçekli birim matris).
+
+    Args:
+        returns: (gün × hisse) getiri matrisi; NaN'lar sütun ortalamasıyla doldurulur
+
+    Returns:
+        (kovaryans matrisi, büzülme katsayısı 0-1)
+    """
+    X = np.asarray(returns, dtype=float)
+    X = X - np.nanmean(X, axis=0)
+    X = np.where(np.isnan(X), 0.0, X)
+    T, N = X.shape
+
+    emp_cov = X.T @ X / T
+    X2 = X ** 2
+    emp_cov_trace = X2.sum(axis=0) / T
+    mu = emp_cov_trace.sum() / N
+
+    beta_ = np.sum(X2.T @ X2)
+    delta_ = np.sum(emp_cov ** 2)
+    beta = (beta_ / T - delta_) / (N * T)
+    delta = (delta_ - 2 * mu * emp_cov_trace.sum() + N * mu ** 2) / N
+    beta = min(beta, delta)
+    shrinkage = 0.0 if beta == 0 else beta / delta
+
+    cov = (1 - shrinkage) * emp_cov
+    cov[np.diag_indices(N)] += shrinkage * mu
+    return cov, shrinkage
+
+
+def risk_parity_weights(cov: np.ndarray, budget: np.ndarray = None, tol: float = 1e-10,
+                        max_iter: int = 100) -> np.ndarray:
+    """
+    Risk bütçeleme ağırlıkları: her hissenin toplam riske katkısı budget ile orantılı.
+
+    min ½·yᵀΣy − Σ bᵢ·log(yᵢ) problemi Newton adımlarıyla çözülür
+    (her adım tek doğrusal sistem), w = y / Σy.
+    """
+    N = len(cov)
+    b = np.full(N, 1.0 / N) if budget is None else np.asarray(budget, dtype=float) / np.sum(budget)
+    y = b / np.sqrt(np.diag(cov))
+
+    for _ in range(max_iter):
+        grad = cov @ y - b / y
+        if np.max(np.abs(grad * y)) < tol:
+            break
+        hess = cov + np.diag(b / y ** 2)
+        step = np.linalg.solve(hess, grad)
+        t = 1.0
+        # Pozitiflik korunana kadar adımı küçült
+        while np.any(y - t * step <= 0):
+            t *= 0.5
+        y = y - t * step
+
+    return y / y.sum()
+
+
+def min_variance_weights(cov: np.ndarray, max_iter: int = 50) -> np.ndarray:
+    """
+    Açığa satışsız minimum varyans ağırlıkları.
+
+    Aktif küme yöntemi: Σ⁻¹·1 çözümünde negatif çıkan hisseler kümeden
+    atılır ve kalanlar için yeniden çözülür.
+    """
+    N = len(cov)
+    active = np.ones(N, dtype=bool)
+    weights = np.zeros(N)
+
+    for _ in range(max_iter):
+        sub = cov[np.ix_(active, active)]
+        w = np.linalg.solve(sub, np.ones(active.sum()))
+        if np.all(w >= 0):
+            weights[:] = 0
+            weights[active] = w / w.sum()
+            return weights
+        idx = np.flatnonzero(active)
+        active[idx[w < 0]] = False
+
+    weights[active] = 1.0 / active.sum()
+    return weights
+
+
+def build_return_panel(recommendations: List[Dict], lookback: int = None) -> pd.DataFrame:
+    """
+    Önerilerin günlük getiri paneli (tarih × ticker).
+
+    Önerideki "dataframe" varsa o, yoksa yerel fiyat deposu kullanılır
+    (ağ isteği yapılmaz). Verisi olmayan hisseler sütun olarak yer almaz.
+    """
+    lookback = lookback or config.PORTFOLIO_COVARIANCE_LOOKBACK
+    closes = {}
+    for rec in recommendations:
+        ticker = rec.get("ticker")
+        df = rec.get("dataframe")
+        if df is None:
+            try:
+                df = get_price_store().load(ticker, tail=lookback + 1)
+            except Exception:
+                df = None
+        if df is not None and "close" in df and len(df) > 1:
+            closes[ticker] = df["close"].iloc[-(lookback + 1):]
+
+    if not closes:
+        return pd.DataFrame()
+    return pd.DataFrame(closes).sort_index().pct_change(fill_method=None).iloc[1:]
+
+
 class PortfolioEngine:
     """
     Adaptive Risk + Allocation + System Strength Engine
@@ -26,8 +156,9 @@ class PortfolioEngine:
             weights = []
 
             for sig in signals:
-                if sig in signal_stats:
-                    weights.append(signal_stats[sig]["win_rate"] / 100)
+                key = signal_key(sig)
+                if key in signal_stats:
+                    weights.append(signal_stats[key]["win_rate"] / 100)
 
             if weights:
                 win_rate_weight = sum(weights) / len(weights)
@@ -73,24 +204,28 @@ class PortfolioEngine:
     # ---------------------------------------------------
     # 4️⃣ PORTFOLIO ALLOCATION
     # ---------------------------------------------------
-    def allocate_portfolio(self, recommendations: List[Dict], regime: str) -> Dict:
+    def allocate_portfolio(self, recommendations: List[Dict], regime: str, signal_stats: Dict = None,
+                           mode: str = None, returns: pd.DataFrame = None) -> Dict:
 
+        mode = mode or config.PORTFOLIO_ALLOCATION_MODE
         cash_ratio = self.determine_cash_ratio(regime)
         investable_capital = self.total_capital * (1 - cash_ratio)
 
         # confidence hesapla
         for rec in recommendations:
-            rec["confidence"] = self.calculate_confidence(rec)
+            rec["confidence"] = self.calculate_confidence(rec, signal_stats)
 
-        total_confidence = sum(r["confidence"] for r in recommendations if r["confidence"] > 0)
+        weights = None
+        if mode in ("risk_parity", "min_variance") and len(recommendations) > 1:
+            weights = self.covariance_weights(recommendations, mode, returns)
+        if weights is None:
+            mode = "confidence"
+            weights = self.confidence_weights(recommendations)
 
         allocations = []
 
-        for rec in recommendations:
-            if total_confidence == 0:
-                weight = 0
-            else:
-                weight = rec["confidence"] / total_confidence
+        for rec, weight in zip(recommendations, weights):
+            weight = float(weight)
 
             allocation_amount = investable_capital * weight
 
@@ -112,9 +247,66 @@ class PortfolioEngine:
         return {
             "cash_ratio_pct": round(cash_ratio * 100, 2),
             "cash_amount": round(self.total_capital * cash_ratio, 2),
+            "allocation_mode": mode,
             "positions": allocations
         }
 
+    # ---------------------------------------------------
+    # 4️⃣b AĞIRLIK YÖNTEMLERİ
+    # ---------------------------------------------------
+    def confidence_weights(self, recommendations: List[Dict]) -> np.ndarray:
+
+        confidence = np.array([rec["confidence"] for rec in recommendations], dtype=float)
+        total_confidence = confidence[confidence > 0].sum()
+
+        if total_confidence == 0:
+            return np.zeros(len(recommendations))
+
+        return confidence / total_confidence
+
+    def covariance_weights(self, recommendations: List[Dict], mode: str,
+                           returns: pd.DataFrame = None) -> np.ndarray:
+        """
+        Büzülmeli kovaryansla risk paritesi / minimum varyans ağırlıkları,
+        güven skoruyla eğilimli. Getiri verisi yetersizse None (güven moduna düşer).
+        """
+        tickers = [rec.get("ticker") for rec in recommendations]
+        if returns is None:
+            returns = build_return_panel(recommendations)
+        if returns is None or returns.empty:
+            return None
+
+        panel = returns.reindex(columns=tickers)
+        counts = panel.notna().sum().to_numpy()
+        # Sabit getirili (işlemi durdurulmuş) hisseler de verisiz sayılır; sıfır
+        # varyans çözücüde sınırsız ağırlık alır
+        variance = panel.var().fillna(0).to_numpy()
+        known = (counts >= MIN_RETURN_OBSERVATIONS) & (variance > MIN_RETURN_VARIANCE)
+        if known.sum() < 2:
+            return None
+
+        cov = np.zeros((len(tickers), len(tickers)))
+        sub, _ = ledoit_wolf_covariance(panel.loc[:, known].to_numpy())
+        cov[np.ix_(known, known)] = sub
+        # Verisi olmayan / sabit getirili hisseler: medyan varyans, sıfır korelasyon
+        cov[~known, ~known] = np.median(np.diag(sub))
+
+        confidence = np.clip(np.array([rec["confidence"] for rec in recommendations], dtype=float), 0, None)
+        if confidence.sum() == 0:
+            return np.zeros(len(recommendations))
+        tilt = confidence / confidence.mean()
+        positive = tilt > 0
+        weights = np.zeros(len(recommendations))
+
+        if mode == "risk_parity":
+            # Güven skoru risk bütçesi olarak kullanılır
+            weights[positive] = risk_parity_weights(cov[np.ix_(positive, positive)], tilt[positive])
+        else:
+            base = min_variance_weights(cov[np.ix_(positive, positive)]) * tilt[positive]
+            weights[positive] = base / base.sum() if base.sum() > 0 else 0
+
+        return weights
+
     # ---------------------------------------------------
     # 5️⃣ SYSTEM STRENGTH SCORE
     # ---------------------------------------------------
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# ============================================================
+# portfolio_simulator.py — Olay Güdümlü Portföy Simülasyonu
+# ============================================================
+# Backtest motorunun günlük seçimlerini PortfolioEngine'e verir ve
+# portföyü gün gün işletir: ATR stopları, süre dolumu çıkışları,
+# nakit ve sermaye eğrisi. Pozisyon defteri hisse başına NumPy
+# dizileridir; stop kontrolleri her gün tek vektör işlemidir.
+#
+# Varsayımlar:
+#   - Motorda açılış fiyatı yok; stop gün içi dip stop seviyesine indiyse
+#     min(stop, kapanış) ile dolar. Bar tamamen stopun altındaysa (boşluklu
+#     açılış) çıkış kapanıştan yapılır (iyimser stop/en yüksek yerine ihtiyatlı)
+#   - Kovaryans modlarında getiri paneli yalnızca o güne kadarki
+#     kapanışlardan kurulur (ileriye bakma yok)
+#
+# Kullanım:
+#   python backtest.py --days 1095 --portfolio
+# ============================================================
+
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import config
+from portfolio_engine import PortfolioEngine
+from backtest import (
+    BacktestEngine, load_history, max_drawdown,
+    TOP_N, MIN_SCORE, TECH_WEIGHT, HORIZON_BARS,
+)
+
+
+# Başlangıç sermayesi
+INITIAL_CAPITAL = 100000
+# Aynı anda açık tutulabilecek en fazla pozisyon
+MAX_OPEN_POSITIONS = 10
+# İşlem başına komisyon (tutarın oranı)
+COMMISSION_RATE = 0.0
+# Yıllık işlem günü (Sharpe ve devir hızı yıllıklandırması)
+TRADING_DAYS = 252
+
+# Piyasa genişliği (uzun SMA üstündeki hisse oranı) → rejim
+REGIME_BREADTH = [
+    (0.70, "STRONG_BULL"),
+    (0.55, "BULL"),
+    (0.45, "NEUTRAL"),
+    (0.30, "BEAR"),
+]
+
+
+def classify_regime(breadth: float) -> str:
+    """Uzun SMA üstündeki hisse oranından piyasa rejimi"""
+    if np.isnan(breadth):
+        return "NEUTRAL"
+    for threshold, regime in REGIME_BREADTH:
+        if breadth >= threshold:
+            return regime
+    return "CRISIS"
+
+
+class PortfolioSimulator:
+    """
+    Gün adımlı portföy simülatörü.
+
+    Her işlem günü:
+      1. Açık pozisyonlarda stop (gün içi dip ≤ stop) ve süre dolumu kontrolü
+      2. Günün seçimleri allocate_portfolio ile boyutlandırılır
+         (sermaye = güncel özsermaye, rejime göre nakit oranı korunur)
+      3. Özsermaye kapanış fiyatlarıyla değerlenir
+    """
+
+    def __init__(self, engine: BacktestEngine, portfolio: PortfolioEngine = None,
+                 initial_capital: float = INITIAL_CAPITAL, max_positions: int = MAX_OPEN_POSITIONS,
+                 commission: float = COMMISSION_RATE):
+        self.engine = engine
+        self.portfolio = portfolio or PortfolioEngine(initial_capital)
+        self.initial_capital = initial_capital
+        self.max_positions = max_positions
+        self.commission = commission
+
+        # Eksik günlerde son bilinen fiyatla değerleme
+        self.mark = pd.DataFrame(engine.close).ffill().to_numpy()
+
+        # Piyasa genişliği: geçerli hisselerde kapanış > uzun SMA oranı
+        valid = engine.valid & (engine.sma_long > 0)
+        above = (engine.close > engine.sma_long) & valid
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.breadth = above.sum(axis=1) / valid.sum(axis=1)
+
+    def run(self, start: str, end: str, top_n: int = TOP_N, min_score: float = MIN_SCORE,
+            tech_weight: float = TECH_WEIGHT, horizon: int = HORIZON_BARS, regime: str = None) -> dict:
+        """
+        Args:
+            regime: Sabit rejim (örn. "BULL"); None ise her gün piyasa genişliğinden
+
+        Returns:
+            {"equity_curve": pd.Series, "trades": [...], "positions": açık pozisyonlar,
+             "metrics": {...}}
+        """
+        engine = self.engine
+        rows = engine.test_rows(start, end)
+        N = len(engine.tickers)
+
+        # Pozisyon defteri (hisse başına tek pozisyon)
+        shares = np.zeros(N)
+        entry_price = np.zeros(N)
+        stop_price = np.zeros(N)
+        entry_bar = np.zeros(N, dtype=np.int64)
+        entry_row = np.zeros(N, dtype=np.int64)
+
+        cash = float(self.initial_capital)
+        traded_value = 0.0
+        trades = []
+        equity = np.empty(len(rows))
+
+        if len(rows) == 0 or N == 0:
+            return {"equity_curve": pd.Series(dtype=float), "trades": [], "positions": [],
+                    "metrics": self._metrics(equity, trades, 0.0)}
+
+        final, picks, picked = engine.daily_picks(rows, top_n, min_score, tech_weight)
+
+        def close_positions(cols, prices, row, reason):
+            nonlocal cash, traded_value
+            for col, price in zip(cols, prices):
+                value = shares[col] * price
+                cash += value - value * self.commission
+                traded_value += value
+                trades.append({
+                    "ticker": engine.tickers[col],
+                    "entry_date": engine.index[entry_row[col]].strftime("%Y-%m-%d"),
+                    "exit_date": engine.index[row].strftime("%Y-%m-%d"),
+                    "entry": float(entry_price[col]),
+                    "exit": float(price),
+                    "shares": int(shares[col]),
+                    "return": float((price - entry_price[col]) / entry_price[col] * 100),
+                    "reason": reason,
+                })
+            shares[cols] = 0
+
+        for r, row in enumerate(rows):
+            held = shares > 0
+            traded_today = engine.valid[row] & held
+
+            # 1) Stop: gün içi dip stop seviyesine indiyse; boşluklu barda kapanıştan
+            hit = traded_today & (engine.low[row] <= stop_price)
+            if hit.any():
+                cols = np.flatnonzero(hit)
+                close_positions(cols, np.minimum(stop_price[cols], engine.close[row, cols]), row, "STOP")
+
+            # 2) Süre dolumu: hissenin kendi horizon işlem günü sonunda kapanıştan
+            expired = traded_today & ~hit & (engine.bars[row] - entry_bar >= horizon)
+            if expired.any():
+                cols = np.flatnonzero(expired)
+                close_positions(cols, engine.close[row, cols], row, "TIME")
+
+            # 3) Yeni seçimler
+            held = shares > 0
+            equity_now = cash + float(np.nansum(shares * self.mark[row]))
+            candidates = [c for c, ok in zip(picks[r], picked[r]) if ok and not held[c]]
+            candidates = candidates[:max(0, self.max_positions - int(held.sum()))]
+
+            if candidates:
+                recs = []
+                for col in candidates:
+                    price = float(engine.close[row, col])
+                    atr = float(engine.atr[row, col])
+                    recs.append({
+                        "ticker": engine.tickers[col],
+                        "price": price,
+                        "atr": atr,
+                        "final_score": float(final[r, col]),
+                        "volatility": atr / price * 100 if atr > 0 else 5,
+                    })
+
+                day_regime = regime or classify_regime(self.breadth[row])
+                self.portfolio.total_capital = equity_now
+                allocation = self.portfolio.allocate_portfolio(
+                    recs, day_regime, returns=self._returns_until(row, candidates))
+                # Rejim nakit oranı kadar nakit her zaman korunur
+                spendable = cash - allocation["cash_amount"]
+
+                for col, pos in zip(candidates, allocation["positions"]):
+                    price = pos["entry_price"]
+                    # Ağırlık payı, risk bütçesi (ATR stop) ve mevcut nakit ile sınırla
+                    qty = min(int(pos["allocation_amount"] // price), pos["shares"],
+                              int(max(spendable, 0) // (price * (1 + self.commission))))
+                    if qty <= 0 or pos["stop_price"] >= price:
+                        continue
+                    cost = qty * price
+                    cash -= cost + cost * self.commission
+                    spendable -= cost + cost * self.commission
+                    traded_value += cost
+                    shares[col] = qty
+                    entry_price[col] = price
+                    stop_price[col] = pos["stop_price"]
+                    entry_bar[col] = engine.bars[row, col]
+                    entry_row[col] = row
+
+            equity[r] = cash + float(np.nansum(shares * self.mark[row]))
+
+        last = rows[-1]
+        positions = [
+            {"ticker": engine.tickers[col], "shares": int(shares[col]), "entry": float(entry_price[col]),
+             "stop": float(stop_price[col]), "value": float(shares[col] * self.mark[last, col])}
+            for col in np.flatnonzero(shares > 0)
+        ]
+        curve = pd.Series(equity, index=engine.index[rows])
+        return {"equity_curve": curve, "trades": trades, "positions": positions,
+                "metrics": self._metrics(equity, trades, traded_value)}
+
+    def _returns_until(self, row: int, cols: list) -> pd.DataFrame:
+        """
+        Kovaryans modları için o güne kadarki (row dahil) getiri paneli.
+
+        Güven modunda None: allocate_portfolio fiyat deposuna hiç bakmaz.
+        """
+        if config.PORTFOLIO_ALLOCATION_MODE not in ("risk_parity", "min_variance"):
+            return None
+        start = max(0, row - config.PORTFOLIO_COVARIANCE_LOOKBACK)
+        closes = pd.DataFrame(self.engine.close[start:row + 1, cols],
+                              columns=[self.engine.tickers[c] for c in cols])
+        return closes.pct_change(fill_method=None).iloc[1:]
+
+    def _metrics(self, equity: np.ndarray, trades: list, traded_value: float) -> dict:
+        """Sharpe, maksimum düşüş, devir hızı ve işlem istatistikleri"""
+        if len(equity) == 0:
+            return {"final_equity": self.initial_capital, "total_return": 0.0, "sharpe": 0.0,
+                    "max_drawdown": 0.0, "turnover": 0.0, "trades": 0, "win_rate": 0.0, "stop_exits": 0}
+
+        curve = np.concatenate([[self.initial_capital], equity])
+        daily = np.diff(curve) / curve[:-1]
+        std = daily.std(ddof=1) if len(daily) > 1 else 0.0
+        sharpe = daily.mean() / std * np.sqrt(TRADING_DAYS) if std > 0 else 0.0
+
+        years = len(equity) / TRADING_DAYS
+        # Yıllık devir hızı: alım + satım tutarının yarısı / ortalama özsermaye
+        turnover = (traded_value / 2) / curve.mean() / years if years > 0 else 0.0
+
+        wins = [t for t in trades if t["return"] > 0]
+        return {
+            "final_equity": round(float(equity[-1]), 2),
+            "total_return": round(float((equity[-1] / self.initial_capital - 1) * 100), 2),
+            "sharpe": round(float(sharpe), 2),
+            "max_drawdown": round(float(max_drawdown(daily * 100)), 2),
+            "turnover": round(float(turnover), 2),
+            "trades": len(trades),
+            "win_rate": round(len(wins) / len(trades) * 100, 1) if trades else 0.0,
+            "stop_exits": len([t for t in trades if t["reason"] == "STOP"]),
+        }
+
+
+def run_portfolio_simulation(start_date: str, end_date: str, tickers: list = None, frames: dict = None,
+                             initial_capital: float = INITIAL_CAPITAL, top_n: int = TOP_N,
+                             horizon: int = HORIZON_BARS, regime: str = None) -> dict:
+    """Geçmişi indir (frames yoksa), portföyü simüle et ve özeti yazdır"""
+    if tickers is None:
+        tickers = config.ALL_STOCKS
+
+    started = time.perf_counter()
+    if frames is None:
+        print(f"\n  📥 Geçmiş veriler indiriliyor (hisse başına tek sefer)...")
+        frames = load_history(tickers, start_date, end_date, forward_days=horizon * 2 + 1)
+    frames = {t: frames[t] for t in tickers if t in frames}
+
+    simulator = PortfolioSimulator(BacktestEngine(frames), initial_capital=initial_capital)
+    result = simulator.run(start_date, end_date, top_n=top_n, horizon=horizon, regime=regime)
+    metrics = result["metrics"]
+
+    print("\n" + "=" * 70)
+    print("  💼 PORTFÖY SİMÜLASYONU")
+    print("=" * 70)
+    print(f"\n     Başlangıç Sermayesi : {initial_capital:,.0f}")
+    print(f"     Son Özsermaye       : {metrics['final_equity']:,.0f} ({metrics['total_return']:+.2f}%)")
+    print(f"     Sharpe Oranı        : {metrics['sharpe']:.2f}")
+    print(f"     Maksimum Düşüş      : {metrics['max_drawdown']:.2f}%")
+    print(f"     Yıllık Devir Hızı   : {metrics['turnover']:.2f}x")
+    print(f"     İşlem / Başarı      : {metrics['trades']} / {metrics['win_rate']:.1f}%")
+    print(f"     Stop ile Çıkış      : {metrics['stop_exits']}")
+    print(f"  ⏱️  Süre: {time.perf_counter() - started:.1f} saniye")
+
+    return result
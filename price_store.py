@@ -0,0 +1,254 @@
+# ============================================================
+# price_store.py — Yerel OHLCV Deposu (v1)
+# ============================================================
+# Her sembol için bir NumPy dosyası (memory-mapped okuma)
+# İlk çalıştırmada tam geçmiş indirilir, sonraki çalıştırmalarda
+# sadece son kayıtlı tarihten itibaren eksik barlar çekilip eklenir.
+# Örtüşen tamamlanmış barın kapanışı değişmişse (bölünme/temettü ile
+# Yahoo geçmişi yeniden ölçeklemiş) kayıt atılıp tam geçmiş indirilir.
+# ============================================================
+
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import yfinance as yf
+except ImportError:
+    import subprocess
+    subprocess.run(["pip", "install", "yfinance"], check=True)
+    import yfinance as yf
+
+import config
+
+
+def normalize_download(raw) -> pd.DataFrame:
+    """yfinance çıktısını depo formatına çevir (open/high/low/close/volume)"""
+    if raw is None or len(raw) == 0:
+        return None
+
+    df = raw.copy()
+    if isinstance(df, pd.Series):
+        df = df.to_frame()
+
+    # Handle yfinance MultiIndex columns (v0.2.31+)
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    df.columns = [str(c).lower().replace(" ", "_") for c in df.columns]
+
+    if "close" not in df.columns:
+        return None
+
+    df = df.reindex(columns=PriceStore.COLUMNS)
+    for col in PriceStore.COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df = df.dropna(subset=["close"])
+
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df.index = index.normalize()
+
+    return df
+
+
+class PriceStore:
+    """Yerel OHLCV Deposu (sembol başına .npy)"""
+
+    COLUMNS = ["open", "high", "low", "close", "volume"]
+
+    def __init__(self, store_dir: str = None, refresh_hours: float = None):
+        self.store_dir = store_dir or config.PRICE_STORE_DIR
+        if refresh_hours is None:
+            refresh_hours = config.PRICE_STORE_REFRESH_HOURS
+        self.refresh_seconds = refresh_hours * 3600
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    def _path(self, ticker: str) -> str:
+        """Sembol dosya yolu (=, ^ gibi karakterler güvenli hale getirilir)"""
+        safe = re.sub(r"[^A-Za-z0-9._-]", "_", ticker)
+        return os.path.join(self.store_dir, f"{safe}.npy")
+
+    def load(self, ticker: str, tail: int = None, days: int = None) -> pd.DataFrame:
+        """
+        Kayıtlı barları oku.
+
+        tail: sadece son N bar kopyalanır.
+        days: sadece son bardan geriye days takvim günü (yfinance period="Nd"
+              ile aynı birim; tam indirmeyle aynı pencere).
+        """
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            arr = np.load(path, mmap_mode="r")
+        except Exception:
+            return None
+
+        if arr.ndim != 2 or len(arr) == 0:
+            return None
+        if tail is not None:
+            arr = arr[-tail:]
+        if days is not None:
+            arr = arr[np.searchsorted(arr[:, 0], arr[-1, 0] - days):]
+
+        arr = np.array(arr)
+        index = pd.to_datetime(arr[:, 0].astype("int64"), unit="D")
+        return pd.DataFrame(arr[:, 1:], index=index, columns=self.COLUMNS)
+
+    def save(self, ticker: str, df: pd.DataFrame):
+        """Barları atomik olarak diske yaz"""
+        df = df.sort_index()
+        days = (pd.DatetimeIndex(df.index).normalize() - pd.Timestamp("1970-01-01")).days
+        arr = np.column_stack([
+            np.asarray(days, dtype="float64"),
+            df.reindex(columns=self.COLUMNS).to_numpy(dtype="float64"),
+        ])
+
+        path = self._path(ticker)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, arr)
+        os.replace(tmp_path, path)
+
+    def merge(self, ticker: str, new_df: pd.DataFrame) -> pd.DataFrame:
+        """Yeni barları mevcut kayda ekle (aynı tarih varsa yeni veri geçerli)"""
+        stored = self.load(ticker)
+        if stored is None:
+            combined = new_df
+        elif new_df is None or new_df.empty:
+            combined = stored
+        else:
+            combined = pd.concat([stored, new_df])
+            combined = combined[~combined.index.duplicated(keep="last")]
+
+        combined = combined.sort_index()
+        self.save(ticker, combined)
+        return combined
+
+    def plan(self, ticker: str) -> dict:
+        """
+        Sembol için indirme planı.
+
+        Returns:
+            {"action": "fresh"}                       → ağ çağrısı gerekmez
+            {"action": "incremental", "start": str,   → sondan bir önceki kayıtlı bardan
+             "check_date": str, "check_close": float}   itibaren çek; bu tamamlanmış
+                                                        bar düzeltme kontrolü içindir
+            {"action": "full"}                        → tam geçmiş indir
+        """
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return {"action": "full"}
+
+        if time.time() - os.path.getmtime(path) < self.refresh_seconds:
+            return {"action": "fresh"}
+
+        last = self.load(ticker, tail=2)
+        if last is None or last.empty:
+            return {"action": "full"}
+
+        # Son bar da yeniden çekilir (seans içi kaydedilmiş olabilir); ondan önceki
+        # tamamlanmış bar, geçmişin yeniden ölçeklenip ölçeklenmediğini gösterir
+        check = last.iloc[0]
+        return {
+            "action": "incremental",
+            "start": last.index[0].strftime("%Y-%m-%d"),
+            "check_date": last.index[0].strftime("%Y-%m-%d"),
+            "check_close": float(check["close"]),
+        }
+
+    def is_rebased(self, plan: dict, new_df: pd.DataFrame) -> bool:
+        """Yeniden çekilen kontrol barının kapanışı kayıttakinden farklı mı?"""
+        if plan.get("action") != "incremental" or new_df is None or new_df.empty:
+            return False
+        check_date = pd.Timestamp(plan["check_date"])
+        if check_date not in new_df.index or plan["check_close"] <= 0:
+            return False
+        fetched = float(new_df.loc[check_date, "close"])
+        return abs(fetched / plan["check_close"] - 1) > config.PRICE_STORE_REBASE_TOLERANCE
+
+    def update(self, ticker: str, plan: dict, raw) -> pd.DataFrame:
+        """
+        İndirilen ham veriyi plana göre depoya işle.
+
+        Artımlı veride düzeltme (yeniden ölçekleme) tespit edilirse kayıt silinir
+        ve None döner; bir sonraki plan "full" olur.
+        """
+        new_df = normalize_download(raw)
+        if plan.get("action") == "full":
+            if new_df is not None and not new_df.empty:
+                self.save(ticker, new_df)
+            return new_df
+        if self.is_rebased(plan, new_df):
+            print(f"   ♻️  {ticker}: fiyat geçmişi düzeltilmiş (bölünme/temettü), tam indirme yapılacak")
+            os.remove(self._path(ticker))
+            return None
+        return self.merge(ticker, new_df)
+
+    def fetch_history(self, ticker: str, lookback_days: int, timeout: int = 30, cancel=None) -> pd.DataFrame:
+        """
+        Son lookback_days takvim gününün barlarını döndür, gerekirse sadece
+        eksik barları indir.
+
+        cancel (threading.Event) indirme sırasında set edildiyse çağıran
+        sonucu beklemeyi bırakmıştır: depoya yazılmaz, None döner.
+        """
+        plan = self.plan(ticker)
+
+        if plan["action"] != "fresh":
+            try:
+                if plan["action"] == "incremental":
+                    raw = yf.download(ticker, start=plan["start"], progress=False, timeout=timeout)
+                    if cancel is not None and cancel.is_set():
+                        return None
+                    if self.update(ticker, plan, raw) is None and not os.path.exists(self._path(ticker)):
+                        plan = {"action": "full"}
+                if plan["action"] == "full":
+                    raw = yf.download(ticker, period=f"{lookback_days}d", progress=False, timeout=timeout)
+                    if cancel is not None and cancel.is_set():
+                        return None
+                    self.update(ticker, plan, raw)
+            except Exception:
+                # Ağ hatası → elde ne varsa onu kullan
+                pass
+
+        return self.load(ticker, days=lookback_days)
+
+
+_store = None
+
+
+def get_price_store() -> PriceStore:
+    """Paylaşılan PriceStore örneği (config.PRICE_STORE_DIR değişirse yenilenir)"""
+    global _store
+    if _store is None or _store.store_dir != config.PRICE_STORE_DIR:
+        _store = PriceStore(config.PRICE_STORE_DIR)
+    return _store
+
+
+def download_history(ticker: str, lookback_days: int, timeout: int = 30, cancel=None) -> pd.DataFrame:
+    """
+    Tek sembol için OHLCV geçmişi.
+
+    config.USE_PRICE_STORE açıksa yerel depodan okur ve sadece eksik barları
+    indirir; kapalıysa eskisi gibi her seferinde tam dönem indirilir.
+    """
+    if config.USE_PRICE_STORE:
+        return get_price_store().fetch_history(ticker, lookback_days, timeout=timeout, cancel=cancel)
+
+    raw = yf.download(ticker, period=f"{lookback_days}d", progress=False, timeout=timeout)
+    return normalize_download(raw)
+
+
+if __name__ == "__main__":
+    print("🧪 Price Store Testi")
+    store = get_price_store()
+    for t in ["GARAN.IS", "AAPL", config.DXY_TICKER]:
+        print(f"{t}: plan={store.plan(t)}")
+        df = download_history(t, config.LOOKBACK_DAYS)
+        print(f"   {0 if df is None else len(df)} bar")
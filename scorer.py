@@ -1,4 +1,7 @@
 # scorer.py — Skor & Seçim (v6 - SWING TRADE UPDATE)
+import numpy as np
+import pandas as pd
+
 import config
 
 
@@ -110,7 +113,168 @@ def find_strongest_level(levels, current_price, direction="support", tolerance=0
     return clusters[0]
 
 
-def select_top_stocks(technical_results: list, sector_scores: dict, max_count: int = None) -> list:
+def _sentiment_sector(ticker: str) -> str:
+    """Sentiment eşleştirmesi için hissenin sektörü"""
+    return config.STOCK_SECTORS.get(ticker, "teknoloji" if "." not in ticker else "finans")
+
+
+def build_candidate(result: dict, sector_scores: dict) -> dict:
+    """Tek teknik sonuçtan composite skor + destek/direnç içeren aday kaydı"""
+    ticker = result.get("ticker")
+    technical_score = result.get("score", 50)
+    sector = _sentiment_sector(ticker)
+    sector_sentiment = sector_scores.get(sector, 0.0)
+    composite_score = ScoreCalculator.calculate_composite_score(technical_score, sector_sentiment)
+    fibonacci = result.get("fibonacci", {})
+
+    print(f"      {ticker:10s} | {sector:20s} | teknik={technical_score:5.1f} | sentiment={sector_sentiment:+.3f} | composite={composite_score:5.1f}")
+    current_price = result.get("current_price", 0)
+
+    # Tüm teknik seviyeleri topla
+    levels = []
+    for key in ["fib_0.236", "fib_0.382", "fib_0.618", "fib_0.786", "fib_1.0"]:
+        val = fibonacci.get(key, 0)
+        if val and val > 0:
+            levels.append({"price": val, "source": f"Fibonacci {key}"})
+
+    sma_short_val = result.get("sma_short", 0)
+    sma_long_val = result.get("sma_long", 0)
+    if sma_short_val and sma_short_val > 0:
+        levels.append({"price": sma_short_val, "source": "SMA Kısa"})
+    if sma_long_val and sma_long_val > 0:
+        levels.append({"price": sma_long_val, "source": "SMA Uzun"})
+
+    bollinger_upper_val = result.get("bollinger_upper", 0)
+    bollinger_middle_val = result.get("bollinger_middle", 0)
+    bollinger_lower_val = result.get("bollinger_lower", 0)
+    if bollinger_upper_val and bollinger_upper_val > 0:
+        levels.append({"price": bollinger_upper_val, "source": "Bollinger Üst"})
+    if bollinger_middle_val and bollinger_middle_val > 0:
+        levels.append({"price": bollinger_middle_val, "source": "Bollinger Orta"})
+    if bollinger_lower_val and bollinger_lower_val > 0:
+        levels.append({"price": bollinger_lower_val, "source": "Bollinger Alt"})
+
+    # Confluence bazlı destek seç
+    support_cluster = find_strongest_level(levels, current_price, direction="support")
+    if support_cluster:
+        support = support_cluster["price"]
+    else:
+        atr = result.get("atr", current_price * 0.02)
+        support = current_price - (atr * 1.5)
+        support = max(current_price * 0.90, min(support, current_price * 0.97))
+
+    # Confluence bazlı direnç seç
+    resistance_cluster = find_strongest_level(levels, current_price, direction="resistance")
+    if resistance_cluster:
+        resistance = resistance_cluster["price"]
+    else:
+        resistance = current_price * 1.08
+    rr = ScoreCalculator.calculate_reward_risk(current_price, support, resistance)
+    return {
+        "ticker": ticker,
+        "score": composite_score,
+        "current_price": current_price,
+        "sector": config.STOCK_SECTORS.get(ticker, "Teknoloji" if "." not in ticker else "Finans"),
+        "support": support,
+        "resistance": resistance,
+        "reward_pct": rr["reward_pct"],
+        "risk_pct": rr["risk_pct"],
+        "reward_risk_ratio": rr["ratio"],
+        "dataframe": result.get("dataframe"),
+        "source_pool": result.get("source_pool", ""),
+        "rsi": result.get("rsi"),
+        "macd_histogram": result.get("macd_histogram"),
+        "macd_line": result.get("macd_line"),
+        "signal_line": result.get("signal_line"),
+        "bollinger_position": result.get("bollinger_position"),
+        "bollinger_upper": result.get("bollinger_upper"),
+        "bollinger_middle": result.get("bollinger_middle"),
+        "bollinger_lower": result.get("bollinger_lower"),
+        "sma_short": result.get("sma_short"),
+        "sma_long": result.get("sma_long"),
+        "momentum_pct": result.get("momentum_pct"),
+        "atr": result.get("atr"),
+        "signals": result.get("signals", []),
+        "fibonacci": fibonacci,
+        "trend": result.get("trend"),
+        "trend_strength": result.get("trend_strength"),
+        "breakout": result.get("breakout", {}),
+    }
+
+
+def _selection_key(candidate: dict) -> float:
+    """Seçim sıralaması: skor ve ödül/risk oranı"""
+    return (candidate['score'] * 0.5) + (candidate['reward_risk_ratio'] * 10 * 0.3)
+
+
+def correlation_matrix(candidates: list, window: int = None) -> np.ndarray:
+    """
+    Adayların son window günlük getiri korelasyon matrisi.
+
+    Fiyatlar adayların bellekteki DataFrame'lerinden tek panele dizilir ve
+    korelasyon tek vektörel çağrıyla hesaplanır. Verisi olmayan adayların
+    satır/sütunu 0 (korelasyonsuz) kabul edilir.
+    """
+    window = window or config.DIVERSIFY_CORRELATION_WINDOW
+    closes = {}
+    for i, candidate in enumerate(candidates):
+        df = candidate.get("dataframe")
+        if df is None:
+            continue
+        column = "close" if "close" in df else "Close" if "Close" in df else None
+        if column is not None:
+            closes[i] = df[column]
+
+    corr = np.zeros((len(candidates), len(candidates)))
+    if len(closes) < 2:
+        return corr
+
+    returns = pd.DataFrame(closes).sort_index().pct_change(fill_method=None).iloc[-window:]
+    known = returns.corr(min_periods=max(10, window // 3)).to_numpy()
+    idx = np.array(list(closes))
+    corr[np.ix_(idx, idx)] = np.nan_to_num(known, nan=0.0)
+    return corr
+
+
+def diversified_top_k(candidates: list, max_count: int, corr: np.ndarray = None,
+                      threshold: float = None, penalty: float = None, selected: list = None) -> list:
+    """
+    Açgözlü çeşitlendirilmiş seçim.
+
+    Her turda en yüksek etkin skorlu aday seçilir. Etkin skor, seçilmiş
+    hisselerle en yüksek korelasyon eşiği aşıyorsa aşım oranında düşürülür
+    (korelasyon 1'de penalty puan); böylece aynı hareket eden hisseler
+    ancak daha iyi alternatif yoksa seçilir.
+
+    selected: Önceden seçilmiş hisseler (ör. eksik tamamlama turu); cezaya
+    dahil edilir ama sonuçta döndürülmez. corr verilirse (selected + candidates)
+    sırasına göre olmalıdır.
+    """
+    threshold = config.DIVERSIFY_MAX_CORRELATION if threshold is None else threshold
+    penalty = config.DIVERSIFY_PENALTY if penalty is None else penalty
+    selected = selected or []
+    if corr is None:
+        corr = correlation_matrix(selected + candidates)
+    seeded = len(selected)
+
+    base = np.array([_selection_key(c) for c in candidates], dtype=float)
+    available = np.ones(len(candidates), dtype=bool)
+    max_corr = corr[:seeded, seeded:].max(axis=0) if seeded else np.full(len(candidates), -np.inf)
+    picks = []
+
+    for _ in range(min(max_count, len(candidates))):
+        excess = np.clip((max_corr - threshold) / max(1 - threshold, 1e-9), 0, None)
+        effective = np.where(available, base - penalty * excess, -np.inf)
+        pick = int(np.argmax(effective))
+        picks.append(candidates[pick])
+        available[pick] = False
+        max_corr = np.maximum(max_corr, corr[seeded + pick, seeded:])
+
+    return picks
+
+
+def select_top_stocks(technical_results: list, sector_scores: dict, max_count: int = None,
+                      registry=None, selected: list = None) -> list:
     if max_count is None:
         max_count = config.MAX_RECOMMENDATIONS
     candidates = []
@@ -118,90 +282,23 @@ def select_top_stocks(technical_results: list, sector_scores: dict, max_count: i
     for result in technical_results:
         if result.get("skip"):
             continue
-        ticker = result.get("ticker")
-        technical_score = result.get("score", 50)
-        sector = config.STOCK_SECTORS.get(ticker, "teknoloji" if "." not in ticker else "finans")
-        sector_sentiment = sector_scores.get(sector, 0.0)
-        composite_score = ScoreCalculator.calculate_composite_score(technical_score, sector_sentiment)
-        fibonacci = result.get("fibonacci", {})
-
-        print(f"      {ticker:10s} | {sector:20s} | teknik={technical_score:5.1f} | sentiment={sector_sentiment:+.3f} | composite={composite_score:5.1f}")
-        current_price = result.get("current_price", 0)
-
-        # Tüm teknik seviyeleri topla
-        levels = []
-        for key in ["fib_0.236", "fib_0.382", "fib_0.618", "fib_0.786", "fib_1.0"]:
-            val = fibonacci.get(key, 0)
-            if val and val > 0:
-                levels.append({"price": val, "source": f"Fibonacci {key}"})
-
-        sma_short_val = result.get("sma_short", 0)
-        sma_long_val = result.get("sma_long", 0)
-        if sma_short_val and sma_short_val > 0:
-            levels.append({"price": sma_short_val, "source": "SMA Kısa"})
-        if sma_long_val and sma_long_val > 0:
-            levels.append({"price": sma_long_val, "source": "SMA Uzun"})
-
-        bollinger_upper_val = result.get("bollinger_upper", 0)
-        bollinger_middle_val = result.get("bollinger_middle", 0)
-        bollinger_lower_val = result.get("bollinger_lower", 0)
-        if bollinger_upper_val and bollinger_upper_val > 0:
-            levels.append({"price": bollinger_upper_val, "source": "Bollinger Üst"})
-        if bollinger_middle_val and bollinger_middle_val > 0:
-            levels.append({"price": bollinger_middle_val, "source": "Bollinger Orta"})
-        if bollinger_lower_val and bollinger_lower_val > 0:
-            levels.append({"price": bollinger_lower_val, "source": "Bollinger Alt"})
-
-        # Confluence bazlı destek seç
-        support_cluster = find_strongest_level(levels, current_price, direction="support")
-        if support_cluster:
-            support = support_cluster["price"]
-        else:
-            atr = result.get("atr", current_price * 0.02)
-            support = current_price - (atr * 1.5)
-            support = max(current_price * 0.90, min(support, current_price * 0.97))
-
-        # Confluence bazlı direnç seç
-        resistance_cluster = find_strongest_level(levels, current_price, direction="resistance")
-        if resistance_cluster:
-            resistance = resistance_cluster["price"]
-        else:
-            resistance = current_price * 1.08
-        rr = ScoreCalculator.calculate_reward_risk(current_price, support, resistance)
-        candidate = {
-            "ticker": ticker,
-            "score": composite_score,
-            "current_price": current_price,
-            "sector": config.STOCK_SECTORS.get(ticker, "Teknoloji" if "." not in ticker else "Finans"),
-            "support": support,
-            "resistance": resistance,
-            "reward_pct": rr["reward_pct"],
-            "risk_pct": rr["risk_pct"],
-            "reward_risk_ratio": rr["ratio"],
-            "dataframe": result.get("dataframe"),
-            "source_pool": result.get("source_pool", ""),
-            "rsi": result.get("rsi"),
-            "macd_histogram": result.get("macd_histogram"),
-            "macd_line": result.get("macd_line"),
-            "signal_line": result.get("signal_line"),
-            "bollinger_position": result.get("bollinger_position"),
-            "bollinger_upper": result.get("bollinger_upper"),
-            "bollinger_middle": result.get("bollinger_middle"),
-            "bollinger_lower": result.get("bollinger_lower"),
-            "sma_short": result.get("sma_short"),
-            "sma_long": result.get("sma_long"),
-            "momentum_pct": result.get("momentum_pct"),
-            "atr": result.get("atr"),
-            "signals": result.get("signals", []),
-            "fibonacci": fibonacci,
-            "trend": result.get("trend"),
-            "trend_strength": result.get("trend_strength"),
-            "breakout": result.get("breakout", {}),
-        }
+        candidate = None
+        if registry is not None:
+            # Aynı çalıştırmada skorlanmış hisse tekrar hesaplanmaz
+            ticker = result.get("ticker")
+            sentiment = sector_scores.get(_sentiment_sector(ticker), 0.0)
+            as_of = registry.data_timestamp(result)
+            candidate = registry.get_candidate(ticker, as_of, sentiment)
+        if candidate is None:
+            candidate = build_candidate(result, sector_scores)
+            if registry is not None:
+                registry.put_candidate(ticker, as_of, sentiment, candidate)
         candidates.append(candidate)
     # ... filtre/puan sıralama mevcut sistem aynen devam
     filtered = candidates  # Burada asıl filtre blokları var, tamamı aynen kalıyor
-    filtered.sort(key=lambda x: (x['score'] * 0.5) + (x['reward_risk_ratio'] * 10 * 0.3), reverse=True)
+    filtered.sort(key=_selection_key, reverse=True)
+    if config.DIVERSIFY_SELECTION and (len(filtered) > 1 or selected):
+        return diversified_top_k(filtered, max_count, selected=selected)
     return filtered[:max_count]
 
 def generate_recommendation_text(selected_stocks: list, sector_scores: dict, candidates: list = None) -> dict:
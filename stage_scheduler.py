@@ -0,0 +1,133 @@
+# ============================================================
+# stage_scheduler.py — Bağımlılık Grafiği ile Aşama Zamanlayıcı (v1)
+# ============================================================
+# run_analysis aşamalarını (haber, emtia, DXY, tatil, teknik...)
+# bir DAG olarak tanımlar; bağımsız aşamalar paralel çalışır,
+# her aşama başlangıç/bitiş zamanını kaydeder.
+# ============================================================
+
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class Stage:
+    """Tek bir pipeline aşaması"""
+
+    def __init__(self, name: str, func, deps: list = None, default=None):
+        self.name = name
+        self.func = func
+        self.deps = list(deps or [])
+        self.default = default
+        self.result = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def duration(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return (self.finished_at - self.started_at).total_seconds()
+
+
+class StageScheduler:
+    """
+    Aşama DAG'ı zamanlayıcı.
+
+    Her aşama fonksiyonu, bağımlı olduğu aşamaların sonuçlarını içeren bir
+    dict alır: func({"dep_adı": sonuç, ...}). Hata veren aşamanın sonucu
+    default değeri olur ve bağımlı aşamalar yine çalışır.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self.stages = {}
+
+    def add(self, name: str, func, deps: list = None, default=None) -> "StageScheduler":
+        """Aşama ekle"""
+        if name in self.stages:
+            raise ValueError(f"Aşama zaten tanımlı: {name}")
+        for dep in deps or []:
+            if dep not in self.stages:
+                raise ValueError(f"'{name}' için bilinmeyen bağımlılık: {dep}")
+        self.stages[name] = Stage(name, func, deps, default)
+        return self
+
+    def _run_stage(self, stage: Stage):
+        inputs = {dep: self.stages[dep].result for dep in stage.deps}
+        stage.started_at = datetime.now()
+        try:
+            stage.result = stage.func(inputs)
+        except Exception as e:
+            stage.error = e
+            stage.result = stage.default
+            print(f"⚠️  Aşama hatası [{stage.name}]: {e}")
+        finally:
+            stage.finished_at = datetime.now()
+        return stage
+
+    def run(self) -> dict:
+        """Tüm aşamaları bağımlılık sırasıyla (bağımsızları paralel) çalıştır"""
+        remaining = dict(self.stages)
+        completed = set()
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="asama") as executor:
+            while remaining or running:
+                ready = [s for s in remaining.values() if all(d in completed for d in s.deps)]
+                for stage in ready:
+                    del remaining[stage.name]
+                    running[executor.submit(self._run_stage, stage)] = stage.name
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    completed.add(running.pop(future))
+
+        return {name: stage.result for name, stage in self.stages.items()}
+
+    def timings(self) -> list:
+        """Aşama zaman çizelgesi (başlangıca göre sıralı)"""
+        rows = []
+        for stage in self.stages.values():
+            rows.append({
+                "stage": stage.name,
+                "deps": stage.deps,
+                "started_at": stage.started_at,
+                "finished_at": stage.finished_at,
+                "duration": round(stage.duration, 2),
+                "error": str(stage.error)[:100] if stage.error else None,
+            })
+        rows.sort(key=lambda r: r["started_at"] or datetime.max)
+        return rows
+
+    def critical_path(self) -> list:
+        """En geç biten aşamaya giden, en geç biten bağımlılıklar zinciri"""
+        finished = [s for s in self.stages.values() if s.finished_at]
+        if not finished:
+            return []
+
+        path = []
+        stage = max(finished, key=lambda s: s.finished_at)
+        while stage:
+            path.append(stage.name)
+            deps = [self.stages[d] for d in stage.deps if self.stages[d].finished_at]
+            stage = max(deps, key=lambda s: s.finished_at) if deps else None
+
+        return list(reversed(path))
+
+    def print_timeline(self):
+        """Aşama sürelerini ve kritik yolu yazdır"""
+        rows = self.timings()
+        started = [r["started_at"] for r in rows if r["started_at"]]
+        if not started:
+            return
+        t0 = min(started)
+
+        print("\n⏱️  Aşama Zaman Çizelgesi:")
+        for r in rows:
+            if not r["started_at"]:
+                continue
+            offset = (r["started_at"] - t0).total_seconds()
+            status = "❌" if r["error"] else "✅"
+            print(f"   {status} {r['stage']:15s} +{offset:6.1f}s → {r['duration']:6.1f}s")
+        print(f"   🧭 Kritik yol: {' → '.join(self.critical_path())}")
@@ -7,6 +7,10 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import math
+import threading
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -18,41 +22,77 @@ except:
     import yfinance as yf
 
 import config
+from price_store import get_price_store, download_history
+from indicator_engine import PanelIndicatorEngine
+from indicator_state import get_indicator_state_store
+
+
+# generate_signal_masks bitleri (generate_signals sırasıyla)
+SIGNAL_RSI_OVERSOLD = 1 << 0
+SIGNAL_RSI_OVERBOUGHT = 1 << 1
+SIGNAL_MACD_BULLISH = 1 << 2
+SIGNAL_MACD_BEARISH = 1 << 3
+SIGNAL_BOLLINGER_LOWER = 1 << 4
+SIGNAL_BOLLINGER_UPPER = 1 << 5
+SIGNAL_SMA_BULLISH = 1 << 6
+SIGNAL_SMA_BEARISH = 1 << 7
+SIGNAL_MOMENTUM_UP = 1 << 8
+SIGNAL_MOMENTUM_DOWN = 1 << 9
+
+
+def _period_days(period: str) -> int:
+    """'250d' → 250 (gün cinsinden olmayan dönemler için None)"""
+    if isinstance(period, str) and period.endswith("d") and period[:-1].isdigit():
+        return int(period[:-1])
+    return None
 
 
 class TechnicalAnalyzer:
     """Teknik Analiz - Komple & Akıllı"""
     
     @staticmethod
-    def get_stock_data(ticker: str, period: str = None) -> dict:
-        """Hisse verisi al (SMART)"""
+    def _prepare_ohlcv(df) -> pd.DataFrame:
+        """yfinance çıktısını normalize et (lower-case close/high/low/volume)"""
+        if df is None or df.empty:
+            return None
+        
+        if isinstance(df, pd.Series):
+            df = df.to_frame()
+        
+        # Handle yfinance MultiIndex columns (v0.2.31+)
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = df.columns.get_level_values(0)
+        df.columns = [str(col).lower().replace(' ', '_') for col in df.columns]
+        
+        required = ['close', 'high', 'low', 'volume']
+        if not all(col in df.columns for col in required):
+            return None
+        
+        for col in required:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        
+        df = df.dropna(subset=required)
+        
+        if len(df) < 20:
+            return None
+        
+        return df
+    
+    @staticmethod
+    def get_stock_data(ticker: str, period: str = None, cancel=None) -> dict:
+        """Hisse verisi al (SMART; cancel set edilmişse yerel depoya yazılmaz)"""
         try:
             if period is None:
                 period = f"{config.LOOKBACK_DAYS}d"
-            # 1. Tarihi veri çek
-            df = yf.download(ticker, period=period, progress=False, timeout=30)
-            
-            if df is None or df.empty:
-                return None
-            
-            if isinstance(df, pd.Series):
-                df = df.to_frame()
-            
-            # Handle yfinance MultiIndex columns (v0.2.31+)
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = df.columns.get_level_values(0)
-            df.columns = [str(col).lower().replace(' ', '_') for col in df.columns]
-            
-            required = ['close', 'high', 'low', 'volume']
-            if not all(col in df.columns for col in required):
-                return None
-            
-            for col in required:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            df = df.dropna()
+            # 1. Tarihi veri çek (yerel depo varsa sadece eksik barlar)
+            days = _period_days(period)
+            if days:
+                df = download_history(ticker, days, timeout=30, cancel=cancel)
+            else:
+                df = yf.download(ticker, period=period, progress=False, timeout=30)
             
-            if len(df) < 20:
+            df = TechnicalAnalyzer._prepare_ohlcv(df)
+            if df is None:
                 return None
             
             return {"df": df, "source": "historical"}
@@ -60,6 +100,116 @@ class TechnicalAnalyzer:
         except Exception as e:
             return None
     
+    @staticmethod
+    def _extract_ticker_frame(raw, ticker: str, chunk: list):
+        """Toplu indirme çıktısından tek hissenin frame'ini ayır"""
+        if isinstance(raw.columns, pd.MultiIndex):
+            if ticker not in raw.columns.get_level_values(0):
+                return None
+            return raw[ticker].copy()
+        if len(chunk) == 1:
+            return raw.copy()
+        return None
+    
+    @staticmethod
+    def get_bulk_stock_data(tickers: list, period: str = None, chunk_size: int = None) -> dict:
+        """
+        Çoklu hisse verisi al (BATCH).
+
+        Hisseleri chunk_size'lık gruplar halinde tek yf.download çağrısıyla çeker
+        ve her hisse için get_stock_data ile aynı formatta sonuç üretir.
+        Yerel fiyat deposu açıksa güncel hisseler hiç indirilmez, diğerleri
+        son kayıtlı tarihlerine göre gruplanıp sadece eksik barları çekilir.
+        Bir grubun ya da hissenin hatası diğerlerini etkilemez.
+
+        Returns:
+            {"data": {ticker: {"df", "source"}}, "failed": {ticker: reason}}
+        """
+        if period is None:
+            period = f"{config.LOOKBACK_DAYS}d"
+        if chunk_size is None:
+            chunk_size = config.BULK_DOWNLOAD_CHUNK_SIZE
+        
+        data = {}
+        failed = {}
+        unique = list(dict.fromkeys(tickers))
+        
+        days = _period_days(period)
+        store = get_price_store() if (config.USE_PRICE_STORE and days) else None
+        
+        # İndirme grupları: aynı başlangıç tarihine sahip hisseler tek istekte
+        groups = {}
+        plans = {}
+        for ticker in unique:
+            plan = store.plan(ticker) if store else {"action": "full"}
+            plans[ticker] = plan
+            if plan["action"] == "fresh":
+                df = TechnicalAnalyzer._prepare_ohlcv(store.load(ticker, days=days))
+                if df is not None:
+                    data[ticker] = {"df": df, "source": "historical"}
+                    continue
+                plan = plans[ticker] = {"action": "full"}
+            groups.setdefault(plan.get("start"), []).append(ticker)
+        
+        # Düzeltme tespit edilen hisseler kuyruğa tam indirme grubu olarak eklenir
+        queue = list(groups.items())
+        rebased = []
+        for start, group in queue:
+            download_kwargs = {"start": start} if start else {"period": period}
+            
+            for i in range(0, len(group), max(1, chunk_size)):
+                chunk = group[i:i + chunk_size]
+                try:
+                    raw = yf.download(
+                        chunk, group_by="ticker",
+                        progress=False, threads=True, timeout=30,
+                        **download_kwargs
+                    )
+                except Exception as e:
+                    for ticker in chunk:
+                        failed[ticker] = f"Toplu indirme hatası: {str(e)[:60]}"
+                    continue
+                
+                if (raw is None or raw.empty) and not start:
+                    for ticker in chunk:
+                        failed[ticker] = "Veri alınamadı"
+                    continue
+                
+                for ticker in chunk:
+                    try:
+                        df = None
+                        if raw is not None and not raw.empty:
+                            df = TechnicalAnalyzer._extract_ticker_frame(raw, ticker, chunk)
+                        
+                        if store:
+                            # Yeni bar gelmemiş olabilir → depodaki veri kullanılır
+                            store.update(ticker, plans[ticker], df)
+                            df = store.load(ticker, days=days)
+                            if df is None and plans[ticker]["action"] == "incremental":
+                                # Geçmiş yeniden ölçeklenmiş → tam indirme kuyruğa
+                                plans[ticker] = {"action": "full"}
+                                rebased.append(ticker)
+                                continue
+                        
+                        if df is None:
+                            failed[ticker] = "Veri alınamadı"
+                            continue
+                        
+                        df = TechnicalAnalyzer._prepare_ohlcv(df)
+                        if df is None:
+                            failed[ticker] = "Yetersiz veri"
+                            continue
+                        
+                        data[ticker] = {"df": df, "source": "historical"}
+                    except Exception as e:
+                        failed[ticker] = str(e)[:100]
+            
+            if rebased:
+                queue.append((None, rebased))
+                rebased = []
+        
+        return {"data": data, "failed": failed}
+    
     @staticmethod
     def get_current_price(ticker: str) -> float:
         """Real-time fiyat al"""
@@ -76,12 +226,17 @@ class TechnicalAnalyzer:
             return None
     
     @staticmethod
-    def analyze_single_stock(ticker: str) -> dict:
-        """Tek hisse analiz et (KOMPLE)"""
+    def analyze_single_stock(ticker: str, data: dict = None, cancel=None) -> dict:
+        """Tek hisse analiz et (KOMPLE)
+
+        cancel: threading.Event; çağıran sonucu beklemeyi bıraktıysa set edilir,
+        bu durumda fiyat deposu ve gösterge durumu diske yazılmaz.
+        """
         
         try:
-            # Veri al
-            data = TechnicalAnalyzer.get_stock_data(ticker)
+            # Veri al (toplu indirmeden gelmediyse tek tek çek)
+            if data is None:
+                data = TechnicalAnalyzer.get_stock_data(ticker, cancel=cancel)
             
             if data is None:
                 # Real-time fiyat ile fallback analiz
@@ -103,23 +258,50 @@ class TechnicalAnalyzer:
             high = df["high"]
             low = df["low"]
             
-            # TÜM GÖSTERGELERI HESAPLA
-            rsi = TechnicalAnalyzer.calculate_rsi(close, period=config.RSI_PERIOD)
-            macd = TechnicalAnalyzer.calculate_macd(close)
-            bollinger = TechnicalAnalyzer.calculate_bollinger_bands(close, period=config.BOLLINGER_PERIOD)
-            sma_short = TechnicalAnalyzer.calculate_sma(close, config.SMA_SHORT)
-            sma_long = TechnicalAnalyzer.calculate_sma(close, config.SMA_LONG)
-            momentum = TechnicalAnalyzer.calculate_momentum(close, period=config.MOMENTUM_PERIOD)
-            atr = TechnicalAnalyzer.calculate_atr(df)
-            fibonacci = TechnicalAnalyzer.calculate_fibonacci(df, lookback=config.FIBONACCI_LOOKBACK)
+            # TÜM GÖSTERGELERI HESAPLA (panel motorundan geldiyse tekrar hesaplanmaz)
+            indicators = data.get("indicators")
+            if not indicators and config.USE_INDICATOR_STATE:
+                # Kayıtlı durum varsa sadece yeni bar işlenir
+                try:
+                    indicators = get_indicator_state_store().sync(ticker, df, cancel=cancel)
+                except Exception:
+                    indicators = None
+            if not indicators:
+                indicators = TechnicalAnalyzer.calculate_indicators(df)
+            
+            rsi = indicators["rsi"]
+            macd = {
+                "macd_line": indicators["macd_line"],
+                "signal_line": indicators["signal_line"],
+                "histogram": indicators["macd_histogram"],
+            }
+            bollinger = {
+                "upper_band": indicators["bollinger_upper"],
+                "middle_band": indicators["bollinger_middle"],
+                "lower_band": indicators["bollinger_lower"],
+                "position": indicators["bollinger_position"],
+            }
+            sma_short = indicators["sma_short"]
+            sma_long = indicators["sma_long"]
+            momentum = indicators["momentum_pct"]
+            atr = indicators["atr"]
+            
+            fibonacci = indicators.get("fibonacci")
+            if fibonacci is None:
+                fibonacci = TechnicalAnalyzer.calculate_fibonacci(df, lookback=config.FIBONACCI_LOOKBACK)
             
             current_price = float(close.iloc[-1])
             
             # TREND
-            trend = TechnicalAnalyzer.analyze_trend(df)
+            if "trend" in indicators:
+                trend = {"trend": indicators["trend"], "strength": indicators["trend_strength"]}
+            else:
+                trend = TechnicalAnalyzer.analyze_trend(df)
             
             # BREAKOUT
-            breakout = TechnicalAnalyzer.detect_breakout(df, fibonacci, current_price)
+            breakout = TechnicalAnalyzer.detect_breakout(
+                df, fibonacci, current_price, volume_surge=indicators.get("volume_surge")
+            )
             
             # SİNYALLER
             signals = TechnicalAnalyzer.generate_signals(
@@ -597,19 +779,139 @@ class TechnicalAnalyzer:
             return 50.0
     
     @staticmethod
-    def detect_breakout(df, fibonacci: dict, current_price: float) -> dict:
-        """Direnç kırılma tespiti"""
+    def _score_arrays(rsi, macd_histogram, bollinger_code, sma20, sma50, momentum, price) -> list:
+        """Skor girdilerini aynı şekle yayınlanmış float dizilere çevir"""
+        return np.broadcast_arrays(*[
+            np.asarray(v, dtype=float)
+            for v in (rsi, macd_histogram, bollinger_code, sma20, sma50, momentum, price)
+        ])
+    
+    @staticmethod
+    def calculate_technical_scores(rsi, macd_histogram, bollinger_code, sma20, sma50, momentum, price) -> np.ndarray:
+        """
+        calculate_technical_score'un dizi versiyonu (tüm evren / tüm günler).
+
+        bollinger_code: -1 alt, 0 orta, 1 üst (indicator_engine.BOLLINGER_POSITION_CODES).
+        Her eleman için skaler fonksiyonla aynı skoru döndürür.
+        """
+        rsi, hist, bb, sma20, sma50, momentum, price = TechnicalAnalyzer._score_arrays(
+            rsi, macd_histogram, bollinger_code, sma20, sma50, momentum, price
+        )
+        score = np.full(rsi.shape, 50.0)
+        
+        # RSI
+        has_rsi = rsi != 0
+        score += np.select(
+            [has_rsi & (rsi < config.RSI_OVERSOLD), has_rsi & (rsi < 40),
+             has_rsi & (rsi > config.RSI_OVERBOUGHT), has_rsi & (rsi > 60)],
+            [10, 5, -10, -5], 0
+        )
+        
+        # MACD
+        score += np.where(hist > 0, 10, -10)
+        
+        # Bollinger
+        score += np.select([bb == -1, bb == 1], [8, -8], 0)
+        
+        # SMA hizası
+        has_sma = (sma20 != 0) & (sma50 != 0) & (price != 0)
+        score += np.select(
+            [has_sma & (price > sma20) & (sma20 > sma50), has_sma & (price < sma20) & (sma20 < sma50),
+             has_sma & (price > sma20), has_sma & (price < sma20)],
+            [18, -18, 10, -10], 0
+        )
+        
+        # Momentum
+        has_momentum = momentum != 0
+        score += np.select(
+            [has_momentum & (momentum > 10), has_momentum & (momentum > 0),
+             has_momentum & (momentum < -10), has_momentum & (momentum < 0)],
+            [14, 7, -14, -7], 0
+        )
+        
+        return np.round(np.clip(score, 0, 100), 1)
+    
+    @staticmethod
+    def generate_signal_masks(rsi, macd_histogram, bollinger_code, sma20, sma50, momentum, price) -> np.ndarray:
+        """
+        generate_signals'ın dizi versiyonu: her eleman için SIGNAL_* bit maskesi.
+
+        Metin listesine çevirmek için signals_from_mask kullanılır.
+        """
+        rsi, hist, bb, sma20, sma50, momentum, price = TechnicalAnalyzer._score_arrays(
+            rsi, macd_histogram, bollinger_code, sma20, sma50, momentum, price
+        )
+        has_rsi = rsi != 0
+        has_sma = (sma20 != 0) & (sma50 != 0) & (price != 0)
+        has_momentum = momentum != 0
+        bullish_sma = has_sma & (price > sma20) & (sma20 > sma50)
+        
+        flags = [
+            (SIGNAL_RSI_OVERSOLD, has_rsi & (rsi < config.RSI_OVERSOLD)),
+            (SIGNAL_RSI_OVERBOUGHT, has_rsi & ~(rsi < config.RSI_OVERSOLD) & (rsi > config.RSI_OVERBOUGHT)),
+            (SIGNAL_MACD_BULLISH, hist > 0),
+            (SIGNAL_MACD_BEARISH, hist < 0),
+            (SIGNAL_BOLLINGER_LOWER, bb == -1),
+            (SIGNAL_BOLLINGER_UPPER, bb == 1),
+            (SIGNAL_SMA_BULLISH, bullish_sma),
+            (SIGNAL_SMA_BEARISH, has_sma & ~bullish_sma & (price < sma20) & (sma20 < sma50)),
+            (SIGNAL_MOMENTUM_UP, has_momentum & (momentum > 5)),
+            (SIGNAL_MOMENTUM_DOWN, has_momentum & (momentum < -5)),
+        ]
+        
+        masks = np.zeros(rsi.shape, dtype=np.int64)
+        for bit, condition in flags:
+            masks |= np.where(condition, bit, 0)
+        return masks
+    
+    @staticmethod
+    def signals_from_mask(mask: int, rsi=None, momentum=None) -> list:
+        """Bit maskesini generate_signals ile aynı metin listesine çevir"""
+        mask = int(mask)
+        signals = []
+        
+        if mask & SIGNAL_RSI_OVERSOLD:
+            signals.append(f"📊 RSI {rsi:.1f} → Oversold (Aşırı Satım - AL Fırsatı)")
+        elif mask & SIGNAL_RSI_OVERBOUGHT:
+            signals.append(f"📊 RSI {rsi:.1f} → Overbought (Aşırı Alım - SAT Sinyali)")
+        
+        if mask & SIGNAL_MACD_BULLISH:
+            signals.append("📈 MACD → Bullish (Yükseliş Sinyali)")
+        elif mask & SIGNAL_MACD_BEARISH:
+            signals.append("📉 MACD → Bearish (Düşüş Sinyali)")
+        
+        if mask & SIGNAL_BOLLINGER_LOWER:
+            signals.append("📊 Bollinger → Alt Bant (Alım Fırsatı)")
+        elif mask & SIGNAL_BOLLINGER_UPPER:
+            signals.append("📊 Bollinger → Üst Bant (Satış Sinyali)")
+        
+        if mask & SIGNAL_SMA_BULLISH:
+            signals.append("📈 SMA → Bullish Align (Yükseliş Hizası)")
+        elif mask & SIGNAL_SMA_BEARISH:
+            signals.append("📉 SMA → Bearish Align (Düşüş Hizası)")
+        
+        if mask & SIGNAL_MOMENTUM_UP:
+            signals.append(f"📈 Momentum {momentum:+.1f}% (Yukarı İvme)")
+        elif mask & SIGNAL_MOMENTUM_DOWN:
+            signals.append(f"📉 Momentum {momentum:+.1f}% (Aşağı İvme)")
+        
+        return signals if signals else ["⚪ Nötr (Belirgin Sinyal Yok)"]
+    
+    @staticmethod
+    def detect_breakout(df, fibonacci: dict, current_price: float, volume_surge: bool = None) -> dict:
+        """Direnç kırılma tespiti (volume_surge verilirse hacim tekrar hesaplanmaz)"""
         try:
             resistance = fibonacci.get("fib_0.236", 0)
             support = fibonacci.get("fib_0.618", 0)
             
             # Volume kontrolü
-            if df is not None and len(df) >= 20:
-                avg_volume = df["volume"].tail(20).mean()
-                last_volume = float(df["volume"].iloc[-1])
-                volume_surge = last_volume > avg_volume * 1.5
-            else:
-                volume_surge = False
+            if volume_surge is None:
+                if df is not None and len(df) >= 20:
+                    avg_volume = df["volume"].tail(20).mean()
+                    last_volume = float(df["volume"].iloc[-1])
+                    volume_surge = last_volume > avg_volume * 1.5
+                else:
+                    volume_surge = False
             
             breakout_type = None
             if resistance and current_price > resistance:
@@ -659,24 +961,392 @@ class TechnicalAnalyzer:
         except:
             return {"trend": "Nötr", "strength": "N/A"}
 
+    
+    @staticmethod
+    def _ewm_spans(values: list, spans: tuple, signal_span: int):
+        """
+        MACD için hızlı/yavaş EMA ve sinyal EMA'sını tek döngüde hesapla.
+
+        pandas ewm(span, adjust=False).mean() özyinelemesiyle birebir aynıdır.
+        """
+        alphas = [1.0 / (1.0 + (span - 1) / 2.0) for span in spans]
+        alpha_s = 1.0 / (1.0 + (signal_span - 1) / 2.0)
+        fast = slow = values[0]
+        signal = fast - slow
+        
+        for x in values[1:]:
+            a = alphas[0]
+            if fast != x:
+                fast = ((1.0 - a) * fast + a * x) / ((1.0 - a) + a)
+            a = alphas[1]
+            if slow != x:
+                slow = ((1.0 - a) * slow + a * x) / ((1.0 - a) + a)
+            macd = fast - slow
+            if signal != macd:
+                signal = ((1.0 - alpha_s) * signal + alpha_s * macd) / ((1.0 - alpha_s) + alpha_s)
+        
+        return fast - slow, signal
+    
+    @staticmethod
+    def calculate_indicators(df: pd.DataFrame) -> dict:
+        """
+        Tüm göstergeler tek geçişte (fused kernel).
+
+        close/high/low/volume bir kez NumPy dizisine çevrilir; SMA kısa,
+        Bollinger orta bandı ve trend SMA'sı aynı pencere toplamını, MACD'nin
+        üç EMA'sı tek döngüyü paylaşır. Sonuçlar calculate_rsi, calculate_macd,
+        calculate_bollinger_bands, calculate_sma, calculate_momentum,
+        calculate_atr, calculate_fibonacci, analyze_trend ve detect_breakout
+        hacim kontrolünün döndürdüğü değerlerle aynıdır.
+        """
+        close_all = df["close"].to_numpy(dtype=float)
+        high = df["high"].to_numpy(dtype=float)
+        low = df["low"].to_numpy(dtype=float)
+        c = close_all[~np.isnan(close_all)]
+        n = len(c)
+        
+        # Pencere toplamları bir kez hesaplanır, tüm göstergeler paylaşır
+        window_means = {}
+        
+        def window_mean(period):
+            if period not in window_means:
+                window = c[-period:]
+                # Sabit pencerede pandas değeri aynen döndürür (toplam/period değil)
+                if window.min() == window.max():
+                    window_means[period] = float(window[-1])
+                else:
+                    window_means[period] = float(window.sum()) / period
+            return window_means[period]
+        
+        out = {}
+        
+        # RSI
+        period = config.RSI_PERIOD
+        rsi = 50.0
+        if n >= period + 1:
+            delta = np.diff(c[-(period + 1):])
+            avg_gain = float(delta.clip(min=0).sum()) / period
+            avg_loss = float((-delta.clip(max=0)).sum()) / period
+            if avg_loss == 0:
+                rsi = 100.0 if avg_gain > 0 else 0.0
+            else:
+                value = 100 - (100 / (1 + avg_gain / avg_loss))
+                if not (np.isnan(value) or np.isinf(value)):
+                    rsi = round(max(0, min(100, value)), 1)
+        out["rsi"] = rsi
+        
+        # MACD
+        if n >= 26:
+            macd_line, signal_line = TechnicalAnalyzer._ewm_spans(
+                c.tolist(), (config.MACD_FAST, config.MACD_SLOW), config.MACD_SIGNAL
+            )
+            out["macd_line"] = round(macd_line, 6)
+            out["signal_line"] = round(signal_line, 6)
+            out["macd_histogram"] = round(macd_line - signal_line, 6)
+        else:
+            out.update({"macd_line": 0, "signal_line": 0, "macd_histogram": 0})
+        
+        # Bollinger (orta bant = SMA penceresi)
+        period = config.BOLLINGER_PERIOD
+        if n >= period:
+            middle = window_mean(period)
+            window = c[-period:]
+            std = float(np.sqrt(((window - middle) ** 2).sum() / (period - 1)))
+            upper = middle + 2 * std
+            lower = middle - 2 * std
+            current = float(c[-1])
+            if current > upper * 0.95:
+                position = "üst"
+            elif current < lower * 1.05:
+                position = "alt"
+            else:
+                position = "orta"
+            out.update({
+                "bollinger_upper": round(upper, 2),
+                "bollinger_middle": round(middle, 2),
+                "bollinger_lower": round(lower, 2),
+                "bollinger_position": position,
+            })
+        else:
+            out.update({"bollinger_upper": 0, "bollinger_middle": 0, "bollinger_lower": 0,
+                        "bollinger_position": "orta"})
+        
+        # SMA
+        for key, period in [("sma_short", config.SMA_SHORT), ("sma_long", config.SMA_LONG)]:
+            out[key] = round(window_mean(period), 2) if n >= period else 0.0
+        
+        # Momentum
+        period = config.MOMENTUM_PERIOD
+        momentum = 0.0
+        if n >= period:
+            past = float(c[-period])
+            if past != 0:
+                value = ((float(c[-1]) - past) / past) * 100
+                if not (np.isnan(value) or np.isinf(value)):
+                    momentum = round(value, 2)
+        out["momentum_pct"] = momentum
+        
+        # ATR
+        atr = 0.0
+        if len(close_all) >= 15:
+            h, l = high[-14:], low[-14:]
+            prev = close_all[-15:-1]
+            tr = np.fmax(h - l, np.fmax(np.abs(h - prev), np.abs(l - prev)))
+            value = float(tr.sum()) / 14
+            if not np.isnan(value):
+                atr = round(value, 2)
+        out["atr"] = atr
+        
+        # Fibonacci
+        lookback = config.FIBONACCI_LOOKBACK
+        fibonacci = {}
+        if len(close_all) >= lookback:
+            hi = high[-lookback:]
+            lo = low[-lookback:]
+            current = float(close_all[-1])
+            if np.isnan(hi).all() or np.isnan(lo).all():
+                fibonacci = {"current": round(current, 2)}
+            else:
+                hi, lo = float(np.nanmax(hi)), float(np.nanmin(lo))
+                distance = hi - lo
+                fibonacci = {
+                    "current": round(current, 2),
+                    "fib_0.236": round(hi - (distance * 0.236), 2),
+                    "fib_0.382": round(hi - (distance * 0.382), 2),
+                    "fib_0.618": round(hi - (distance * 0.618), 2),
+                    "fib_0.786": round(hi - (distance * 0.786), 2),
+                    "fib_1.0": round(lo, 2),
+                }
+        out["fibonacci"] = fibonacci
+        
+        # Trend (SMA kısa/uzun pencereleri yukarıdakilerle ortak)
+        trend = {"trend": "Nötr", "strength": "N/A"}
+        if len(close_all) >= config.SMA_LONG:
+            if n == len(close_all):
+                current = float(c[-1])
+                sma_s_val = window_mean(config.SMA_SHORT)
+                sma_l_val = window_mean(config.SMA_LONG)
+                if current > sma_s_val > sma_l_val:
+                    trend = {"trend": "Güçlü Yükseliş", "strength": "Very Strong"}
+                elif current > sma_s_val:
+                    trend = {"trend": "Yükseliş", "strength": "Strong"}
+                elif current < sma_s_val < sma_l_val:
+                    trend = {"trend": "Güçlü Düşüş", "strength": "Very Strong"}
+                elif current < sma_s_val:
+                    trend = {"trend": "Düşüş", "strength": "Strong"}
+                else:
+                    trend = {"trend": "Nötr", "strength": "Balanced"}
+            else:
+                trend = TechnicalAnalyzer.analyze_trend(df)
+        out["trend"] = trend["trend"]
+        out["trend_strength"] = trend["strength"]
+        
+        # Breakout hacim kontrolü
+        volume_surge = False
+        if len(df) >= 20:
+            volume = df["volume"].to_numpy(dtype=float)
+            volume_surge = bool(float(volume[-1]) > float(np.nanmean(volume[-20:])) * 1.5)
+        out["volume_surge"] = volume_surge
+        
+        return out
+
+class AnalysisRegistry:
+    """
+    Çalıştırma Kapsamlı Sonuç Kaydı.
+
+    Bir run_analysis boyunca her hissenin teknik sonucu (ve scorer aday
+    kaydı) bir kez hesaplanır; fallback dalları aynı hisseyi tekrar
+    indirmez/skorlamaz. Kayıtlar hisse + veri zaman damgası (son bar) ile
+    tutulur; veri yenilendikten sonra eski analiz döndürülmez.
+    """
+    
+    def __init__(self):
+        self.results = {}
+        self.candidates = {}
+        self.hits = 0
+        self.misses = 0
+        self.candidate_hits = 0
+        self.candidate_misses = 0
+    
+    @staticmethod
+    def data_timestamp(result: dict):
+        """Sonucun dayandığı son bar tarihi (tarihi veri yoksa None)"""
+        df = result.get("dataframe") if result else None
+        if df is not None and len(df) > 0:
+            return df.index[-1]
+        return None
+    
+    @staticmethod
+    def expected_timestamp(ticker: str):
+        """
+        İndirme yapmadan hissenin güncel verisinin son bar tarihi.
+
+        Yerel depo tazeyse kayıtlı son bar; depo kapalı/eskiyse None
+        (veri yeniden indirileceği için tarihli kayıtlar eşleşmez).
+        """
+        if not config.USE_PRICE_STORE:
+            return None
+        store = get_price_store()
+        if store.plan(ticker)["action"] != "fresh":
+            return None
+        last = store.load(ticker, tail=1)
+        return last.index[-1] if last is not None and len(last) > 0 else None
+    
+    def get(self, ticker: str, as_of) -> dict:
+        """Kayıtlı sonucu döndür (zaman damgası eşleşmeli)"""
+        result = self.results.get((ticker, as_of))
+        if result is not None:
+            self.hits += 1
+            return result
+        self.misses += 1
+        return None
+    
+    def put(self, ticker: str, result: dict):
+        self.results[(ticker, self.data_timestamp(result))] = result
+    
+    def get_candidate(self, ticker: str, as_of, sector_sentiment: float) -> dict:
+        """Scorer aday kaydı (aynı veri ve sentiment ile hesaplandıysa kopyası)"""
+        candidate = self.candidates.get((ticker, as_of, sector_sentiment))
+        if candidate is not None:
+            self.candidate_hits += 1
+            return dict(candidate)
+        self.candidate_misses += 1
+        return None
+    
+    def put_candidate(self, ticker: str, as_of, sector_sentiment: float, candidate: dict):
+        self.candidates[(ticker, as_of, sector_sentiment)] = dict(candidate)
+    
+    def stats(self) -> dict:
+        return {
+            "tickers": len({ticker for ticker, _ in self.results}),
+            "hits": self.hits,
+            "misses": self.misses,
+            "candidate_hits": self.candidate_hits,
+            "candidate_misses": self.candidate_misses,
+        }
+
 
-def analyze_all_stocks(ticker_list: list) -> list:
+def _analyze_concurrently(ticker_list: list, prefetched: dict, max_workers: int, timeout: float) -> list:
+    """
+    Hisseleri thread havuzunda analiz et.
+
+    Her hissenin süresi, işçi thread'de çalışmaya başladığı andan itibaren
+    ölçülür; timeout'u aşan hisse skip olarak işaretlenir. Ayrıca gönderimden
+    itibaren ölçülen toplam süre sınırı (işçi başına düşen hisse sayısı ×
+    timeout) aşılırsa, tüm işçiler takılı kalsa bile kuyrukta bekleyenler
+    dahil kalan hisseler skip olur. Bırakılan işçilerin iptal bayrağı set
+    edilir (depolara yazmazlar). Sonuçlar girdi sırasıyla döner.
+    """
+    started = {}
+    cancels = [threading.Event() for _ in ticker_list]
+    
+    def task(index, ticker):
+        started[index] = time.monotonic()
+        return TechnicalAnalyzer.analyze_single_stock(ticker, data=prefetched.get(ticker), cancel=cancels[index])
+    
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="teknik")
+    deadline = time.monotonic() + timeout * math.ceil(len(ticker_list) / max_workers)
+    futures = [executor.submit(task, i, t) for i, t in enumerate(ticker_list)]
+    results = [None] * len(ticker_list)
+    pending = {f: i for i, f in enumerate(futures)}
+    
+    try:
+        while pending:
+            remaining = max(0.0, deadline - time.monotonic())
+            done, _ = wait(list(pending), timeout=min(0.5, remaining), return_when=FIRST_COMPLETED)
+            for future in done:
+                i = pending.pop(future)
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    results[i] = {"ticker": ticker_list[i], "skip": True, "reason": str(e)[:100]}
+            
+            now = time.monotonic()
+            for future, i in list(pending.items()):
+                if now >= deadline or (i in started and now - started[i] > timeout):
+                    pending.pop(future)
+                    cancels[i].set()
+                    results[i] = {
+                        "ticker": ticker_list[i],
+                        "skip": True,
+                        "reason": f"Zaman aşımı ({timeout:.0f}s)"
+                    }
+    finally:
+        # Zaman aşımına uğrayan thread'ler beklenmez; sonuçları artık kullanılmaz
+        for i in pending.values():
+            cancels[i].set()
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return results
+
+
+def analyze_all_stocks(ticker_list: list, max_workers: int = None, timeout: float = None,
+                       registry: AnalysisRegistry = None) -> list:
     """TÜM HİSSELERİ ANALYZE ET (HIÇBIR SKIP YOK)"""
+    if max_workers is None:
+        max_workers = config.TECHNICAL_MAX_WORKERS
+    if timeout is None:
+        timeout = config.TECHNICAL_TICKER_TIMEOUT
+    
     print(f"\n📊 Teknik analiz başlıyor ({len(ticker_list)} hisse)...")
     
-    results = []
-    successful = 0
+    # Bu çalıştırmada daha önce analiz edilenler tekrar indirilmez
+    cached = {}
+    if registry is not None:
+        for ticker in dict.fromkeys(ticker_list):
+            result = registry.get(ticker, registry.expected_timestamp(ticker))
+            if result is not None:
+                cached[ticker] = result
+        if cached:
+            print(f"   ♻️  {len(cached)} hisse bu çalıştırmada zaten analiz edilmiş (kayıttan)")
+    
+    to_analyze = [t for t in dict.fromkeys(ticker_list) if t not in cached]
     
-    for ticker in ticker_list:
-        result = TechnicalAnalyzer.analyze_single_stock(ticker)
+    # Toplu veri indirme (gruplar halinde tek istek)
+    prefetched = {}
+    if to_analyze:
+        bulk = TechnicalAnalyzer.get_bulk_stock_data(to_analyze)
+        prefetched = bulk["data"]
+        if bulk["failed"]:
+            print(f"   ⚠️  Toplu indirmede {len(bulk['failed'])} hisse alınamadı, tek tek denenecek")
         
+        # Göstergeler tüm evren için tek panel geçişinde hesaplanır
+        # (artımlı durum açıksa her hisse kendi durumunu günceller)
+        if prefetched and not config.USE_INDICATOR_STATE:
+            try:
+                panel_values = PanelIndicatorEngine.analyze_frames(
+                    {ticker: entry["df"] for ticker, entry in prefetched.items()}
+                )
+                for ticker, values in panel_values.items():
+                    prefetched[ticker]["indicators"] = values
+            except Exception as e:
+                print(f"   ⚠️  Panel gösterge hesabı başarısız, hisse bazında hesaplanacak: {str(e)[:60]}")
+    
+    if max_workers > 1 and len(to_analyze) > 1:
+        fresh = _analyze_concurrently(to_analyze, prefetched, min(max_workers, len(to_analyze)), timeout)
+    else:
+        fresh = [
+            TechnicalAnalyzer.analyze_single_stock(ticker, data=prefetched.get(ticker))
+            for ticker in to_analyze
+        ]
+    
+    by_ticker = dict(cached)
+    for ticker, result in zip(to_analyze, fresh):
+        by_ticker[ticker] = result
+        if registry is not None:
+            registry.put(ticker, result)
+    
+    results = [by_ticker[ticker] for ticker in ticker_list]
+    
+    # Özet her zaman girdi sırasıyla yazdırılır
+    successful = 0
+    for ticker, result in zip(ticker_list, results):
+        origin = " (kayıt)" if ticker in cached else ""
         if not result.get("skip"):
             successful += 1
-            print(f"   ✅ {ticker:10s} - Skor: {result['score']:6.1f} | Kaynak: {result.get('source', 'unknown')}")
+            print(f"   ✅ {ticker:10s} - Skor: {result['score']:6.1f} | Kaynak: {result.get('source', 'unknown')}{origin}")
         else:
-            print(f"   ❌ {ticker:10s} - {result.get('reason', 'Bilinmeyen hata')}")
-        
-        results.append(result)
+            print(f"   ❌ {ticker:10s} - {result.get('reason', 'Bilinmeyen hata')}{origin}")
     
     print(f"\n✅ {successful}/{len(ticker_list)} hisse analiz edildi")
     
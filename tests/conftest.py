@@ -41,6 +41,23 @@ def make_ohlcv_df(n: int = 100, start: float = 100.0, seed: int = 42) -> pd.Data
     }, index=close.index)
 
 
+# ─────────────────────────────────────────────
+# Ortam izolasyonu
+# ─────────────────────────────────────────────
+
+@pytest.fixture(autouse=True)
+def isolated_price_store(tmp_path, monkeypatch):
+    """Testler yerel fiyat deposunu, gösterge durumunu, DB'yi ve haber cache'ini geçici dizinde kullansın."""
+    import config
+    monkeypatch.setattr(config, "PRICE_STORE_DIR", str(tmp_path / "prices"))
+    monkeypatch.setattr(config, "INDICATOR_STATE_DIR", str(tmp_path / "indicator_state"))
+    monkeypatch.setattr(config, "DATABASE_FILE", str(tmp_path / "performance.db"))
+    monkeypatch.setattr(config, "NEWS_CACHE_DIR", str(tmp_path / "news_cache"))
+    from news_analyzer import NewsAnalyzer
+    monkeypatch.setattr(NewsAnalyzer, "_cache", None)
+    return config.PRICE_STORE_DIR
+
+
 # ─────────────────────────────────────────────
 # Teknik Analiz Fixture'ları
 # ─────────────────────────────────────────────
@@ -0,0 +1,316 @@
+# ============================================================
+# tests/test_backtest.py — Vektörel Backtest Testleri
+# ============================================================
+# Kapsam: Skor eşliği, ileri getiri, günlük seçim kuralları,
+# indirme yapılmadan çalıştırma, parametre taraması, walk-forward,
+# bootstrap güven aralıkları
+# ============================================================
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from unittest.mock import patch
+import pandas as pd
+import numpy as np
+import pytest
+
+from technical_analyzer import TechnicalAnalyzer
+from backtest import (
+    BacktestEngine, run_backtest, run_sweep, classify_return, expand_grid,
+    max_drawdown, evaluate_results, parse_grid, run_walk_forward, walk_forward_folds,
+    bootstrap_indices, bootstrap_confidence, MIN_BARS, HORIZON_BARS,
+)
+from tests.conftest import make_ohlcv_df
+
+
+def make_frames(count: int = 8, n: int = 300) -> dict:
+    frames = {}
+    for i in range(count):
+        df = make_ohlcv_df(n, start=50.0 + i * 10, seed=100 + i)
+        if i % 3 == 0:
+            # Bu hissenin bazı işlem günleri eksik (farklı borsa tatilleri)
+            df = df.drop(df.index[5::17])
+        frames[f"H{i}"] = df
+    return frames
+
+
+@pytest.mark.unit
+class TestBacktestEngine(unittest.TestCase):
+    """BacktestEngine panel hesapları"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.frames = make_frames()
+        cls.engine = BacktestEngine(cls.frames)
+
+    def test_scores_match_analyze_single_stock(self):
+        """Her gün skoru, o güne kadarki veriyle analyze_single_stock skoru olmalı"""
+        for ticker in ["H0", "H1", "H5"]:
+            df = self.frames[ticker]
+            col = self.engine.tickers.index(ticker)
+            for cut in [30, 80, 150, len(df)]:
+                sub = df.iloc[:cut]
+                row = self.engine.index.get_loc(sub.index[-1])
+                expected = TechnicalAnalyzer.analyze_single_stock(ticker, data={"df": sub, "source": "historical"})
+                with self.subTest(ticker=ticker, bars=cut):
+                    self.assertEqual(self.engine.scores[row, col], expected["score"])
+
+    def test_forward_returns_use_trading_bars(self):
+        """İleri getiri hissenin kendi işlem günlerine göre hesaplanmalı"""
+        df = self.frames["H0"]
+        col = self.engine.tickers.index("H0")
+        returns = self.engine.forward_returns(7)
+        row = self.engine.index.get_loc(df.index[40])
+        expected = (df["close"].iloc[47] - df["close"].iloc[40]) / df["close"].iloc[40] * 100
+        self.assertAlmostEqual(returns[row, col], expected, places=10)
+        # Son 7 barda ileri veri yok
+        last_row = self.engine.index.get_loc(df.index[-3])
+        self.assertTrue(np.isnan(returns[last_row, col]))
+
+    def test_daily_selection_rules(self):
+        """Günlük seçim: en fazla top_n, eşik üstü, yeterli geçmiş"""
+        start = self.engine.index[MIN_BARS].strftime("%Y-%m-%d")
+        end = self.engine.index[-1].strftime("%Y-%m-%d")
+        results = self.engine.run(start, end, top_n=2, min_score=55)
+        self.assertGreater(len(results), 0)
+
+        by_date = {}
+        for r in results:
+            by_date.setdefault(r["date"], []).append(r)
+            self.assertGreaterEqual(r["score"], 55)
+            self.assertEqual(r["outcome"], classify_return(r["return"]))
+        for picks in by_date.values():
+            self.assertLessEqual(len(picks), 2)
+            scores = [p["score"] for p in picks]
+            self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_empty_range(self):
+        """Aralıkta gün yoksa boş liste"""
+        self.assertEqual(self.engine.run("1990-01-01", "1990-02-01"), [])
+
+
+@pytest.mark.unit
+class TestRunBacktest(unittest.TestCase):
+    """run_backtest() uçtan uca"""
+
+    def test_prefetched_frames_skip_download(self):
+        """frames verilince yf.download çağrılmamalı"""
+        frames = make_frames(count=4)
+        index = frames["H1"].index
+        with patch("backtest.yf.download") as mock_download:
+            summary = run_backtest(index[70].strftime("%Y-%m-%d"), index[-1].strftime("%Y-%m-%d"),
+                                   tickers=list(frames), frames=frames)
+        mock_download.assert_not_called()
+        if summary:
+            self.assertEqual(summary["total"], summary["success"] + summary["neutral"] + summary["loss"])
+
+    def test_load_history_single_download_per_chunk(self):
+        """Geçmiş, hisse başına değil grup başına tek istekle indirilmeli"""
+        from backtest import load_history
+        frames = make_frames(count=3)
+        raw = pd.concat({t: df.rename(columns=str.capitalize) for t, df in frames.items()}, axis=1)
+        with patch("backtest.yf.download", return_value=raw) as mock_download:
+            loaded = load_history(list(frames), "2025-06-01", "2025-09-01")
+        self.assertEqual(mock_download.call_count, 1)
+        self.assertEqual(set(loaded), set(frames))
+
+
+@pytest.mark.unit
+class TestParameterSweep(unittest.TestCase):
+    """run_sweep() ve yardımcıları"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.frames = make_frames(count=6)
+        index = cls.frames["H1"].index
+        cls.start = index[70].strftime("%Y-%m-%d")
+        cls.end = index[-1].strftime("%Y-%m-%d")
+        cls.grid = {"rsi_period": [14, 21], "sma_long": [50], "min_score": [55, 60], "tech_weight": [0.7]}
+
+    def test_expand_grid(self):
+        """Izgara tüm kombinasyonlara açılmalı"""
+        combos = expand_grid({"a": [1, 2], "b": [3], "c": [4, 5]})
+        self.assertEqual(len(combos), 4)
+        self.assertIn({"a": 2, "b": 3, "c": 5}, combos)
+
+    def test_parse_grid(self):
+        """CLI ızgara argümanları tip korunarak okunmalı"""
+        grid = parse_grid(["rsi_period=14,21", "tech_weight=0.6,0.7"])
+        self.assertEqual(grid, {"rsi_period": [14, 21], "tech_weight": [0.6, 0.7]})
+        with self.assertRaises(ValueError):
+            parse_grid(["rsi_period"])
+
+    def test_unknown_grid_key_rejected(self):
+        """Yazım hatalı/bilinmeyen parametre kural sayılmadan reddedilmeli"""
+        with self.assertRaises(ValueError):
+            parse_grid(["rsi_perod=14,21"])
+        with self.assertRaises(ValueError):
+            run_sweep(self.start, self.end, tickers=list(self.frames), frames=self.frames,
+                      grid={"rsi_period": [14], "fib_lookback": [50]}, workers=1)
+        with self.assertRaises(ValueError):
+            run_walk_forward(self.start, self.end, tickers=list(self.frames), frames=self.frames,
+                             grid={"minscore": [55]})
+
+    def test_max_drawdown(self):
+        """Bileşik eğrideki tepe-dip düşüşü"""
+        self.assertAlmostEqual(max_drawdown([10, -50, 20]), 50.0)
+        self.assertEqual(max_drawdown([1, 2, 3]), 0.0)
+        self.assertEqual(max_drawdown([]), 0.0)
+
+    def test_drawdown_does_not_chain_overlapping_returns(self):
+        """Örtüşen N-bar getirileri 1/N ağırlıkla eğriye girmeli (ardışık zincirlenmemeli)"""
+        dates = pd.date_range("2024-01-01", periods=20, freq="B").strftime("%Y-%m-%d")
+        trades = [{"date": d, "return": -7.0} for d in dates]
+        metrics = evaluate_results(trades, horizon=7)
+        self.assertAlmostEqual(metrics["max_drawdown"], (1 - 0.99 ** 20) * 100)
+        self.assertAlmostEqual(evaluate_results(trades, horizon=1)["max_drawdown"], (1 - 0.93 ** 20) * 100)
+        report = bootstrap_confidence(trades, samples=200, horizon=7)
+        self.assertAlmostEqual(report["max_drawdown"]["value"], metrics["max_drawdown"])
+
+    def test_matches_single_backtest(self):
+        """Tarama satırı aynı parametreli tekil backtest ile aynı olmalı"""
+        rows = run_sweep(self.start, self.end, tickers=list(self.frames), frames=self.frames,
+                         grid=self.grid, workers=1)
+        self.assertEqual(len(rows), 4)
+        engine = BacktestEngine(self.frames, params={"rsi_period": 14, "sma_long": 50})
+        expected = evaluate_results(engine.run(self.start, self.end, min_score=60, tech_weight=0.7))
+        row = next(r for r in rows if r["params"] == {"rsi_period": 14, "sma_long": 50,
+                                                       "min_score": 60, "tech_weight": 0.7})
+        self.assertEqual({k: row[k] for k in expected}, expected)
+
+    def test_ranked_by_win_rate(self):
+        """Sonuçlar başarı oranı, sonra ortalama getiriye göre sıralı olmalı"""
+        rows = run_sweep(self.start, self.end, tickers=list(self.frames), frames=self.frames,
+                         grid=self.grid, workers=1)
+        keys = [(r["win_rate"], r["avg_return"]) for r in rows]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+    def test_process_pool_matches_inline(self):
+        """Paylaşımlı bellekli süreç havuzu tek süreçli sonuçla aynı olmalı"""
+        inline = run_sweep(self.start, self.end, tickers=list(self.frames), frames=self.frames,
+                           grid=self.grid, workers=1)
+        pooled = run_sweep(self.start, self.end, tickers=list(self.frames), frames=self.frames,
+                           grid=self.grid, workers=2)
+        self.assertEqual(pooled, inline)
+
+
+@pytest.mark.unit
+class TestWalkForward(unittest.TestCase):
+    """run_walk_forward() örneklem dışı değerlendirme"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.frames = make_frames(count=6, n=400)
+        cls.index = cls.frames["H1"].index
+        cls.start = cls.index[70].strftime("%Y-%m-%d")
+        cls.end = cls.index[-1].strftime("%Y-%m-%d")
+        cls.grid = {"min_score": [55, 60], "tech_weight": [0.6, 0.8]}
+
+    def test_folds_roll_without_overlap_or_leak(self):
+        """Test pencereleri ardışık olmalı, eğitim testten önce bitmeli"""
+        folds = walk_forward_folds(self.index, self.start, self.end, train_bars=120, test_bars=40)
+        self.assertGreater(len(folds), 1)
+        for prev, fold in zip(folds, folds[1:]):
+            self.assertLess(prev["test"][1], fold["test"][0])
+        for fold in folds:
+            train_end = self.index.get_loc(pd.Timestamp(fold["train"][1]))
+            test_start = self.index.get_loc(pd.Timestamp(fold["test"][0]))
+            # Eğitimin son işlemlerinin çıkışı test penceresine taşmamalı
+            self.assertGreaterEqual(test_start - train_end, HORIZON_BARS)
+
+    def test_only_out_of_sample_results(self):
+        """Sonuçlar sadece test pencerelerindeki işlemleri içermeli"""
+        report = run_walk_forward(self.start, self.end, tickers=list(self.frames), frames=self.frames,
+                                  grid=self.grid, train_bars=120, test_bars=40)
+        windows = [fold["test"] for fold in report["folds"]]
+        for r in report["results"]:
+            self.assertTrue(any(s <= r["date"] <= e for s, e in windows))
+        self.assertEqual(report["summary"], evaluate_results(report["results"]))
+        self.assertEqual(sum(f["test_metrics"]["trades"] for f in report["folds"]), len(report["results"]))
+
+    def test_params_chosen_on_training_window(self):
+        """Her pencerede eğitimde en iyi parametreler seçilmeli"""
+        report = run_walk_forward(self.start, self.end, tickers=list(self.frames), frames=self.frames,
+                                  grid=self.grid, train_bars=120, test_bars=40)
+        engine = BacktestEngine(self.frames)
+        fold = report["folds"][0]
+        best = max(
+            (evaluate_results(engine.run(*fold["train"], min_score=m, tech_weight=w))["win_rate"]
+             for m in self.grid["min_score"] for w in self.grid["tech_weight"])
+        )
+        self.assertEqual(fold["train_metrics"]["win_rate"], best)
+
+    def test_indicators_computed_once_per_param_set(self):
+        """Örtüşen pencereler göstergeleri yeniden hesaplamamalı"""
+        from indicator_engine import PanelIndicatorEngine
+        grid = {"rsi_period": [14, 21], "min_score": [55, 60]}
+        with patch("backtest.PanelIndicatorEngine.compute", side_effect=PanelIndicatorEngine.compute) as mock_compute:
+            report = run_walk_forward(self.start, self.end, tickers=list(self.frames), frames=self.frames,
+                                      grid=grid, train_bars=120, test_bars=40)
+        self.assertGreater(len(report["folds"]), 2)
+        self.assertLessEqual(mock_compute.call_count, 3)
+
+
+def make_trades(days: int = 200, per_day: int = 3, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2024-01-01", periods=days).strftime("%Y-%m-%d")
+    return [{"date": d, "return": float(rng.normal(1, 5))} for d in dates for _ in range(per_day)]
+
+
+@pytest.mark.unit
+class TestBootstrap(unittest.TestCase):
+    """Bootstrap güven aralıkları"""
+
+    def test_indices_shape_and_range(self):
+        """İndeks matrisi samples × n ve [0, n) aralığında olmalı"""
+        idx = bootstrap_indices(50, 200)
+        self.assertEqual(idx.shape, (200, 50))
+        self.assertTrue(((idx >= 0) & (idx < 50)).all())
+
+    def test_block_indices_contiguous(self):
+        """Blok bootstrap ardışık (dairesel) indeks blokları üretmeli"""
+        idx = bootstrap_indices(23, 100, block=5)
+        self.assertEqual(idx.shape, (100, 23))
+        blocks = idx[:, :20].reshape(100, 4, 5)
+        steps = np.diff(blocks, axis=2) % 23
+        self.assertTrue((steps == 1).all())
+
+    def test_intervals_contain_point_estimate(self):
+        """Nokta tahmini güven aralığı içinde olmalı"""
+        report = bootstrap_confidence(make_trades(), samples=2000)
+        for key in ["win_rate", "avg_return", "max_drawdown"]:
+            ci = report[key]
+            with self.subTest(metric=key):
+                self.assertLessEqual(ci["low"], ci["value"])
+                self.assertGreaterEqual(ci["high"], ci["value"])
+                self.assertLess(ci["low"], ci["high"])
+
+    def test_reproducible_with_seed(self):
+        """Aynı tohumla aynı aralıklar"""
+        trades = make_trades(days=50)
+        self.assertEqual(bootstrap_confidence(trades, samples=500), bootstrap_confidence(trades, samples=500))
+
+    def test_more_trades_narrower_interval(self):
+        """Daha fazla işlem → daha dar ortalama getiri aralığı"""
+        small = bootstrap_confidence(make_trades(days=30), samples=2000)["avg_return"]
+        large = bootstrap_confidence(make_trades(days=300), samples=2000)["avg_return"]
+        self.assertLess(large["high"] - large["low"], small["high"] - small["low"])
+
+    def test_empty_results(self):
+        self.assertEqual(bootstrap_confidence([]), {})
+
+    def test_run_backtest_reports_confidence(self):
+        """run_backtest özeti güven aralıklarını içermeli"""
+        frames = make_frames(count=4)
+        index = frames["H1"].index
+        summary = run_backtest(index[70].strftime("%Y-%m-%d"), index[-1].strftime("%Y-%m-%d"),
+                               tickers=list(frames), frames=frames, bootstrap=500)
+        self.assertIn("confidence", summary)
+        self.assertEqual(summary["confidence"]["samples"], 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
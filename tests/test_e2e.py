@@ -184,6 +184,13 @@ class TestNewsAnalysisPipeline(unittest.TestCase):
 class TestAnalyzeAllStocksE2E(unittest.TestCase):
     """analyze_all_stocks() fonksiyonu mock ile E2E testi"""
 
+    def setUp(self):
+        # Toplu indirme ağa çıkmasın
+        patcher = patch.object(TechnicalAnalyzer, "get_bulk_stock_data",
+                               return_value={"data": {}, "failed": {}})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def test_analyze_all_stocks_returns_list(self):
         """analyze_all_stocks() liste döndürmeli"""
         mock_result = _make_mock_stock_data("AAPL")
@@ -196,7 +203,7 @@ class TestAnalyzeAllStocksE2E(unittest.TestCase):
         """Her ticker için bir sonuç döndürmeli"""
         tickers = ["AAPL", "MSFT", "GOOGL"]
 
-        def side_effect(ticker):
+        def side_effect(ticker, data=None, cancel=None):
             return _make_mock_stock_data(ticker)
 
         with patch.object(TechnicalAnalyzer, "analyze_single_stock", side_effect=side_effect):
@@ -209,7 +216,7 @@ class TestAnalyzeAllStocksE2E(unittest.TestCase):
         """Tam E2E iş akışı: analiz → skor → öneri"""
         tickers = ["AAPL", "MSFT", "NVDA"]
 
-        def side_effect(ticker):
+        def side_effect(ticker, data=None, cancel=None):
             return _make_mock_stock_data(ticker)
 
         with patch.object(TechnicalAnalyzer, "analyze_single_stock", side_effect=side_effect):
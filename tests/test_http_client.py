@@ -0,0 +1,177 @@
+# ============================================================
+# tests/test_http_client.py — Paylaşılan HTTP İstemcisi Testleri
+# ============================================================
+# Kapsam: Keep-alive bağlantı yeniden kullanımı, tekrar deneme,
+# host başına eşzamanlılık sınırı, istatistikler, proxy ayarı
+# ============================================================
+
+import sys
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import pytest
+import requests
+
+import config
+import http_client
+from http_client import HttpClient, get_http_client
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Yol bazlı davranış: /ok, /flaky (önce 503), /slow"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.ports.add(self.client_address[1])
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            hits = server.hits[self.path]
+        try:
+            if self.path == "/slow":
+                time.sleep(server.delay)
+            status = 503 if self.path == "/flaky" and hits <= server.failures else 200
+            body = b'{"status": "ok"}'
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            pass
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.mark.unit
+class TestHttpClient(unittest.TestCase):
+    """HttpClient yerel stub sunucuya karşı"""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.ports = set()
+        self.server.hits = {}
+        self.server.active = 0
+        self.server.peak = 0
+        self.server.delay = 0.2
+        self.server.failures = 1
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.client = HttpClient(backoff_base=0.01)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_keep_alive_reuses_connection(self):
+        """Ardışık istekler aynı TCP bağlantısını kullanmalı"""
+        for _ in range(5):
+            self.assertEqual(self.client.get(f"{self.base}/ok", timeout=5).status_code, 200)
+        self.assertEqual(len(self.server.ports), 1)
+
+    def test_retries_transient_status(self):
+        """503 yanıtı tekrar denenmeli ve sonunda 200 dönmeli"""
+        response = self.client.get(f"{self.base}/flaky", timeout=5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.hits["/flaky"], 2)
+        host = self.base.split("//")[1]
+        stats = self.client.get_stats()[host]
+        self.assertEqual(stats["retries"], 1)
+        self.assertEqual(stats["status"], {503: 1, 200: 1})
+
+    def test_returns_last_response_when_retries_exhausted(self):
+        """Tekrar denemeler bitince son yanıt döndürülmeli"""
+        self.server.failures = 10
+        response = HttpClient(retries=1, backoff_base=0.01).get(f"{self.base}/flaky", timeout=5)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.server.hits["/flaky"], 2)
+
+    def test_before_retry_gates_each_retry(self):
+        """before_retry her tekrar denemeden önce çağrılmalı; False ise tekrar denenmemeli"""
+        self.server.failures = 10
+        calls = []
+        response = self.client.get(f"{self.base}/flaky", timeout=5,
+                                   before_retry=lambda: calls.append(1) or len(calls) < 2)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self.server.hits["/flaky"], 2)
+
+    def test_timeout_not_retried(self):
+        """Zaman aşımı tekrar denenmeden yükseltilmeli"""
+        self.server.delay = 0.5
+        with self.assertRaises(requests.exceptions.Timeout):
+            self.client.get(f"{self.base}/slow", timeout=0.1)
+        self.assertEqual(self.server.hits["/slow"], 1)
+
+    def test_connection_error_retried(self):
+        """Bağlantı hatası HTTP_RETRIES kez tekrar denenip yükseltilmeli"""
+        client = HttpClient(retries=2, backoff_base=0.01)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            client.get("http://127.0.0.1:1/ok", timeout=1)
+        stats = client.get_stats()["127.0.0.1:1"]
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["errors"], 3)
+        self.assertEqual(stats["retries"], 2)
+
+    def test_per_host_concurrency_limit(self):
+        """Aynı host'a eşzamanlı istek sayısı sınırı aşmamalı"""
+        client = HttpClient(max_per_host=2)
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            list(executor.map(lambda _: client.get(f"{self.base}/slow", timeout=5), range(6)))
+        self.assertEqual(self.server.hits["/slow"], 6)
+        self.assertLessEqual(self.server.peak, 2)
+
+    def test_latency_histogram(self):
+        """Her istek tam olarak bir histogram kovasına düşmeli"""
+        for _ in range(3):
+            self.client.get(f"{self.base}/ok", timeout=5)
+        self.client.get(f"{self.base}/slow", timeout=5)
+        stats = self.client.get_stats()[self.base.split("//")[1]]
+        self.assertEqual(stats["requests"], 4)
+        self.assertEqual(sum(stats["latency_histogram"].values()), 4)
+        self.assertGreaterEqual(stats["latency_histogram"]["<=0.25s"] +
+                                stats["latency_histogram"]["<=0.5s"], 1)
+
+
+@pytest.mark.unit
+class TestSharedClient(unittest.TestCase):
+    """get_http_client() paylaşılan örnek"""
+
+    def tearDown(self):
+        http_client._client = None
+
+    def test_shared_instance(self):
+        """Aynı örnek tekrar kullanılmalı"""
+        self.assertIs(get_http_client(), get_http_client())
+
+    def test_uses_config_proxies(self):
+        """config.PROXIES oturuma uygulanmalı, değişince örnek yenilenmeli"""
+        original = config.PROXIES
+        try:
+            config.PROXIES = {"http": "http://proxy.local:8080", "https": "http://proxy.local:8080"}
+            client = get_http_client()
+            self.assertEqual(client.session.proxies["https"], "http://proxy.local:8080")
+            config.PROXIES = None
+            self.assertIsNot(get_http_client(), client)
+        finally:
+            config.PROXIES = original
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+# ============================================================
+# tests/test_indicator_engine.py — Panel Gösterge Motoru Testleri
+# ============================================================
+# Kapsam: Tek hisse fonksiyonlarıyla birebir eşlik, eksik günler,
+# tarih bazlı (as-of) seriler, analyze_all_stocks entegrasyonu
+# ============================================================
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from unittest.mock import patch
+import pandas as pd
+import numpy as np
+import pytest
+
+import config
+from technical_analyzer import TechnicalAnalyzer
+from indicator_engine import PanelIndicatorEngine
+from tests.conftest import make_ohlcv_df
+
+
+def scalar_indicators(df: pd.DataFrame) -> dict:
+    """analyze_single_stock'un tek hisse yolundaki gösterge değerleri"""
+    close = df["close"]
+    macd = TechnicalAnalyzer.calculate_macd(close)
+    bollinger = TechnicalAnalyzer.calculate_bollinger_bands(close, period=config.BOLLINGER_PERIOD)
+    return {
+        "rsi": TechnicalAnalyzer.calculate_rsi(close, period=config.RSI_PERIOD),
+        "macd_line": macd["macd_line"],
+        "signal_line": macd["signal_line"],
+        "macd_histogram": macd["histogram"],
+        "bollinger_upper": bollinger["upper_band"],
+        "bollinger_middle": bollinger["middle_band"],
+        "bollinger_lower": bollinger["lower_band"],
+        "bollinger_position": bollinger["position"],
+        "sma_short": TechnicalAnalyzer.calculate_sma(close, config.SMA_SHORT),
+        "sma_long": TechnicalAnalyzer.calculate_sma(close, config.SMA_LONG),
+        "momentum_pct": TechnicalAnalyzer.calculate_momentum(close, period=config.MOMENTUM_PERIOD),
+        "atr": TechnicalAnalyzer.calculate_atr(df),
+    }
+
+
+def make_universe(count: int = 40, seed: int = 7) -> dict:
+    """Farklı uzunluk, eksik gün ve sabit fiyat içeren hisse evreni"""
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for i in range(count):
+        n = int(rng.integers(20, 250))
+        df = make_ohlcv_df(n, start=float(rng.uniform(5, 500)), seed=seed + i)
+        if i % 4 == 0:
+            # Tatil günleri (diğer hisselerde var, bunda yok)
+            df = df.drop(df.index[rng.choice(n, size=n // 8, replace=False)])
+        if i % 9 == 0:
+            df["close"] = df["close"].round(0)
+        frames[f"T{i}"] = df
+    frames["FLAT"] = make_ohlcv_df(120, seed=99).assign(close=50.0, high=50.0, low=50.0)
+    return frames
+
+
+@pytest.mark.unit
+class TestPanelParity(unittest.TestCase):
+    """Panel sonuçları tek hisse fonksiyonlarıyla aynı olmalı"""
+
+    def setUp(self):
+        self.frames = make_universe()
+        self.values = PanelIndicatorEngine.analyze_frames(self.frames)
+
+    def test_all_tickers_present(self):
+        """Her hisse için sonuç üretilmeli"""
+        self.assertEqual(set(self.values), set(self.frames))
+
+    def test_latest_values_match_scalar(self):
+        """Son değerler yuvarlamalar dahil birebir eşleşmeli"""
+        for ticker, df in self.frames.items():
+            with self.subTest(ticker=ticker, bars=len(df)):
+                self.assertEqual(self.values[ticker], scalar_indicators(df))
+
+    def test_series_are_as_of_values(self):
+        """Her tarihteki değer, o tarihe kadar kesilmiş veriyle aynı olmalı"""
+        panel = PanelIndicatorEngine.build_panel(self.frames)
+        series = PanelIndicatorEngine.compute(panel["close"], panel["high"], panel["low"])
+        j = panel["tickers"].index("T0")
+        df = self.frames["T0"]
+        for cut in [10, 22, 30, 70, len(df)]:
+            sub = df.iloc[:cut]
+            row = panel["index"].get_loc(sub.index[-1])
+            expected = scalar_indicators(sub)
+            self.assertEqual(round(float(series["rsi"][row, j]), 1), expected["rsi"])
+            self.assertEqual(round(float(series["sma_short"][row, j]), 2), expected["sma_short"])
+            self.assertEqual(round(float(series["atr"][row, j]), 2), expected["atr"])
+
+    def test_missing_dates_are_nan(self):
+        """Hissenin olmadığı tarihler NaN kalmalı"""
+        panel = PanelIndicatorEngine.build_panel(self.frames)
+        series = PanelIndicatorEngine.compute(panel["close"], panel["high"], panel["low"])
+        missing = np.isnan(panel["close"])
+        self.assertTrue(np.isnan(series["rsi"][missing]).all())
+
+    def test_close_only_panel(self):
+        """High/low verilmezse ATR 0 olmalı, diğerleri hesaplanmalı"""
+        close = self.frames["T1"]["close"].to_numpy()
+        series = PanelIndicatorEngine.compute(close)
+        self.assertEqual(series["rsi"].shape, (len(close), 1))
+        self.assertEqual(float(series["atr"][-1, 0]), 0.0)
+        self.assertEqual(
+            round(float(series["rsi"][-1, 0]), 1),
+            TechnicalAnalyzer.calculate_rsi(self.frames["T1"]["close"], period=config.RSI_PERIOD),
+        )
+
+    def test_empty_frames(self):
+        """Boş girişte boş sonuç"""
+        self.assertEqual(PanelIndicatorEngine.analyze_frames({}), {})
+
+
+@pytest.mark.unit
+class TestPanelIntegration(unittest.TestCase):
+    """analyze_all_stocks panel göstergelerini kullanmalı"""
+
+    def test_results_match_single_stock_path(self):
+        """Panel yolu ile tek hisse yolu aynı sonucu vermeli"""
+        from technical_analyzer import analyze_all_stocks
+        frames = make_universe(count=6, seed=3)
+        prefetched = {t: {"df": df, "source": "historical"} for t, df in frames.items()}
+
+        with patch.object(TechnicalAnalyzer, "get_bulk_stock_data",
+                          return_value={"data": prefetched, "failed": {}}):
+            results = analyze_all_stocks(list(frames), max_workers=1)
+
+        for result in results:
+            expected = TechnicalAnalyzer.analyze_single_stock(
+                result["ticker"], data={"df": frames[result["ticker"]], "source": "historical"}
+            )
+            expected.pop("dataframe")
+            result = {k: v for k, v in result.items() if k != "dataframe"}
+            self.assertEqual(result, expected)
+
+    def test_scalar_path_not_called(self):
+        """Panel değerleri varken tek hisse gösterge fonksiyonları çağrılmamalı"""
+        frames = {"A": make_ohlcv_df(120)}
+        indicators = PanelIndicatorEngine.analyze_frames(frames)["A"]
+        with patch.object(TechnicalAnalyzer, "calculate_rsi") as mock_rsi:
+            result = TechnicalAnalyzer.analyze_single_stock(
+                "A", data={"df": frames["A"], "source": "historical", "indicators": indicators}
+            )
+        mock_rsi.assert_not_called()
+        self.assertEqual(result["rsi"], indicators["rsi"])
+
+
+if __name__ == "__main__":
+    unittest.main()
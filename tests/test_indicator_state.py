@@ -0,0 +1,151 @@
+# ============================================================
+# tests/test_indicator_state.py — Artımlı Gösterge Durumu Testleri
+# ============================================================
+# Kapsam: Toplu hesapla eşlik, serileştirme, seans içi güncelleme,
+# depo senkronizasyonu
+# ============================================================
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from unittest.mock import patch
+import pandas as pd
+import numpy as np
+import pytest
+
+import config
+from technical_analyzer import TechnicalAnalyzer
+from indicator_state import IndicatorState, IndicatorStateStore
+from tests.conftest import make_ohlcv_df
+
+
+def feed(state: IndicatorState, df: pd.DataFrame):
+    """Barları tek tek işle"""
+    for date, row in df.iterrows():
+        state.update(date, row["close"], row["high"], row["low"], row["volume"])
+
+
+@pytest.mark.unit
+class TestIndicatorState(unittest.TestCase):
+    """IndicatorState bar bar güncelleme testleri"""
+
+    def test_matches_batch_every_bar(self):
+        """Her bardan sonra calculate_indicators ile aynı olmalı"""
+        df = make_ohlcv_df(300, seed=11)
+        state = IndicatorState()
+        for i, (date, row) in enumerate(df.iterrows()):
+            state.update(date, row["close"], row["high"], row["low"], row["volume"])
+            if i % 10 == 0 or i == len(df) - 1:
+                with self.subTest(bars=i + 1):
+                    self.assertEqual(state.values(), TechnicalAnalyzer.calculate_indicators(df.iloc[:i + 1]))
+
+    def test_long_history_with_resync(self):
+        """Yeniden senkronizasyondan sonra da eşleşmeli"""
+        df = make_ohlcv_df(IndicatorState.RESYNC_BARS * 3 + 7, seed=5)
+        state = IndicatorState.from_frame(df)
+        self.assertEqual(state.values(), TechnicalAnalyzer.calculate_indicators(df))
+
+    def test_flat_prices(self):
+        """Sabit fiyatta SMA/Bollinger tam değer vermeli"""
+        df = make_ohlcv_df(120).assign(close=42.0, high=42.0, low=42.0)
+        state = IndicatorState.from_frame(df)
+        self.assertEqual(state.values(), TechnicalAnalyzer.calculate_indicators(df))
+        self.assertEqual(state.values()["sma_long"], 42.0)
+
+    def test_serialization_roundtrip(self):
+        """to_dict/from_dict sonrası güncelleme aynı sonucu vermeli"""
+        import json
+        df = make_ohlcv_df(150, seed=3)
+        state = IndicatorState.from_frame(df.iloc[:-1])
+        restored = IndicatorState.from_dict(json.loads(json.dumps(state.to_dict())))
+        last = df.iloc[-1]
+        restored.update(df.index[-1], last["close"], last["high"], last["low"], last["volume"])
+        self.assertEqual(restored.values(), TechnicalAnalyzer.calculate_indicators(df))
+
+    def test_same_date_replaces_last_bar(self):
+        """Aynı tarihli bar tekrar gelirse öncekinin yerine geçmeli"""
+        df = make_ohlcv_df(120, seed=8)
+        state = IndicatorState.from_frame(df)
+        revised = df.copy()
+        revised.iloc[-1, revised.columns.get_loc("close")] *= 1.03
+        last = revised.iloc[-1]
+        state.update(revised.index[-1], last["close"], last["high"], last["low"], last["volume"])
+        self.assertEqual(state.bars, len(df))
+        self.assertEqual(state.values(), TechnicalAnalyzer.calculate_indicators(revised))
+
+    def test_older_bar_ignored(self):
+        """İşlenmiş tarihten eski bar yok sayılmalı"""
+        df = make_ohlcv_df(60)
+        state = IndicatorState.from_frame(df)
+        first = df.iloc[0]
+        self.assertFalse(state.update(df.index[0], first["close"], first["high"], first["low"], first["volume"]))
+        self.assertEqual(state.bars, len(df))
+
+
+@pytest.mark.unit
+class TestIndicatorStateStore(unittest.TestCase):
+    """IndicatorStateStore senkronizasyon testleri"""
+
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = IndicatorStateStore(self.tmp.name)
+        self.df = make_ohlcv_df(200, seed=21)
+
+    def test_new_bar_only_processed(self):
+        """Kayıtlı durum varsa sadece yeni bar işlenmeli"""
+        self.store.sync("AAA", self.df.iloc[:-1])
+        with patch.object(IndicatorState, "_apply", autospec=True,
+                          side_effect=IndicatorState._apply) as mock_apply:
+            values = self.store.sync("AAA", self.df)
+        self.assertEqual(mock_apply.call_count, 1)
+        self.assertEqual(values, TechnicalAnalyzer.calculate_indicators(self.df))
+
+    def test_adjusted_history_rebuilds(self):
+        """Geçmiş değişmişse (örn. temettü düzeltmesi) durum yeniden kurulmalı"""
+        self.store.sync("AAA", self.df.iloc[:-1])
+        adjusted = self.df.copy()
+        adjusted[["close", "high", "low"]] *= 0.98
+        values = self.store.sync("AAA", adjusted)
+        self.assertEqual(values, TechnicalAnalyzer.calculate_indicators(adjusted))
+
+    def test_adjustment_without_new_bar_rebuilds(self):
+        """Yeni bar gelmeden geçmiş düzeltilirse (son tarih aynı) durum yeniden kurulmalı"""
+        self.store.sync("AAA", self.df)
+        adjusted = self.df.copy()
+        adjusted[["close", "high", "low"]] *= 0.98
+        self.assertFalse(self.store.load("AAA").can_extend(adjusted))
+        values = self.store.sync("AAA", adjusted)
+        self.assertEqual(values, TechnicalAnalyzer.calculate_indicators(adjusted))
+
+    def test_cancelled_sync_does_not_persist(self):
+        """İptal bayrağı set edilmişse değerler dönmeli ama durum yazılmamalı"""
+        import threading
+        cancel = threading.Event()
+        cancel.set()
+        values = self.store.sync("AAA", self.df, cancel=cancel)
+        self.assertEqual(values, TechnicalAnalyzer.calculate_indicators(self.df))
+        self.assertIsNone(self.store.load("AAA"))
+
+    def test_param_change_invalidates(self):
+        """Gösterge parametreleri değişince eski durum kullanılmamalı"""
+        self.store.sync("AAA", self.df)
+        with patch.object(config, "RSI_PERIOD", 14):
+            self.assertIsNone(self.store.load("AAA"))
+
+    def test_analyze_single_stock_uses_state(self):
+        """USE_INDICATOR_STATE açıkken analiz durumu kaydetmeli"""
+        with patch.object(config, "USE_INDICATOR_STATE", True), \
+             patch.object(config, "INDICATOR_STATE_DIR", self.tmp.name):
+            result = TechnicalAnalyzer.analyze_single_stock("BBB", data={"df": self.df, "source": "historical"})
+        self.assertFalse(result["skip"])
+        self.assertIsNotNone(self.store.load("BBB"))
+        self.assertEqual(result["rsi"], TechnicalAnalyzer.calculate_indicators(self.df)["rsi"])
+
+
+if __name__ == "__main__":
+    unittest.main()
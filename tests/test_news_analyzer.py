@@ -8,13 +8,17 @@ import sys
 import os
 import time
 import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import unittest
 import pytest
 
-from news_analyzer import RateLimiter, CacheManager, NewsAnalyzer
+from news_analyzer import RateLimiter, CacheManager, NewsAnalyzer, plan_news_queries, attribute_articles
 
 
 # ─────────────────────────────────────────────
@@ -152,6 +156,164 @@ class TestCacheManager(unittest.TestCase):
         self.assertIn("estimated_size_mb", usage)
 
 
+@pytest.mark.unit
+class TestSqliteCacheBackend(unittest.TestCase):
+    """CacheManager SQLite disk katmanı testleri"""
+
+    def setUp(self):
+        import tempfile
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = CacheManager(cache_dir=self.tmp_dir, ttl_hours=1)
+
+    def tearDown(self):
+        self.cache.close()
+
+    def test_single_database_file(self):
+        """Girişler anahtar başına dosya yerine tek veritabanında tutulmalı"""
+        for i in range(20):
+            self.cache.set(f"key_{i}", {"i": i})
+        # cache.db ve WAL yan dosyaları dışında dosya olmamalı
+        for filename in os.listdir(self.tmp_dir):
+            self.assertTrue(filename.startswith("cache.db"), filename)
+
+    def test_persists_across_instances(self):
+        """Yeni örnek bellek boşken veriyi veritabanından okumalı"""
+        self.cache.set("persist_key", [1, 2, 3])
+        other = CacheManager(cache_dir=self.tmp_dir, ttl_hours=1)
+        try:
+            self.assertEqual(other.memory_cache, {})
+            self.assertEqual(other.get("persist_key"), [1, 2, 3])
+            self.assertIn("persist_key", other.memory_cache)
+        finally:
+            other.close()
+
+    def test_clear_expired_deletes_rows(self):
+        """clear_expired süresi geçen satırları tek sorguda silmeli"""
+        expired = CacheManager(cache_dir=self.tmp_dir, ttl_hours=0)
+        try:
+            expired.set("old", "data")
+            self.cache.set("fresh", "data")
+            expired.clear_expired()
+            count = self.cache._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            self.assertEqual(count, 1)
+            self.assertEqual(self.cache.get("fresh"), "data")
+        finally:
+            expired.close()
+
+    def test_expiry_uses_index(self):
+        """Süre sorgusu expires_at indeksini kullanmalı"""
+        plan = self.cache._conn.execute(
+            "EXPLAIN QUERY PLAN DELETE FROM cache WHERE expires_at <= ?", (time.time(),)
+        ).fetchall()
+        self.assertTrue(any("idx_cache_expires" in row[-1] for row in plan))
+
+    def test_migrates_legacy_json_files(self):
+        """Eski <md5>.json dosyaları veritabanına taşınıp silinmeli"""
+        import tempfile
+        legacy_dir = tempfile.mkdtemp()
+        key_hash = self.cache._get_cache_key("news_legacy_1")
+        with open(os.path.join(legacy_dir, f"{key_hash}.json"), "w") as f:
+            json.dump({"timestamp": time.time(), "data": ["legacy"]}, f)
+
+        migrated = CacheManager(cache_dir=legacy_dir, ttl_hours=1)
+        try:
+            self.assertEqual(migrated.get("news_legacy_1"), ["legacy"])
+            self.assertFalse([f for f in os.listdir(legacy_dir) if f.endswith(".json")])
+        finally:
+            migrated.close()
+
+    def test_concurrent_sets(self):
+        """Eşzamanlı yazmalar hatasız ve kayıpsız olmalı"""
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda i: self.cache.set(f"k{i}", i), range(200)))
+        count = self.cache._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        self.assertEqual(count, 200)
+
+
+    def test_shared_cache_created_lazily_in_config_dir(self):
+        """Paylaşılan haber cache'i ilk kullanımda config.NEWS_CACHE_DIR'de açılmalı"""
+        import config as cfg
+        self.assertIsNone(NewsAnalyzer._cache)
+        self.assertFalse(os.path.exists(cfg.NEWS_CACHE_DIR))
+        cache = NewsAnalyzer._get_cache()
+        self.assertIs(NewsAnalyzer._get_cache(), cache)
+        self.assertEqual(cache.db_path, os.path.join(cfg.NEWS_CACHE_DIR, CacheManager.DB_FILENAME))
+
+
+@pytest.mark.unit
+class TestBoundedMemoryCache(unittest.TestCase):
+    """CacheManager LRU bellek katmanı testleri"""
+
+    def setUp(self):
+        import tempfile
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def _cache(self, **kwargs):
+        cache = CacheManager(cache_dir=self.tmp_dir, ttl_hours=1, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_evicts_least_recently_used_by_count(self):
+        """Giriş sınırı aşılınca en eski kullanılan çıkarılmalı"""
+        cache = self._cache(max_items=3)
+        for key in ["a", "b", "c"]:
+            cache.set(key, key)
+        cache.get("a")  # a en yeni kullanılan olur
+        cache.set("d", "d")
+
+        self.assertEqual(list(cache.memory_cache), ["c", "a", "d"])
+        self.assertEqual(cache.get_memory_usage()["evictions"], 1)
+        # Çıkarılan giriş diskten okunmaya devam eder
+        self.assertEqual(cache.get("b"), "b")
+        self.assertEqual(cache.get_memory_usage()["disk_hits"], 1)
+
+    def test_evicts_by_byte_size(self):
+        """Bayt sınırı aşılınca boyut sınırın altına inmeli"""
+        cache = self._cache(max_items=1000, max_mb=0.01)
+        for i in range(20):
+            cache.set(f"k{i}", "x" * 1000)
+        usage = cache.get_memory_usage()
+        self.assertLessEqual(cache.memory_bytes, cache.max_bytes)
+        self.assertLess(usage["cached_items"], 20)
+        self.assertGreater(usage["evictions"], 0)
+
+    def test_size_tracked_incrementally(self):
+        """Bayt sayacı set, üzerine yazma ve temizlikte tutarlı kalmalı"""
+        cache = self._cache()
+        cache.set("a", "x" * 100)
+        cache.set("b", [1, 2, 3])
+        cache.set("a", "y" * 10)
+        expected = sum(len(json.dumps(item["data"])) for item in cache.memory_cache.values())
+        self.assertEqual(cache.memory_bytes, expected)
+
+        expired = CacheManager(cache_dir=self.tmp_dir, ttl_hours=0)
+        self.addCleanup(expired.close)
+        expired.set("z", "data")
+        expired.clear_expired()
+        self.assertEqual(expired.memory_bytes, 0)
+        self.assertEqual(len(expired.memory_cache), 0)
+
+    def test_hit_miss_counters(self):
+        """İsabet ve ıska sayaçları güncellenmeli"""
+        cache = self._cache()
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("a")
+        cache.get("missing")
+        usage = cache.get_memory_usage()
+        self.assertEqual(usage["hits"], 2)
+        self.assertEqual(usage["misses"], 1)
+
+    def test_memory_flat_over_many_sets(self):
+        """Uzun süreli çalışmada bellek katmanı sınırda sabit kalmalı"""
+        cache = self._cache(max_items=50)
+        for i in range(500):
+            cache.set(f"news_{i}", {"articles": ["a" * 50] * 3})
+        self.assertEqual(len(cache.memory_cache), 50)
+        self.assertEqual(cache.get_memory_usage()["evictions"], 450)
+
+
 # ─────────────────────────────────────────────
 # NewsAnalyzer.analyze_sentiment() Testleri
 # ─────────────────────────────────────────────
@@ -443,17 +605,17 @@ class TestGetNewsApiFirst(unittest.TestCase):
 
     def tearDown(self):
         NewsAnalyzer._rate_limiter = RateLimiter(max_requests=100, period_hours=24)
-        NewsAnalyzer._cache = CacheManager(cache_dir="cache/news", ttl_hours=24)
+        NewsAnalyzer._cache = None
 
     def test_api_called_when_key_present(self):
-        """Geçerli API key ile requests.get çağrılmalı"""
+        """Geçerli API key ile paylaşılan HTTP oturumu çağrılmalı"""
         from unittest.mock import patch
         import config as cfg
 
         original_key = cfg.NEWS_API_KEY
         try:
             cfg.NEWS_API_KEY = "valid_test_key_1234567890"
-            with patch("requests.get", return_value=self._make_api_response()) as mock_get:
+            with patch("requests.Session.request", return_value=self._make_api_response()) as mock_get:
                 result = NewsAnalyzer.get_news("technology", days_back=1, use_cache=False)
                 mock_get.assert_called_once()
                 self.assertIsInstance(result, list)
@@ -469,7 +631,7 @@ class TestGetNewsApiFirst(unittest.TestCase):
         original_key = cfg.NEWS_API_KEY
         try:
             cfg.NEWS_API_KEY = "valid_test_key_1234567890"
-            with patch("requests.get", return_value=self._make_api_response()):
+            with patch("requests.Session.request", return_value=self._make_api_response()):
                 NewsAnalyzer.get_news("technology", days_back=1, use_cache=True)
             cached = NewsAnalyzer._cache.get("news_technology_1")
             self.assertIsNotNone(cached)
@@ -492,7 +654,7 @@ class TestGetNewsApiFirst(unittest.TestCase):
             err_resp.status_code = 401
             err_resp.json.return_value = {"status": "error", "code": "apiKeyInvalid",
                                           "message": "Your API key is invalid."}
-            with patch("requests.get", return_value=err_resp):
+            with patch("requests.Session.request", return_value=err_resp):
                 result = NewsAnalyzer.get_news("technology", days_back=1, use_cache=True)
             self.assertEqual(len(result), 1)
             self.assertEqual(result[0]["title"], "Cached")
@@ -512,7 +674,7 @@ class TestGetNewsApiFirst(unittest.TestCase):
                                  "publishedAt": "2026-01-01T10:00:00Z"}]
             NewsAnalyzer._cache.set("news_technology_1", cached_articles)
 
-            with patch("requests.get", side_effect=req_lib.exceptions.Timeout):
+            with patch("requests.Session.request", side_effect=req_lib.exceptions.Timeout):
                 result = NewsAnalyzer.get_news("technology", days_back=1, use_cache=True)
             self.assertEqual(len(result), 1)
             self.assertEqual(result[0]["title"], "Cached on timeout")
@@ -534,7 +696,7 @@ class TestGetNewsApiFirst(unittest.TestCase):
                                  "publishedAt": "2026-01-01T10:00:00Z"}]
             NewsAnalyzer._cache.set("news_technology_1", cached_articles)
 
-            with patch("requests.get") as mock_get:
+            with patch("requests.Session.request") as mock_get:
                 result = NewsAnalyzer.get_news("technology", days_back=1, use_cache=True)
                 mock_get.assert_not_called()
             self.assertEqual(result[0]["title"], "Rate limited cached")
@@ -558,7 +720,7 @@ class TestAnalyzeSectorNewsNoCacheFailures(unittest.TestCase):
 
     def tearDown(self):
         NewsAnalyzer._rate_limiter = RateLimiter(max_requests=100, period_hours=24)
-        NewsAnalyzer._cache = CacheManager(cache_dir="cache/news", ttl_hours=24)
+        NewsAnalyzer._cache = None
 
     def test_no_data_result_not_cached(self):
         """no_data sonucu cache'e kaydedilmemeli"""
@@ -594,7 +756,7 @@ class TestAnalyzeSectorNewsNoCacheFailures(unittest.TestCase):
             ok_resp = MagicMock()
             ok_resp.status_code = 200
             ok_resp.json.return_value = {"status": "ok", "articles": articles}
-            with patch("requests.get", return_value=ok_resp):
+            with patch("requests.Session.request", return_value=ok_resp):
                 result = NewsAnalyzer.analyze_sector_news("finans", days_back=1)
             self.assertEqual(result["status"], "success")
             cached = NewsAnalyzer._cache.get("sector_finans_1")
@@ -628,5 +790,311 @@ class TestAnalyzeSectorNewsNoCacheFailures(unittest.TestCase):
             cfg.NEWS_API_KEY = original_key
 
 
+# ─────────────────────────────────────────────
+# Eşzamanlı Haber Çekme – Yerel Stub Sunucu Testleri
+# ─────────────────────────────────────────────
+
+class _StubNewsHandler(BaseHTTPRequestHandler):
+    """NewsAPI benzeri yanıt veren, gecikmeli yerel sunucu"""
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        keyword = query.get("q", [""])[0]
+        self.server.queries.append(keyword)
+        self.server.sorts[keyword] = query.get("sortBy", [""])[0]
+        time.sleep(self.server.delay)
+        articles = self.server.articles(keyword) if callable(self.server.articles) else self.server.articles
+        articles = articles or [{
+            "title": f"{keyword} headline",
+            "description": f"{keyword} description",
+            "publishedAt": "2026-01-01T10:00:00Z",
+            "source": {"name": "Reuters"},
+        }]
+        status, payload = 200, {"status": "ok", "articles": articles}
+        if self.server.failures > 0:
+            # Geçici sunucu hatası (503) → istemci tekrar dener
+            self.server.failures -= 1
+            status, payload = 503, {"status": "error", "code": "unavailable", "message": "busy"}
+        body = json.dumps(payload).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class _StubNewsServerTestCase(unittest.TestCase):
+    """Yerel stub NewsAPI sunucusu + temiz RateLimiter/Cache"""
+
+    def setUp(self):
+        import tempfile
+        import config as cfg
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubNewsHandler)
+        self.server.daemon_threads = True
+        self.server.queries = []
+        self.server.sorts = {}
+        self.server.failures = 0
+        self.server.delay = 0.3
+        self.server.articles = None
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.cfg = cfg
+        self.original = (cfg.NEWS_API_KEY, cfg.NEWS_API_URL, cfg.NEWS_API_TIMEOUT, cfg.NEWS_COALESCE_QUERIES)
+        cfg.NEWS_API_KEY = "valid_test_key_1234567890"
+        cfg.NEWS_API_URL = f"http://127.0.0.1:{self.server.server_address[1]}/v2/everything"
+        NewsAnalyzer._rate_limiter = RateLimiter(max_requests=100, period_hours=24)
+        NewsAnalyzer._cache = CacheManager(cache_dir=tempfile.mkdtemp(), ttl_hours=24)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        (self.cfg.NEWS_API_KEY, self.cfg.NEWS_API_URL, self.cfg.NEWS_API_TIMEOUT,
+         self.cfg.NEWS_COALESCE_QUERIES) = self.original
+        NewsAnalyzer._rate_limiter = RateLimiter(max_requests=100, period_hours=24)
+        NewsAnalyzer._cache = None
+
+
+@pytest.mark.unit
+class TestConcurrentNewsFetch(_StubNewsServerTestCase):
+    """fetch_news_batch() ve analyze_news() eşzamanlı sorgular"""
+
+    def test_batch_runs_concurrently(self):
+        """Sorgular paralel gitmeli: toplam süre tek gecikmeye yakın"""
+        keywords = [f"topic{i}" for i in range(6)]
+        started = time.perf_counter()
+        results = NewsAnalyzer.fetch_news_batch(keywords, days_back=1)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(list(results), keywords)
+        for keyword in keywords:
+            self.assertEqual(results[keyword][0]["title"], f"{keyword} headline")
+        self.assertLess(elapsed, 0.3 * len(keywords) / 2)
+
+    def test_batch_respects_rate_limit(self):
+        """Kota kadar istek gitmeli, kalanlar cache'den dönmeli"""
+        NewsAnalyzer._rate_limiter = RateLimiter(max_requests=2, period_hours=24)
+        NewsAnalyzer._cache.set("news_topic3_1", [{"title": "cached topic3"}])
+        keywords = [f"topic{i}" for i in range(4)]
+        results = NewsAnalyzer.fetch_news_batch(keywords, days_back=1)
+
+        self.assertEqual(len(self.server.queries), 2)
+        self.assertEqual(NewsAnalyzer._rate_limiter.requests_remaining(), 0)
+        served = [k for k in keywords if results[k] and results[k][0]["title"] == f"{k} headline"]
+        self.assertEqual(len(served), 2)
+        if "topic3" not in served:
+            self.assertEqual(results["topic3"][0]["title"], "cached topic3")
+
+    def test_timeout_falls_back_to_cache_once(self):
+        """Tüm sorgular zaman aşımına uğrarsa tek zaman aşımı süresinde cache dönmeli"""
+        self.server.delay = 1.0
+        self.cfg.NEWS_API_TIMEOUT = 0.2
+        keywords = [f"slow{i}" for i in range(5)]
+        for keyword in keywords:
+            NewsAnalyzer._cache.set(f"news_{keyword}_1", [{"title": f"cached {keyword}"}])
+
+        started = time.perf_counter()
+        results = NewsAnalyzer.fetch_news_batch(keywords, days_back=1)
+        elapsed = time.perf_counter() - started
+
+        for keyword in keywords:
+            self.assertEqual(results[keyword][0]["title"], f"cached {keyword}")
+        self.assertLess(elapsed, 0.2 * len(keywords))
+
+    def test_geopolitical_news_uses_batch(self):
+        """Jeopolitik haberler aynı stub sunucudan eşzamanlı çekilmeli"""
+        from global_market_analyzer import GeopoliticalNewsIntegration
+        self.cfg.NEWS_COALESCE_QUERIES = False
+        started = time.perf_counter()
+        news = GeopoliticalNewsIntegration.get_geopolitical_news()
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(news), 10)
+        self.assertEqual(news[0]["title"], "Russia Ukraine war headline")
+        self.assertLess(elapsed, 0.3 * 10 / 2)
+
+
+def _article(title, description="", url=None):
+    recent = (datetime.now() - timedelta(hours=6)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return {"title": title, "description": description, "publishedAt": recent,
+            "source": {"name": "Reuters"}, "url": url or title}
+
+
+@pytest.mark.unit
+class TestRetryQuota(_StubNewsServerTestCase):
+    """HTTP tekrar denemeleri RateLimiter kotasından düşmeli"""
+
+    def setUp(self):
+        super().setUp()
+        import http_client
+        self.server.delay = 0
+        self.server.failures = 1
+        self.backoff = self.cfg.HTTP_BACKOFF_BASE
+        self.cfg.HTTP_BACKOFF_BASE = 0.01
+        http_client._client = None
+
+    def tearDown(self):
+        import http_client
+        self.cfg.HTTP_BACKOFF_BASE = self.backoff
+        http_client._client = None
+        super().tearDown()
+
+    def test_retry_charges_rate_limiter(self):
+        """503 sonrası tekrar deneme ayrı bir istek olarak sayılmalı"""
+        articles = NewsAnalyzer.get_news("oil", days_back=1)
+        self.assertEqual(articles[0]["title"], "oil headline")
+        self.assertEqual(len(self.server.queries), 2)
+        self.assertEqual(NewsAnalyzer._rate_limiter.requests_remaining(), 98)
+
+    def test_no_retry_without_quota(self):
+        """Kota kalmadıysa 503 tekrar denenmemeli"""
+        NewsAnalyzer._rate_limiter = RateLimiter(max_requests=1, period_hours=24)
+        self.assertEqual(NewsAnalyzer.get_news("oil", days_back=1, use_cache=False), [])
+        self.assertEqual(len(self.server.queries), 1)
+        self.assertEqual(NewsAnalyzer._rate_limiter.requests_remaining(), 0)
+
+
+@pytest.mark.unit
+class TestQueryCoalescing(unittest.TestCase):
+    """plan_news_queries() ve attribute_articles()"""
+
+    def test_plan_merges_terms_with_or(self):
+        """Tüm anahtar kelimeler tek OR sorgusunda birleşmeli, tekrarlar bir kez"""
+        queries = plan_news_queries({"enerji": ["oil", "gas"], "finans": ["bank", "oil"],
+                                     "geo": ["Russia Ukraine war"]})
+        self.assertEqual(queries, ["oil OR gas OR bank OR (Russia AND Ukraine AND war)"])
+
+    def test_plan_respects_max_length(self):
+        """Sorgular uzunluk sınırını aşmamalı ve tüm terimleri kapsamalı"""
+        topics = {f"t{i}": [f"keyword{i}"] for i in range(40)}
+        queries = plan_news_queries(topics, max_length=60)
+        self.assertGreater(len(queries), 1)
+        for query in queries:
+            self.assertLessEqual(len(query), 60)
+        terms = [term for query in queries for term in query.split(" OR ")]
+        self.assertEqual(terms, [f"keyword{i}" for i in range(40)])
+
+    def test_all_sector_and_geo_topics_fit_few_queries(self):
+        """Tüm sektörler + jeopolitik konular birkaç sorguya sığmalı"""
+        from global_market_analyzer import GeopoliticalNewsIntegration
+        topics = {**NewsAnalyzer.PRIMARY_SECTORS, **NewsAnalyzer.SECONDARY_SECTORS}
+        topics.update({kw: [kw] for kw in GeopoliticalNewsIntegration.KEYWORDS})
+        queries = plan_news_queries(topics)
+        self.assertLessEqual(len(queries), 5)
+        self.assertLess(len(queries), len(NewsAnalyzer.PRIMARY_SECTORS) + len(GeopoliticalNewsIntegration.KEYWORDS))
+
+    def test_plan_caps_terms_per_query(self):
+        """Sorgu başına terim sayısı sınırı aşmamalı"""
+        topics = {f"t{i}": [f"k{i}"] for i in range(10)}
+        queries = plan_news_queries(topics, max_terms=4)
+        self.assertEqual([len(q.split(" OR ")) for q in queries], [4, 4, 2])
+
+    def test_attribution_uses_word_boundaries(self):
+        """Kelime sınırı: 'ai' kelimesi 'said' içinde eşleşmemeli"""
+        articles = [_article("Analyst said markets rally"), _article("New AI chip unveiled")]
+        matched = attribute_articles(articles, {"teknoloji": ["ai"]})
+        self.assertEqual([a["title"] for a in matched["teknoloji"]], ["New AI chip unveiled"])
+
+    def test_attribution_multiword_and_duplicates(self):
+        """Çok kelimeli anahtar kelimede tüm kelimeler geçmeli; aynı makale bir kez sayılmalı"""
+        war = _article("Ukraine talks stall", "Russia says the war will continue", url="u1")
+        articles = [war, dict(war), _article("Ukraine grain exports rise", url="u2")]
+        matched = attribute_articles(articles, {"geo": ["Russia Ukraine war"], "gıda": ["grain"]})
+        self.assertEqual(len(matched["geo"]), 1)
+        self.assertEqual(len(matched["gıda"]), 1)
+
+
+@pytest.mark.unit
+class TestCoalescedAnalyzeNews(_StubNewsServerTestCase):
+    """analyze_news() birleşik sorgularla (yerel stub sunucu)"""
+
+    def setUp(self):
+        super().setUp()
+        self.server.delay = 0
+        self.cfg.NEWS_COALESCE_QUERIES = True
+        self.server.articles = [
+            _article("Banks post record profits", "Financial results beat estimates"),
+            _article("Hotel bookings surge", "Travel demand strong ahead of summer"),
+            _article("Iran nuclear talks resume", "Diplomats meet in Vienna"),
+        ]
+
+    def test_coalesced_requests_cover_all_sectors(self):
+        """Birkaç istekle ikincil sektörler dahil canlı veri ve jeopolitik haber gelmeli"""
+        from news_analyzer import analyze_news, _fetch_coalesced
+        live, geo_news = _fetch_coalesced(days_back=1)
+
+        combined = [q for q in self.server.queries if self.server.sorts[q] == "relevancy"]
+        self.assertLessEqual(len(combined), 5)
+        self.assertIn(" OR ", combined[0])
+        self.assertEqual(live["finans"]["status"], "success")
+        self.assertEqual(live["turizm"]["status"], "success")
+        self.assertEqual(live["otomotiv"]["status"], "no_data")
+        self.assertEqual([n["keyword"] for n in geo_news], ["Iran nuclear"])
+
+        # İkinci çalıştırma: başarılı konular cache'ten, yalnızca eksikler sorgulanır
+        self.server.queries.clear()
+        result = analyze_news(days_back=1)
+        self.assertNotIn("bank", " ".join(self.server.queries))
+        self.assertIn("finans", result)
+        self.assertIn("genel", result)
+
+    def _flood(self, keyword):
+        """Birleşik sorguları banka haberleriyle doldur; tek konu sorgularına kendi haberini dön"""
+        if self.server.sorts[keyword] == "relevancy":
+            return [_article(f"Bank shares move {i}", "Lenders in focus", url=f"b{i}") for i in range(100)]
+        return [_article(f"{keyword} update", "Latest developments", url=keyword)]
+
+    def test_flooded_page_requeries_unmatched_topics(self):
+        """Tek konu sayfayı doldurursa eşleşmesiz birincil sektörler tek tek sorgulanmalı"""
+        from news_analyzer import _fetch_coalesced
+        self.server.articles = self._flood
+        live, _ = _fetch_coalesced(days_back=1)
+
+        single = [q for q in self.server.queries if self.server.sorts[q] == "publishedAt"]
+        self.assertEqual(len(single), len(NewsAnalyzer.PRIMARY_SECTORS) - 1)
+        self.assertNotIn("bank OR financial", " ".join(single))
+        for sector in NewsAnalyzer.PRIMARY_SECTORS:
+            self.assertEqual(live[sector]["status"], "success", sector)
+        self.assertEqual(live["turizm"]["status"], "no_data")
+
+    def test_total_calls_within_per_sector_baseline(self):
+        """Toplam istek sayısı sektör başına sorgu modunu (birincil + jeopolitik) aşmamalı"""
+        from news_analyzer import _fetch_coalesced
+        from global_market_analyzer import GeopoliticalNewsIntegration
+        baseline = len(NewsAnalyzer.PRIMARY_SECTORS) + len(GeopoliticalNewsIntegration.KEYWORDS)
+        self.server.articles = lambda keyword: [_article("Unrelated headline", "Nothing matches here")]
+        original = self.cfg.NEWS_REQUERY_MAX
+        try:
+            for budget in (original, 100):
+                self.cfg.NEWS_REQUERY_MAX = budget
+                self.server.queries.clear()
+                NewsAnalyzer._rate_limiter = RateLimiter(max_requests=100, period_hours=24)
+                _fetch_coalesced(days_back=1)
+                self.assertLessEqual(len(self.server.queries), baseline)
+        finally:
+            self.cfg.NEWS_REQUERY_MAX = original
+
+    def test_requery_limited_by_rate_limit(self):
+        """Yeniden sorgular kalan RateLimiter kotasını aşmamalı"""
+        from news_analyzer import _fetch_coalesced
+        from global_market_analyzer import GeopoliticalNewsIntegration
+        self.server.articles = self._flood
+        topics = {**NewsAnalyzer.PRIMARY_SECTORS, **NewsAnalyzer.SECONDARY_SECTORS}
+        topics.update({kw: [kw] for kw in GeopoliticalNewsIntegration.KEYWORDS})
+        combined = len(plan_news_queries(topics))
+        NewsAnalyzer._rate_limiter = RateLimiter(max_requests=combined + 2, period_hours=24)
+        live, _ = _fetch_coalesced(days_back=1)
+
+        self.assertEqual(len(self.server.queries), combined + 2)
+        self.assertEqual(NewsAnalyzer._rate_limiter.requests_remaining(), 0)
+        requeried = [s for s, r in live.items() if s != "finans" and r["status"] == "success"]
+        self.assertEqual(len(requeried), 2)
+
+
 if __name__ == "__main__":
     unittest.main()
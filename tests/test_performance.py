@@ -70,6 +70,19 @@ class TestTechnicalIndicatorPerformance(unittest.TestCase):
         elapsed = time.perf_counter() - start
         self.assertLess(elapsed, 0.1, f"TechScore (1000x) çok yavaş: {elapsed:.3f}s")
 
+    def test_vectorized_scores_fast(self):
+        """10.000 hissenin skor + sinyal maskesi 0.05 saniyede tamamlanmalı"""
+        rng = np.random.default_rng(0)
+        n = 10_000
+        inputs = (rng.uniform(0, 100, n), rng.normal(0, 1, n), rng.integers(-1, 2, n),
+                  rng.uniform(90, 110, n), rng.uniform(90, 110, n), rng.normal(0, 8, n),
+                  rng.uniform(90, 110, n))
+        start = time.perf_counter()
+        TechnicalAnalyzer.calculate_technical_scores(*inputs)
+        TechnicalAnalyzer.generate_signal_masks(*inputs)
+        elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, 0.05, f"Vektörel skor (10.000) çok yavaş: {elapsed:.3f}s")
+
     def test_fibonacci_executes_fast(self):
         """Fibonacci hesabı 0.5 saniyede tamamlanmalı"""
         start = time.perf_counter()
@@ -87,6 +100,138 @@ class TestTechnicalIndicatorPerformance(unittest.TestCase):
         self.assertLess(elapsed, 0.2, f"SMA (200x) çok yavaş: {elapsed:.3f}s")
 
 
+
+@pytest.mark.performance
+class TestFusedIndicatorBenchmark(unittest.TestCase):
+    """Tek geçişli gösterge çekirdeği ile ayrı fonksiyonlar karşılaştırması"""
+
+    def setUp(self):
+        self.df = make_ohlcv_df(250)
+
+    def _legacy_path(self):
+        """analyze_single_stock'un eski yolu: 8 ayrı gösterge çağrısı"""
+        import config
+        close = self.df["close"]
+        TechnicalAnalyzer.calculate_rsi(close, period=config.RSI_PERIOD)
+        TechnicalAnalyzer.calculate_macd(close)
+        TechnicalAnalyzer.calculate_bollinger_bands(close, period=config.BOLLINGER_PERIOD)
+        TechnicalAnalyzer.calculate_sma(close, config.SMA_SHORT)
+        TechnicalAnalyzer.calculate_sma(close, config.SMA_LONG)
+        TechnicalAnalyzer.calculate_momentum(close, period=config.MOMENTUM_PERIOD)
+        TechnicalAnalyzer.calculate_atr(self.df)
+        fibonacci = TechnicalAnalyzer.calculate_fibonacci(self.df, lookback=config.FIBONACCI_LOOKBACK)
+        TechnicalAnalyzer.analyze_trend(self.df)
+        TechnicalAnalyzer.detect_breakout(self.df, fibonacci, float(close.iloc[-1]))
+
+    def test_fused_kernel_faster_than_legacy(self):
+        """calculate_indicators eski yoldan en az 3 kat hızlı olmalı"""
+        runs = 100
+        start = time.perf_counter()
+        for _ in range(runs):
+            self._legacy_path()
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            TechnicalAnalyzer.calculate_indicators(self.df)
+        fused = time.perf_counter() - start
+
+        print(f"\n   Eski yol: {legacy / runs * 1000:.2f}ms | Tek geçiş: {fused / runs * 1000:.2f}ms "
+              f"| Hızlanma: {legacy / fused:.1f}x")
+        self.assertLess(fused * 3, legacy, f"Tek geçiş yeterince hızlı değil: {legacy / fused:.1f}x")
+
+
+@pytest.mark.performance
+class TestBacktestPerformance(unittest.TestCase):
+    """Vektörel backtest hız testleri"""
+
+    def test_multi_year_backtest_fast(self):
+        """100 hisse × 3 yıllık backtest 3 saniyede tamamlanmalı"""
+        from backtest import BacktestEngine
+        frames = {f"T{i}": make_ohlcv_df(756, seed=i) for i in range(100)}
+        start = time.perf_counter()
+        engine = BacktestEngine(frames)
+        engine.run(engine.index[60].strftime("%Y-%m-%d"), engine.index[-1].strftime("%Y-%m-%d"))
+        elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, 3.0, f"Backtest (100 × 756 bar) çok yavaş: {elapsed:.3f}s")
+
+    def test_portfolio_simulation_fast(self):
+        """500 hisse × 3 yıllık portföy simülasyonu 10 saniyede tamamlanmalı"""
+        from backtest import BacktestEngine
+        from portfolio_simulator import PortfolioSimulator
+        frames = {f"T{i}": make_ohlcv_df(756, seed=i) for i in range(500)}
+        start = time.perf_counter()
+        engine = BacktestEngine(frames)
+        PortfolioSimulator(engine).run(engine.index[60].strftime("%Y-%m-%d"), engine.index[-1].strftime("%Y-%m-%d"))
+        elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, 10.0, f"Portföy simülasyonu (500 × 756 bar) çok yavaş: {elapsed:.3f}s")
+
+    def test_bootstrap_10000_fast(self):
+        """1000 işlemde 10.000 bootstrap örneği 1 saniyede tamamlanmalı"""
+        from backtest import bootstrap_confidence
+        rng = np.random.default_rng(0)
+        dates = pd.bdate_range("2023-01-01", periods=250).strftime("%Y-%m-%d")
+        trades = [{"date": d, "return": float(rng.normal(1, 5))} for d in dates for _ in range(4)]
+        start = time.perf_counter()
+        bootstrap_confidence(trades, samples=10000)
+        elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, 1.0, f"Bootstrap (10.000 × 1000) çok yavaş: {elapsed:.3f}s")
+
+# ─────────────────────────────────────────────
+# Performans Veritabanı Hız Testleri
+# ─────────────────────────────────────────────
+
+@pytest.mark.performance
+class TestPerformanceTrackerSpeed(unittest.TestCase):
+    """Performans veritabanı sorgu hız testleri"""
+
+    def test_report_on_large_history_fast(self):
+        """5 yıllık (~50.000 öneri) geçmişte 30 günlük rapor 0.1 saniyede üretilmeli"""
+        import tempfile
+        from datetime import datetime, timedelta
+        from performance_tracker import PerformanceTracker
+        with tempfile.TemporaryDirectory() as tmp, PerformanceTracker(os.path.join(tmp, "perf.db")) as tracker:
+            today = datetime.now()
+            rows = [((today - timedelta(days=i // 25)).strftime("%Y-%m-%d"), f"T{i % 300}", 100.0,
+                     ["teknoloji", "finans", "enerji"][i % 3]) for i in range(50000)]
+            tracker._conn.executemany(
+                "INSERT INTO recommendations (date, ticker, entry_price, sector) VALUES (?, ?, ?, ?)", rows)
+            tracker._conn.executemany(
+                "INSERT INTO performance_results (recommendation_id, days, return_pct, outcome) VALUES (?, 7, ?, ?)",
+                [(i, (i % 13) - 4.0, "SUCCESS" if i % 13 >= 9 else "LOSS") for i in range(1, 50001, 2)])
+            tracker._conn.commit()
+
+            start = time.perf_counter()
+            report = tracker.generate_report(30)
+            tracker.get_detailed_history(50)
+            elapsed = time.perf_counter() - start
+        self.assertGreater(report["total_recommendations"], 0)
+        self.assertLess(elapsed, 0.1, f"Rapor (50.000 öneri) çok yavaş: {elapsed:.3f}s")
+
+
+# ─────────────────────────────────────────────
+# Portföy Optimizasyonu Hız Testleri
+# ─────────────────────────────────────────────
+
+@pytest.mark.performance
+class TestPortfolioOptimizerSpeed(unittest.TestCase):
+    """Kovaryans tabanlı dağıtım hız testleri"""
+
+    def test_risk_parity_300_candidates_fast(self):
+        """300 aday için risk paritesi dağıtımı 0.5 saniyede tamamlanmalı"""
+        from portfolio_engine import PortfolioEngine
+        rng = np.random.default_rng(0)
+        tickers = [f"T{i}" for i in range(300)]
+        returns = pd.DataFrame(rng.normal(0, 0.02, (126, 300)) + rng.normal(0, 0.01, (126, 1)), columns=tickers)
+        recs = [{"ticker": t, "price": 50.0, "atr": 1.0, "final_score": 60 + i % 30, "volatility": 2}
+                for i, t in enumerate(tickers)]
+        start = time.perf_counter()
+        for mode in ["risk_parity", "min_variance"]:
+            PortfolioEngine(1_000_000).allocate_portfolio(recs, "BULL", mode=mode, returns=returns)
+        elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, 0.5, f"Kovaryans dağıtımı (300 aday) çok yavaş: {elapsed:.3f}s")
+
+
 # ─────────────────────────────────────────────
 # Skor Hesaplama Hız Testleri
 # ─────────────────────────────────────────────
@@ -0,0 +1,324 @@
+# ============================================================
+# tests/test_performance_tracker.py — Performans Veritabanı Testleri
+# ============================================================
+# Kapsam: Kalıcılık, şema/indeksler, sonuç kontrolü, rapor ve
+# geçmiş sorguları, sinyal istatistikleri
+# ============================================================
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import json
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import pandas as pd
+import pytest
+
+from performance_tracker import PerformanceTracker, classify_outcome
+
+
+def days_ago(n: int) -> str:
+    return (datetime.now() - timedelta(days=n)).strftime("%Y-%m-%d")
+
+
+def make_prices(start: str, days: int = 60, start_price: float = 100.0, step: float = 1.0) -> pd.DataFrame:
+    index = pd.date_range(start, periods=days, freq="D")
+    close = [start_price + i * step for i in range(days)]
+    return pd.DataFrame({"close": close, "high": [c + 1 for c in close], "low": [c - 1 for c in close]},
+                        index=index)
+
+
+@pytest.mark.unit
+class TestPerformanceTracker(unittest.TestCase):
+    """PerformanceTracker kalıcı veritabanı"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db_path = os.path.join(self.tmp.name, "performance.db")
+        self.tracker = PerformanceTracker(self.db_path)
+        self.addCleanup(self.tracker.close)
+
+    def test_database_persists_across_instances(self):
+        """Yeni tracker açılınca eski kayıtlar silinmemeli"""
+        self.tracker.save_recommendation({"ticker": "AAA", "price": 10.0, "rating": "AL"})
+        self.tracker.close()
+        with PerformanceTracker(self.db_path) as reopened:
+            history = reopened.get_detailed_history(10)
+        self.assertEqual([h["ticker"] for h in history], ["AAA"])
+
+    def test_wal_mode_and_indexes(self):
+        """WAL modu ve tarih/ticker/sektör indeksleri olmalı"""
+        conn = sqlite3.connect(self.db_path)
+        self.addCleanup(conn.close)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        for name in ["idx_recommendations_date", "idx_recommendations_ticker_date", "idx_recommendations_sector"]:
+            self.assertIn(name, indexes)
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertTrue({"recommendations", "performance_results", "statistics"} <= tables)
+
+    def test_report_query_uses_date_index(self):
+        """Tarih aralığı sorgusu indeksle çalışmalı"""
+        plan = self.tracker._conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM recommendations WHERE date >= ?", ("2025-01-01",)
+        ).fetchall()
+        self.assertIn("idx_recommendations_date", " ".join(str(row["detail"]) for row in plan))
+
+    def test_upgrades_old_schema(self):
+        """Eski (4 kolonlu) tablo yeni kolonlarla yükseltilmeli"""
+        old_path = os.path.join(self.tmp.name, "old.db")
+        conn = sqlite3.connect(old_path)
+        conn.execute("CREATE TABLE recommendations (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                     "date TEXT, ticker TEXT, entry_price REAL, rating TEXT)")
+        conn.execute("INSERT INTO recommendations (date, ticker, entry_price, rating) VALUES ('2025-01-02', 'OLD', 5, 'AL')")
+        conn.commit()
+        conn.close()
+        with PerformanceTracker(old_path) as tracker:
+            tracker.save_recommendation({"ticker": "NEW", "price": 7.0, "sector": "enerji"})
+            self.assertEqual(len(tracker.get_detailed_history(10)), 2)
+
+    def test_invalid_price_not_saved(self):
+        """Fiyatsız öneri kaydedilmemeli"""
+        self.assertEqual(self.tracker.save_recommendation({"ticker": "AAA"}), 0)
+        self.assertEqual(self.tracker.save_recommendation({"ticker": "AAA", "price": "x"}), 0)
+        self.assertEqual(self.tracker.get_detailed_history(10), [])
+
+    def test_batch_save_returns_ids(self):
+        """Toplu kayıt her öneri için id döndürmeli, tüm alanları yazmalı"""
+        recs = [
+            {"ticker": "AAA", "price": 10.0, "rating": "AL", "score": 72.5, "technical_score": 68,
+             "sector": "enerji", "support": 9.5, "resistance": 11.0, "reward_risk_ratio": 2.0,
+             "signals": ["RSI Aşırı Satım", "MACD Yükseliş"]},
+            {"ticker": "BBB"},
+            {"ticker": "CCC", "current_price": 20.0},
+        ]
+        ids = self.tracker.save_recommendations(recs, date="2025-03-01")
+        self.assertEqual(len(ids), 3)
+        self.assertEqual(ids[1], 0)
+        self.assertLess(ids[0], ids[2])
+
+        row = self.tracker._conn.execute("SELECT * FROM recommendations WHERE id = ?", (ids[0],)).fetchone()
+        self.assertEqual(row["final_score"], 72.5)
+        self.assertEqual(row["technical_score"], 68)
+        self.assertEqual(row["sector"], "enerji")
+        self.assertEqual(row["risk_reward"], 2.0)
+        self.assertEqual(json.loads(row["signals"]), ["RSI Aşırı Satım", "MACD Yükseliş"])
+
+    def test_batch_save_is_atomic(self):
+        """Toplu kayıt sırasında hata olursa hiçbir satır yazılmamalı"""
+        recs = [{"ticker": "AAA", "price": 10.0}, {"ticker": "BBB", "price": 11.0, "sector": object()}]
+        with self.assertRaises(Exception):
+            self.tracker.save_recommendations(recs)
+        self.assertEqual(self.tracker.get_detailed_history(10), [])
+
+    def test_batch_save_single_commit(self):
+        """Toplu kayıt tek işlem (commit) olmalı"""
+        statements = []
+        self.tracker._conn.set_trace_callback(statements.append)
+        self.tracker.save_recommendations([{"ticker": f"T{i}", "price": 1.0 + i} for i in range(50)])
+        self.tracker._conn.set_trace_callback(None)
+        self.assertEqual(len([s for s in statements if s.strip().upper() == "COMMIT"]), 1)
+        self.assertEqual(len([s for s in statements if "INSERT INTO recommendations" in s]), 50)
+
+    def test_check_performance_evaluates_due_recommendations(self):
+        """Süresi dolan öneriler değerlendirilmeli, tekrar hesaplanmamalı"""
+        self.tracker.save_recommendation({"ticker": "AAA", "price": 100.0, "resistance": 105.0}, date=days_ago(20))
+        self.tracker.save_recommendation({"ticker": "BBB", "price": 50.0}, date=days_ago(3))
+        prices = {"AAA": make_prices(days_ago(20)), "BBB": make_prices(days_ago(3))}
+
+        with patch("performance_tracker.load_history", return_value=prices) as mock_load:
+            results = self.tracker.check_performance([7, 14, 30])
+        self.assertEqual(mock_load.call_count, 1)
+        self.assertEqual(sorted((r["ticker"], r["days"]) for r in results), [("AAA", 7), ("AAA", 14)])
+        seven = next(r for r in results if r["days"] == 7)
+        self.assertAlmostEqual(seven["return"], 7.0)
+        self.assertEqual(seven["outcome"], "SUCCESS")
+
+        with patch("performance_tracker.load_history", return_value=prices) as mock_load:
+            self.assertEqual(self.tracker.check_performance([7, 14]), [])
+        mock_load.assert_not_called()
+
+    def test_single_download_for_all_tickers(self):
+        """Tüm hisselerin fiyatı tek toplu çağrıyla alınmalı"""
+        tickers = [f"T{i}" for i in range(5)]
+        for ticker in tickers:
+            for age in [10, 20, 40]:
+                self.tracker.save_recommendation({"ticker": ticker, "price": 100.0}, date=days_ago(age))
+        prices = {t: make_prices(days_ago(45), days=50) for t in tickers}
+
+        with patch("performance_tracker.load_history", return_value=prices) as mock_load:
+            results = self.tracker.check_performance([7, 14, 30])
+        mock_load.assert_called_once()
+        self.assertEqual(set(mock_load.call_args[0][0]), set(tickers))
+        # 10 gün önce: 7; 20 gün önce: 7, 14; 40 gün önce: 7, 14, 30
+        self.assertEqual(len(results), len(tickers) * 6)
+
+    def test_window_max_min_and_level_hits(self):
+        """Max/min fiyat giriş–çıkış aralığındaki barlardan, destek/direnç teması"""
+        df = make_prices("2025-01-01", days=40)
+        df.loc["2025-01-05", "high"] = 150.0
+        df.loc["2025-01-20", "low"] = 10.0
+        recs = [
+            {"id": 1, "date": "2025-01-01", "entry_price": 100.0, "support": 90.0, "resistance": 140.0},
+            {"id": 2, "date": "2025-01-10", "entry_price": 100.0, "support": 90.0, "resistance": 140.0},
+        ]
+        rows = PerformanceTracker.evaluate_ticker(recs, [7, 7], df)
+        first, second = rows
+        self.assertEqual(first["max_price"], 150.0)
+        self.assertEqual(first["hit_resistance"], 1)
+        self.assertEqual(first["hit_support"], 0)
+        self.assertEqual(first["check_date"], "2025-01-08")
+        self.assertEqual(first["exit_price"], 107.0)
+        self.assertEqual(second["max_price"], 117.0)
+        self.assertEqual(second["min_price"], 108.0)
+        self.assertEqual(second["hit_resistance"], 0)
+
+    def test_not_yet_due_rows_skipped(self):
+        """Fiyat verisi hedef tarihe ulaşmamışsa sonuç yazılmamalı"""
+        df = make_prices("2025-01-01", days=5)
+        recs = [{"id": 1, "date": "2025-01-01", "entry_price": 100.0}]
+        self.assertEqual(PerformanceTracker.evaluate_ticker(recs, [7], df), [])
+
+    def test_generate_report_aggregates(self):
+        """Rapor SQL özetlerinden üretilmeli ve statistics tablosuna yazılmalı"""
+        rows = [("AAA", "teknoloji", 100.0, 10.0), ("BBB", "finans", 100.0, -3.0), ("CCC", "teknoloji", 100.0, 2.0)]
+        for ticker, sector, price, _ in rows:
+            self.tracker.save_recommendation({"ticker": ticker, "price": price, "sector": sector}, date=days_ago(10))
+        self.tracker.save_recommendation({"ticker": "DDD", "price": 20.0, "sector": "enerji"}, date=days_ago(1))
+
+        for rec_id, (_, _, price, ret) in enumerate(rows, 1):
+            self.tracker._conn.execute(
+                "INSERT INTO performance_results (recommendation_id, days, exit_price, return_pct, outcome) "
+                "VALUES (?, 7, ?, ?, ?)", (rec_id, price * (1 + ret / 100), ret, classify_outcome(ret))
+            )
+
+        report = self.tracker.generate_report(30)
+        self.assertEqual(report["total_recommendations"], 4)
+        self.assertEqual(report["total_checked"], 3)
+        self.assertEqual((report["success_count"], report["neutral_count"], report["loss_count"]), (1, 1, 1))
+        self.assertAlmostEqual(report["win_rate"], 33.3)
+        self.assertAlmostEqual(report["avg_return_pct"], 3.0)
+        self.assertEqual(report["best_sector"], "teknoloji")
+        self.assertEqual(report["worst_sector"], "finans")
+
+        stored = self.tracker._conn.execute("SELECT COUNT(*) FROM statistics").fetchone()[0]
+        self.assertEqual(stored, 1)
+
+    def test_empty_report(self):
+        """Kayıt yoksa sıfır değerli rapor"""
+        report = self.tracker.generate_report(30)
+        self.assertEqual(report["total_recommendations"], 0)
+        self.assertEqual(report["win_rate"], 0)
+        self.assertEqual(report["best_sector"], "N/A")
+
+    def test_detailed_history_order_and_keys(self):
+        """Geçmiş yeniden eskiye sıralı ve check_performance.py anahtarlarıyla dönmeli"""
+        self.tracker.save_recommendation({"ticker": "OLD", "price": 10.0, "score": 60}, date=days_ago(5))
+        self.tracker.save_recommendation({"ticker": "NEW", "price": 11.0, "score": 70}, date=days_ago(1))
+        history = self.tracker.get_detailed_history(1)
+        self.assertEqual(len(history), 1)
+        item = history[0]
+        self.assertEqual(item["ticker"], "NEW")
+        for key in ["date", "ticker", "entry_price", "rating", "score", "days_held",
+                    "exit_price", "return_pct", "outcome"]:
+            self.assertIn(key, item)
+        self.assertIsNone(item["outcome"])
+
+
+@pytest.mark.unit
+class TestSignalStatistics(unittest.TestCase):
+    """Artımlı sinyal/sektör/skor istatistikleri"""
+
+    RSI = "📊 RSI 28.4 → Oversold (Aşırı Satım - AL Fırsatı)"
+    MACD = "📈 MACD → Bullish (Yükseliş Sinyali)"
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db_path = os.path.join(self.tmp.name, "performance.db")
+        self.tracker = PerformanceTracker(self.db_path)
+        self.addCleanup(self.tracker.close)
+
+    def record(self, count: int, step: float, signals: list, sector: str = "enerji", score: float = 72,
+               age: int = 20, ticker: str = "AAA"):
+        """count öneri kaydet ve step günlük artışlı fiyatla değerlendir"""
+        recs = [{"ticker": ticker, "price": 100.0, "signals": signals, "sector": sector, "score": score}
+                for _ in range(count)]
+        self.tracker.save_recommendations(recs, date=days_ago(age))
+        prices = {ticker: make_prices(days_ago(age), start_price=100.0, step=step)}
+        with patch("performance_tracker.load_history", return_value=prices):
+            return self.tracker.check_performance([7])
+
+    def test_counts_by_signal_sector_and_bucket(self):
+        """Sinyal (sayılardan arındırılmış), sektör ve skor aralığına göre sayılmalı"""
+        self.record(6, 1.0, [self.RSI, self.MACD])
+        self.record(4, -1.0, [self.MACD, "📊 RSI 31.0 → Oversold (Aşırı Satım - AL Fırsatı)"],
+                    ticker="BBB", sector="finans", score=58)
+
+        signals = self.tracker.get_signal_stats()
+        rsi = signals["📊 RSI # → Oversold (Aşırı Satım - AL Fırsatı)"]
+        self.assertEqual(rsi["total"], 10)
+        self.assertEqual(rsi["success"], 6)
+        self.assertEqual(rsi["win_rate"], 60.0)
+
+        sectors = self.tracker.get_statistics("sector", min_samples=1)
+        self.assertEqual(sectors["enerji"]["win_rate"], 100.0)
+        self.assertEqual(sectors["finans"]["win_rate"], 0.0)
+        buckets = self.tracker.get_statistics("score_bucket", min_samples=1)
+        self.assertEqual(set(buckets), {"70-80", "50-60"})
+
+    def test_incremental_matches_rebuild(self):
+        """Artımlı sayaçlar tüm geçmişten yeniden hesaplamayla aynı olmalı"""
+        self.record(5, 1.0, [self.RSI], age=30)
+        self.record(7, -0.5, [self.RSI, self.MACD], age=20, ticker="BBB")
+        incremental = self.tracker._conn.execute(
+            "SELECT * FROM signal_statistics ORDER BY dimension, key, days").fetchall()
+        self.tracker.rebuild_statistics()
+        rebuilt = self.tracker._conn.execute(
+            "SELECT * FROM signal_statistics ORDER BY dimension, key, days").fetchall()
+        self.assertEqual([tuple(r) for r in incremental], [tuple(r) for r in rebuilt])
+
+    def test_cache_refreshes_after_new_outcomes(self):
+        """Önbellek yeni sonuçlar gelince yenilenmeli"""
+        self.record(5, 1.0, [self.MACD])
+        first = self.tracker.get_signal_stats()
+        self.assertIs(self.tracker.get_signal_stats(), first)
+        self.record(5, -1.0, [self.MACD], ticker="BBB")
+        self.assertEqual(self.tracker.get_signal_stats()[self.MACD]["total"], 10)
+
+    def test_min_samples_filter(self):
+        """Az örnekli anahtarlar önbellekte yer almamalı"""
+        self.record(2, 1.0, [self.MACD])
+        self.assertEqual(self.tracker.get_signal_stats(), {})
+
+    def test_feeds_calculate_confidence(self):
+        """calculate_confidence sinyal istatistiklerini kullanmalı"""
+        from portfolio_engine import PortfolioEngine
+        self.record(6, 1.0, [self.RSI])
+        self.record(6, -1.0, [self.MACD], ticker="BBB")
+        stats = self.tracker.get_signal_stats()
+
+        engine = PortfolioEngine()
+        rec = {"final_score": 70, "volatility": 2, "signals": ["📊 RSI 22.1 → Oversold (Aşırı Satım - AL Fırsatı)"]}
+        self.assertEqual(engine.calculate_confidence(rec, stats), engine.calculate_confidence(rec))
+        rec["signals"].append(self.MACD)
+        self.assertAlmostEqual(engine.calculate_confidence(rec, stats), engine.calculate_confidence(rec) * 0.5)
+
+    def test_existing_results_backfilled_on_open(self):
+        """Sayaç tablosu boşsa mevcut sonuçlardan doldurulmalı"""
+        self.record(5, 1.0, [self.MACD])
+        self.tracker._conn.execute("DELETE FROM signal_statistics")
+        self.tracker._conn.commit()
+        self.tracker.close()
+        with PerformanceTracker(self.db_path) as reopened:
+            self.assertEqual(reopened.get_signal_stats()[self.MACD]["total"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
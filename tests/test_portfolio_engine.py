@@ -0,0 +1,168 @@
+# ============================================================
+# tests/test_portfolio_engine.py — Portföy Motoru Testleri
+# ============================================================
+# Kapsam: Güven ağırlıkları, Ledoit-Wolf kovaryans, risk paritesi,
+# minimum varyans, nakit oranı
+# ============================================================
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio_engine import (
+    PortfolioEngine, ledoit_wolf_covariance, risk_parity_weights, min_variance_weights,
+)
+
+
+def make_returns(days: int = 250, seed: int = 0) -> pd.DataFrame:
+    """3 yüksek korelasyonlu banka + 2 bağımsız hisse"""
+    rng = np.random.default_rng(seed)
+    bank_factor = rng.normal(0, 0.02, days)
+    data = {f"BANK{i}": bank_factor + rng.normal(0, 0.004, days) for i in range(3)}
+    data["TECH"] = rng.normal(0, 0.02, days)
+    data["ENERGY"] = rng.normal(0, 0.02, days)
+    return pd.DataFrame(data, index=pd.bdate_range("2024-01-01", periods=days))
+
+
+def make_recs(tickers: list) -> list:
+    return [{"ticker": t, "price": 100.0, "atr": 2.0, "final_score": 70, "volatility": 2} for t in tickers]
+
+
+@pytest.mark.unit
+class TestCovarianceEstimators(unittest.TestCase):
+    """Kovaryans ve ağırlık çözücüleri"""
+
+    def test_ledoit_wolf_matches_sklearn(self):
+        """Büzülme katsayısı ve kovaryans sklearn ile aynı olmalı"""
+        try:
+            from sklearn.covariance import ledoit_wolf
+        except ImportError:
+            self.skipTest("sklearn yok")
+        X = make_returns(120).to_numpy()
+        cov, shrinkage = ledoit_wolf_covariance(X)
+        expected_cov, expected_shrinkage = ledoit_wolf(X)
+        self.assertAlmostEqual(shrinkage, expected_shrinkage, places=10)
+        np.testing.assert_allclose(cov, expected_cov, rtol=1e-10)
+
+    def test_risk_parity_equal_contributions(self):
+        """Risk katkıları bütçeyle orantılı olmalı"""
+        cov, _ = ledoit_wolf_covariance(make_returns().to_numpy())
+        for budget in [None, np.array([1, 1, 1, 2, 3])]:
+            w = risk_parity_weights(cov, budget)
+            contributions = w * (cov @ w)
+            target = np.full(5, 0.2) if budget is None else budget / budget.sum()
+            np.testing.assert_allclose(contributions / contributions.sum(), target, atol=1e-8)
+            self.assertAlmostEqual(w.sum(), 1.0)
+
+    def test_min_variance_long_only_optimal(self):
+        """Minimum varyans ağırlıkları negatif olmamalı ve rastgele portföylerden düşük varyanslı olmalı"""
+        cov, _ = ledoit_wolf_covariance(make_returns().to_numpy())
+        w = min_variance_weights(cov)
+        self.assertTrue((w >= 0).all())
+        self.assertAlmostEqual(w.sum(), 1.0)
+        rng = np.random.default_rng(1)
+        for _ in range(200):
+            other = rng.dirichlet(np.ones(5))
+            self.assertLessEqual(w @ cov @ w, other @ cov @ other + 1e-15)
+
+    def test_hundreds_of_candidates(self):
+        """Yüzlerce aday için çözücüler çalışmalı"""
+        rng = np.random.default_rng(3)
+        X = rng.normal(0, 0.02, (126, 300)) + rng.normal(0, 0.01, (126, 1))
+        cov, _ = ledoit_wolf_covariance(X)
+        w = risk_parity_weights(cov)
+        self.assertAlmostEqual(w.sum(), 1.0)
+        self.assertTrue((min_variance_weights(cov) >= 0).all())
+
+
+@pytest.mark.unit
+class TestAllocationModes(unittest.TestCase):
+    """allocate_portfolio dağıtım modları"""
+
+    def setUp(self):
+        self.returns = make_returns()
+        self.tickers = list(self.returns.columns)
+        self.engine = PortfolioEngine(100000)
+
+    def test_confidence_mode_unchanged(self):
+        """Varsayılan mod güven oranıyla dağıtmalı"""
+        recs = make_recs(self.tickers)
+        recs[0]["final_score"] = 140
+        result = self.engine.allocate_portfolio(recs, "BULL", mode="confidence")
+        weights = [p["weight_pct"] for p in result["positions"]]
+        self.assertAlmostEqual(weights[0], 2 * weights[1], places=1)
+        self.assertEqual(result["allocation_mode"], "confidence")
+
+    def test_correlated_banks_get_less(self):
+        """Korelasyonlu bankalar toplamda bağımsız hisselerden fazla almamalı"""
+        for mode in ["risk_parity", "min_variance"]:
+            result = self.engine.allocate_portfolio(make_recs(self.tickers), "BULL", mode=mode, returns=self.returns)
+            weights = {p["ticker"]: p["weight_pct"] for p in result["positions"]}
+            banks = sum(weights[f"BANK{i}"] for i in range(3))
+            with self.subTest(mode=mode):
+                self.assertEqual(result["allocation_mode"], mode)
+                self.assertLess(banks, weights["TECH"] + weights["ENERGY"])
+                self.assertAlmostEqual(sum(weights.values()), 100.0, places=1)
+
+    def test_cash_ratio_respected(self):
+        """Toplam dağıtım rejim nakit oranından sonra kalan sermayeyi aşmamalı"""
+        for regime in ["STRONG_BULL", "NEUTRAL", "CRISIS"]:
+            result = self.engine.allocate_portfolio(make_recs(self.tickers), regime, mode="risk_parity",
+                                                    returns=self.returns)
+            invested = sum(p["allocation_amount"] for p in result["positions"])
+            cash_ratio = self.engine.determine_cash_ratio(regime)
+            self.assertAlmostEqual(invested, 100000 * (1 - cash_ratio), delta=1)
+            self.assertEqual(result["cash_amount"], round(100000 * cash_ratio, 2))
+
+    def test_confidence_tilt(self):
+        """Daha yüksek güvenli hisse daha fazla ağırlık almalı"""
+        recs = make_recs(["TECH", "ENERGY"])
+        recs[0]["final_score"] = 90
+        result = self.engine.allocate_portfolio(recs, "BULL", mode="risk_parity", returns=self.returns)
+        weights = [p["weight_pct"] for p in result["positions"]]
+        self.assertGreater(weights[0], weights[1])
+
+    def test_missing_returns_falls_back(self):
+        """Getiri verisi yoksa güven moduna düşmeli"""
+        recs = make_recs(["X1", "X2"])
+        result = self.engine.allocate_portfolio(recs, "BULL", mode="min_variance", returns=pd.DataFrame())
+        self.assertEqual(result["allocation_mode"], "confidence")
+        self.assertAlmostEqual(sum(p["weight_pct"] for p in result["positions"]), 100.0, places=1)
+
+    def test_partial_returns_use_median_variance(self):
+        """Verisi olmayan hisse medyan varyansla dahil edilmeli"""
+        recs = make_recs(["TECH", "ENERGY", "NEWCO"])
+        result = self.engine.allocate_portfolio(recs, "BULL", mode="risk_parity", returns=self.returns)
+        weights = {p["ticker"]: p["weight_pct"] for p in result["positions"]}
+        self.assertGreater(weights["NEWCO"], 0)
+        self.assertEqual(result["allocation_mode"], "risk_parity")
+
+
+    def test_zero_variance_column_does_not_dominate(self):
+        """İşlemi durdurulmuş (sabit getirili) hisse dağıtımı domine etmemeli"""
+        returns = pd.DataFrame({
+            "A": self.returns["TECH"],
+            "B": self.returns["ENERGY"],
+            "C": 0.0,
+            "D": self.returns["TECH"],
+        })
+        for mode in ["risk_parity", "min_variance"]:
+            result = self.engine.allocate_portfolio(make_recs(list(returns.columns)), "BULL",
+                                                    mode=mode, returns=returns)
+            weights = {p["ticker"]: p["weight_pct"] for p in result["positions"]}
+            with self.subTest(mode=mode):
+                self.assertEqual(result["allocation_mode"], mode)
+                # C verisiz hisse gibi: bağımsız B ile aynı ağırlık (medyan varyans, sıfır korelasyon)
+                self.assertLess(weights["C"], 50)
+                self.assertAlmostEqual(weights["C"], weights["B"], delta=5)
+                self.assertAlmostEqual(sum(weights.values()), 100.0, places=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
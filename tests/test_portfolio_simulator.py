@@ -0,0 +1,174 @@
+# ============================================================
+# tests/test_portfolio_simulator.py — Portföy Simülasyonu Testleri
+# ============================================================
+# Kapsam: Nakit/özsermaye muhasebesi, stop ve süre çıkışları,
+# rejim nakit oranı, metrikler
+# ============================================================
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pytest
+
+import config
+from backtest import BacktestEngine
+from portfolio_engine import PortfolioEngine
+from portfolio_simulator import PortfolioSimulator, classify_regime
+from tests.test_backtest import make_frames
+
+
+@pytest.mark.unit
+class TestPortfolioSimulator(unittest.TestCase):
+    """PortfolioSimulator gün adımlı işletim"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.frames = make_frames(count=10, n=400)
+        cls.engine = BacktestEngine(cls.frames)
+        cls.start = cls.engine.index[70].strftime("%Y-%m-%d")
+        cls.end = cls.engine.index[-1].strftime("%Y-%m-%d")
+
+    def test_equity_curve_covers_test_days(self):
+        """Her test günü için bir özsermaye değeri olmalı"""
+        result = PortfolioSimulator(self.engine).run(self.start, self.end)
+        self.assertEqual(len(result["equity_curve"]), len(self.engine.test_rows(self.start, self.end)))
+        self.assertFalse(result["equity_curve"].isna().any())
+        self.assertGreater(result["metrics"]["trades"], 0)
+
+    def test_trades_reconcile_with_equity(self):
+        """Komisyonsuz: son özsermaye = başlangıç + gerçekleşen kâr + açık pozisyon kârı"""
+        simulator = PortfolioSimulator(self.engine)
+        result = simulator.run(self.start, self.end)
+        realized = sum((t["exit"] - t["entry"]) * t["shares"] for t in result["trades"])
+        unrealized = sum(p["value"] - p["entry"] * p["shares"] for p in result["positions"])
+        self.assertAlmostEqual(result["equity_curve"].iloc[-1],
+                               simulator.initial_capital + realized + unrealized, places=6)
+
+    def test_stop_exit_at_or_below_stop(self):
+        """Stop çıkışları girişin altında gerçekleşmeli, süre çıkışları horizon sonrası"""
+        result = PortfolioSimulator(self.engine).run(self.start, self.end, horizon=7)
+        stops = [t for t in result["trades"] if t["reason"] == "STOP"]
+        self.assertGreater(len(stops), 0)
+        for t in stops:
+            self.assertLess(t["exit"], t["entry"])
+        for t in result["trades"]:
+            self.assertLessEqual(t["entry_date"], t["exit_date"])
+
+    def test_stop_fill_not_above_close(self):
+        """Stop dolumu ihtiyatlı: çıkış günü kapanışından yüksek olamaz"""
+        result = PortfolioSimulator(self.engine).run(self.start, self.end, horizon=7)
+        stops = [t for t in result["trades"] if t["reason"] == "STOP"]
+        self.assertGreater(len(stops), 0)
+        for t in stops:
+            row = self.engine.index.get_loc(np.datetime64(t["exit_date"]))
+            col = self.engine.tickers.index(t["ticker"])
+            self.assertLessEqual(t["exit"], self.engine.close[row, col] + 1e-9)
+
+    def test_max_positions_respected(self):
+        """Aynı anda açık pozisyon sayısı sınırı aşılmamalı"""
+        result = PortfolioSimulator(self.engine, max_positions=2).run(self.start, self.end)
+        events = []
+        for t in result["trades"]:
+            events.append((t["entry_date"], 1))
+            events.append((t["exit_date"], -1))
+        # Aynı gün önce çıkışlar, sonra girişler işlenir
+        events.sort(key=lambda e: (e[0], e[1]))
+        open_count = 0
+        for _, delta in events:
+            open_count += delta
+            self.assertLessEqual(open_count, 2)
+
+    def test_regime_cash_ratio_limits_exposure(self):
+        """CRISIS rejiminde yatırım, BULL rejimine göre daha az olmalı"""
+        exposures = {}
+        for regime in ["BULL", "CRISIS"]:
+            result = PortfolioSimulator(self.engine).run(self.start, self.end, regime=regime)
+            exposures[regime] = sum(t["entry"] * t["shares"] for t in result["trades"])
+        self.assertLess(exposures["CRISIS"], exposures["BULL"])
+
+    def test_uses_allocate_portfolio(self):
+        """Seçimler PortfolioEngine.allocate_portfolio ile boyutlandırılmalı"""
+        with patch.object(PortfolioEngine, "allocate_portfolio", autospec=True,
+                          side_effect=PortfolioEngine.allocate_portfolio) as mock_allocate:
+            PortfolioSimulator(self.engine).run(self.start, self.end, regime="NEUTRAL")
+        self.assertGreater(mock_allocate.call_count, 0)
+        self.assertEqual(mock_allocate.call_args[0][2], "NEUTRAL")
+
+    def _allocations(self, engine, end_row):
+        """risk_parity modunda end_row'a kadarki günlük ağırlıklar ve getiri panelleri"""
+        calls = []
+        original = PortfolioEngine.allocate_portfolio
+
+        def record(portfolio, recs, regime, **kwargs):
+            result = original(portfolio, recs, regime, **kwargs)
+            calls.append((kwargs.get("returns"), [p["weight_pct"] for p in result["positions"]],
+                          result["allocation_mode"]))
+            return result
+
+        end = engine.index[end_row].strftime("%Y-%m-%d")
+        with patch.object(config, "PORTFOLIO_ALLOCATION_MODE", "risk_parity"), \
+                patch.object(PortfolioEngine, "allocate_portfolio", autospec=True, side_effect=record):
+            PortfolioSimulator(engine).run(self.start, end, regime="NEUTRAL")
+        return calls
+
+    def test_covariance_allocation_has_no_look_ahead(self):
+        """t günündeki ağırlıklar t sonrası barlar değişince aynı kalmalı"""
+        cut = 250
+        altered = {}
+        cut_date = self.engine.index[cut]
+        rng = np.random.default_rng(5)
+        for ticker, df in self.frames.items():
+            df = df.copy()
+            after = df.index > cut_date
+            scale = rng.uniform(0.5, 1.5, size=after.sum())
+            for col in ["high", "low", "close"]:
+                df.loc[after, col] = df.loc[after, col].to_numpy() * scale
+            altered[ticker] = df
+
+        base = self._allocations(self.engine, cut)
+        changed = self._allocations(BacktestEngine(altered), cut)
+
+        self.assertGreater(len(base), 0)
+        self.assertEqual(len(base), len(changed))
+        for (returns_a, weights_a, mode), (returns_b, weights_b, _) in zip(base, changed):
+            self.assertIsNotNone(returns_a)
+            self.assertLessEqual(returns_a.shape[0], config.PORTFOLIO_COVARIANCE_LOOKBACK)
+            np.testing.assert_allclose(weights_a, weights_b)
+            np.testing.assert_array_equal(returns_a.to_numpy(), returns_b.to_numpy())
+        self.assertIn("risk_parity", {mode for _, _, mode in base})
+
+    def test_metrics_keys(self):
+        """Sharpe, maksimum düşüş ve devir hızı raporlanmalı"""
+        metrics = PortfolioSimulator(self.engine).run(self.start, self.end)["metrics"]
+        for key in ["sharpe", "max_drawdown", "turnover", "total_return", "final_equity"]:
+            self.assertIn(key, metrics)
+        self.assertGreaterEqual(metrics["max_drawdown"], 0)
+        self.assertGreater(metrics["turnover"], 0)
+
+    def test_empty_range(self):
+        """Aralıkta gün yoksa boş eğri ve sıfır metrik"""
+        result = PortfolioSimulator(self.engine).run("1990-01-01", "1990-02-01")
+        self.assertTrue(result["equity_curve"].empty)
+        self.assertEqual(result["metrics"]["trades"], 0)
+
+
+@pytest.mark.unit
+class TestClassifyRegime(unittest.TestCase):
+    """Piyasa genişliğinden rejim"""
+
+    def test_thresholds(self):
+        self.assertEqual(classify_regime(0.8), "STRONG_BULL")
+        self.assertEqual(classify_regime(0.6), "BULL")
+        self.assertEqual(classify_regime(0.5), "NEUTRAL")
+        self.assertEqual(classify_regime(0.35), "BEAR")
+        self.assertEqual(classify_regime(0.1), "CRISIS")
+        self.assertEqual(classify_regime(np.nan), "NEUTRAL")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+# ============================================================
+# tests/test_price_store.py — Yerel Fiyat Deposu Testleri
+# ============================================================
+# Kapsam: Kaydet/oku, artımlı birleştirme, indirme planı
+# ============================================================
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from unittest.mock import patch
+import tempfile
+import pandas as pd
+import numpy as np
+import pytest
+
+from price_store import PriceStore, normalize_download
+from tests.conftest import make_ohlcv_df
+
+
+def _yf_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """yfinance tarzı büyük harfli sütunlar."""
+    out = df.copy()
+    out.columns = [c.capitalize() for c in out.columns]
+    return out
+
+
+@pytest.mark.unit
+class TestPriceStore(unittest.TestCase):
+    """PriceStore testleri"""
+
+    def setUp(self):
+        self.store = PriceStore(store_dir=tempfile.mkdtemp(), refresh_hours=6)
+        self.df = normalize_download(_yf_frame(make_ohlcv_df(100)))
+
+    def test_save_load_roundtrip(self):
+        """Kaydedilen barlar aynen okunmalı"""
+        self.store.save("AAPL", self.df)
+        loaded = self.store.load("AAPL")
+        self.assertEqual(len(loaded), 100)
+        np.testing.assert_allclose(loaded["close"].values, self.df["close"].values)
+        self.assertTrue((loaded.index == self.df.index).all())
+
+    def test_load_tail(self):
+        """tail parametresi sadece son N barı döndürmeli"""
+        self.store.save("AAPL", self.df)
+        loaded = self.store.load("AAPL", tail=10)
+        self.assertEqual(len(loaded), 10)
+        self.assertEqual(loaded.index[-1], self.df.index[-1])
+
+    def test_load_days_uses_calendar_window(self):
+        """days parametresi son bardan geriye takvim günü penceresi döndürmeli"""
+        self.store.save("AAPL", self.df)
+        loaded = self.store.load("AAPL", days=28)
+        self.assertEqual(loaded.index[-1], self.df.index[-1])
+        self.assertTrue((loaded.index >= self.df.index[-1] - pd.Timedelta(days=28)).all())
+        self.assertEqual(len(loaded), 21)
+
+    def test_incremental_runs_keep_download_window(self):
+        """Artımlı çalıştırmalar sonrası pencere tam indirmeyle aynı kalmalı"""
+        full = normalize_download(_yf_frame(make_ohlcv_df(400)))
+        self.store.save("AAPL", full.iloc[:-20])
+        self._stale("AAPL")
+        with patch("price_store.yf.download", return_value=_yf_frame(full.iloc[-21:])):
+            df = self.store.fetch_history("AAPL", 250)
+        self.assertEqual(df.index[-1], full.index[-1])
+        expected = full[full.index >= full.index[-1] - pd.Timedelta(days=250)]
+        self.assertEqual(len(df), len(expected))
+        self.assertLess(len(df), 250)
+
+    def test_merge_appends_and_overrides_last_bar(self):
+        """Artımlı birleştirme yeni barları eklemeli, son barı güncellemeli"""
+        self.store.save("AAPL", self.df.iloc[:90])
+        update = self.df.iloc[89:].copy()
+        update.iloc[0, update.columns.get_loc("close")] = 999.0
+        merged = self.store.merge("AAPL", update)
+        self.assertEqual(len(merged), 100)
+        self.assertEqual(merged["close"].iloc[89], 999.0)
+
+    def test_plan_full_when_missing(self):
+        """Kayıt yoksa tam indirme planlanmalı"""
+        self.assertEqual(self.store.plan("NEW")["action"], "full")
+
+    def test_plan_fresh_after_save(self):
+        """Yeni kaydedilen sembol için ağ çağrısı gerekmemeli"""
+        self.store.save("AAPL", self.df)
+        self.assertEqual(self.store.plan("AAPL")["action"], "fresh")
+
+    def test_plan_incremental_when_stale(self):
+        """Eski kayıt için sondan bir önceki bardan itibaren artımlı indirme planlanmalı"""
+        self.store.save("AAPL", self.df)
+        old = time.time() - 7 * 3600
+        os.utime(self.store._path("AAPL"), (old, old))
+        plan = self.store.plan("AAPL")
+        self.assertEqual(plan["action"], "incremental")
+        self.assertEqual(plan["start"], self.df.index[-2].strftime("%Y-%m-%d"))
+        self.assertAlmostEqual(plan["check_close"], self.df["close"].iloc[-2])
+
+    def test_fetch_history_downloads_only_missing_bars(self):
+        """İkinci çağrıda sadece eksik barlar istenmeli"""
+        with patch("price_store.yf.download", return_value=_yf_frame(make_ohlcv_df(100))) as mock_dl:
+            self.store.fetch_history("AAPL", 250)
+            self.assertIn("period", mock_dl.call_args.kwargs)
+
+        old = time.time() - 7 * 3600
+        os.utime(self.store._path("AAPL"), (old, old))
+        with patch("price_store.yf.download", return_value=_yf_frame(make_ohlcv_df(1))) as mock_dl:
+            self.store.fetch_history("AAPL", 250)
+            self.assertIn("start", mock_dl.call_args.kwargs)
+            self.assertNotIn("period", mock_dl.call_args.kwargs)
+
+    def test_fetch_history_keeps_data_on_network_error(self):
+        """Ağ hatasında depodaki veri dönmeli"""
+        self.store.save("AAPL", self.df)
+        old = time.time() - 7 * 3600
+        os.utime(self.store._path("AAPL"), (old, old))
+        with patch("price_store.yf.download", side_effect=Exception("network")):
+            df = self.store.fetch_history("AAPL", 250)
+        self.assertEqual(len(df), 100)
+
+    def test_cancelled_fetch_does_not_persist(self):
+        """İptal edilen (bırakılmış) indirme depoya yazmamalı"""
+        import threading
+        cancel = threading.Event()
+
+        def download(ticker, **kwargs):
+            cancel.set()
+            return _yf_frame(make_ohlcv_df(100))
+
+        with patch("price_store.yf.download", side_effect=download):
+            self.assertIsNone(self.store.fetch_history("AAPL", 250, cancel=cancel))
+        self.assertFalse(os.path.exists(self.store._path("AAPL")))
+
+    def _stale(self, ticker):
+        old = time.time() - 7 * 3600
+        os.utime(self.store._path(ticker), (old, old))
+
+    def test_intraday_last_bar_update_is_not_rebase(self):
+        """Sadece son (seans içi) barın değişmesi artımlı birleştirme olmalı"""
+        self.store.save("AAPL", self.df.iloc[:90])
+        self._stale("AAPL")
+        update = self.df.iloc[88:].copy()
+        update.iloc[1, update.columns.get_loc("close")] *= 1.05
+        with patch("price_store.yf.download", return_value=_yf_frame(update)) as mock_dl:
+            df = self.store.fetch_history("AAPL", 250)
+        self.assertEqual(mock_dl.call_count, 1)
+        self.assertEqual(len(df), 100)
+        self.assertAlmostEqual(df["close"].iloc[89], update["close"].iloc[1])
+
+    def test_rescaled_overlap_triggers_full_download(self):
+        """Örtüşen bar yeniden ölçeklenmişse (bölünme) tam geçmiş indirilmeli"""
+        self.store.save("AAPL", self.df.iloc[:90])
+        self._stale("AAPL")
+        # 2:1 bölünme sonrası Yahoo tüm geçmişi yarıya ölçekler
+        rescaled = self.df.copy()
+        rescaled[["high", "low", "close"]] = rescaled[["high", "low", "close"]] / 2
+        calls = []
+
+        def download(ticker, **kwargs):
+            calls.append(kwargs)
+            frame = rescaled if "period" in kwargs else rescaled.loc[kwargs["start"]:]
+            return _yf_frame(frame)
+
+        with patch("price_store.yf.download", side_effect=download):
+            df = self.store.fetch_history("AAPL", 250)
+
+        self.assertEqual(["start" in calls[0], "period" in calls[1]], [True, True])
+        self.assertEqual(len(df), 100)
+        np.testing.assert_allclose(df["close"].to_numpy(), rescaled["close"].to_numpy())
+
+    def test_special_characters_in_ticker(self):
+        """GC=F, DX-Y.NYB gibi semboller güvenli dosya adına çevrilmeli"""
+        self.store.save("GC=F", self.df)
+        self.assertIsNotNone(self.store.load("GC=F"))
+        self.assertNotIn("=", os.path.basename(self.store._path("GC=F")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,7 +8,12 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import unittest
-from scorer import ScoreCalculator, select_top_stocks, generate_recommendation_text, determine_rating, find_strongest_level
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+import config
+from scorer import (ScoreCalculator, select_top_stocks, generate_recommendation_text, determine_rating,
+                    find_strongest_level, correlation_matrix, diversified_top_k)
 
 
 class TestScoreCalculator(unittest.TestCase):
@@ -147,6 +152,34 @@ class TestSelectTopStocks(unittest.TestCase):
         self.assertEqual(stock["signals"], ["RSI_BUY"])
 
 
+    def test_registry_reuses_candidates(self):
+        """Kayıt verilirse aynı hisse ikinci kez skorlanmamalı"""
+        from unittest.mock import patch
+        from technical_analyzer import AnalysisRegistry
+        import scorer
+        registry = AnalysisRegistry()
+        results = [self._make_result("AAPL", 70), self._make_result("MSFT", 65)]
+        first = select_top_stocks(results, {}, max_count=5, registry=registry)
+        with patch.object(scorer, "build_candidate") as mock_build:
+            second = select_top_stocks(results, {}, max_count=5, registry=registry)
+        mock_build.assert_not_called()
+        self.assertEqual([s["ticker"] for s in first], [s["ticker"] for s in second])
+        self.assertEqual(registry.stats()["candidate_hits"], 2)
+
+    def test_registry_candidates_keyed_by_data_timestamp(self):
+        """Aynı hissenin yeni bar içeren sonucu eski aday kaydını kullanmamalı"""
+        from technical_analyzer import AnalysisRegistry
+        registry = AnalysisRegistry()
+        index = pd.date_range("2024-01-01", periods=3)
+        old = self._make_result("AAPL", 70)
+        old["dataframe"] = pd.DataFrame({"close": [1.0, 2.0]}, index=index[:2])
+        new = self._make_result("AAPL", 70)
+        new["dataframe"] = pd.DataFrame({"close": [1.0, 2.0, 3.0]}, index=index)
+        select_top_stocks([old], {}, max_count=5, registry=registry)
+        select_top_stocks([new], {}, max_count=5, registry=registry)
+        self.assertEqual(registry.stats()["candidate_hits"], 0)
+        self.assertEqual(registry.stats()["candidate_misses"], 2)
+
 class TestGenerateRecommendationText(unittest.TestCase):
     """generate_recommendation_text() fonksiyon testleri"""
 
@@ -325,5 +358,74 @@ class TestFindStrongestLevel(unittest.TestCase):
         self.assertEqual(result["strength"], 2)
 
 
+class TestDiversifiedSelection(unittest.TestCase):
+    """Korelasyon çeşitlendirmeli seçim testleri"""
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        index = pd.date_range("2024-01-01", periods=120, freq="B")
+        base = rng.normal(0, 0.01, size=(120, 3))
+        self.closes = {
+            "A": 100 * np.cumprod(1 + base[:, 0]),
+            # B, A'nın neredeyse aynısı
+            "B": 100 * np.cumprod(1 + base[:, 0] + rng.normal(0, 0.001, 120)),
+            "C": 100 * np.cumprod(1 + base[:, 1]),
+            "D": 100 * np.cumprod(1 + base[:, 2]),
+        }
+        self.index = index
+
+    def _candidate(self, ticker, score, with_data=True):
+        df = pd.DataFrame({"close": self.closes[ticker]}, index=self.index) if with_data else None
+        return {"ticker": ticker, "score": score, "reward_risk_ratio": 2.0, "dataframe": df}
+
+    def test_correlation_matrix_detects_duplicates(self):
+        """Aynı hareket eden hisselerin korelasyonu yüksek olmalı"""
+        candidates = [self._candidate(t, 60) for t in "ABCD"]
+        corr = correlation_matrix(candidates, window=63)
+        self.assertEqual(corr.shape, (4, 4))
+        self.assertGreater(corr[0, 1], 0.9)
+        self.assertLess(abs(corr[0, 2]), 0.5)
+
+    def test_correlated_candidate_skipped(self):
+        """Seçilmiş hisseyle yüksek korelasyonlu aday alternatif varken atlanmalı"""
+        candidates = [self._candidate("A", 80), self._candidate("B", 78),
+                      self._candidate("C", 70), self._candidate("D", 65)]
+        selected = diversified_top_k(candidates, 3, threshold=0.8, penalty=50)
+        self.assertEqual([c["ticker"] for c in selected], ["A", "C", "D"])
+
+    def test_fills_count_when_only_correlated_left(self):
+        """Alternatif kalmadığında korelasyonlu aday yine seçilebilmeli"""
+        candidates = [self._candidate("A", 80), self._candidate("B", 78), self._candidate("C", 70)]
+        selected = diversified_top_k(candidates, 3, threshold=0.8, penalty=50)
+        self.assertEqual([c["ticker"] for c in selected], ["A", "C", "B"])
+
+    def test_without_price_data_keeps_ranking(self):
+        """Fiyat verisi yoksa sıralama değişmemeli"""
+        candidates = [self._candidate(t, s, with_data=False) for t, s in zip("ABCD", [80, 78, 70, 65])]
+        selected = diversified_top_k(candidates, 3)
+        self.assertEqual([c["ticker"] for c in selected], ["A", "B", "C"])
+
+    def test_already_selected_seed_penalty(self):
+        """Önceden seçilmiş hisseyle korelasyonlu aday tamamlama turunda cezalandırılmalı"""
+        candidates = [self._candidate("B", 78), self._candidate("C", 70)]
+        selected = diversified_top_k(candidates, 1, threshold=0.8, penalty=50,
+                                     selected=[self._candidate("A", 80)])
+        self.assertEqual([c["ticker"] for c in selected], ["C"])
+
+    def test_shortage_top_up_diversifies_against_selected(self):
+        """Eksik tamamlama: kalan havuzdan ilk seçimdekiyle aynı hareket eden hisse alınmamalı"""
+        first = diversified_top_k([self._candidate("A", 80), self._candidate("D", 65)], 2)
+        remaining = [
+            {"ticker": t, "score": s, "skip": False, "current_price": 100.0, "atr": 2.0,
+             "dataframe": pd.DataFrame({"close": self.closes[t]}, index=self.index)}
+            for t, s in [("B", 72), ("C", 70)]
+        ]
+        with patch.object(config, "DIVERSIFY_SELECTION", True):
+            top_up = select_top_stocks(remaining, {}, max_count=1, selected=first)
+            unseeded = select_top_stocks(remaining, {}, max_count=1)
+        self.assertEqual([c["ticker"] for c in top_up], ["C"])
+        self.assertEqual([c["ticker"] for c in unseeded], ["B"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,103 @@
+# ============================================================
+# tests/test_stage_scheduler.py — Aşama Zamanlayıcı Testleri
+# ============================================================
+# Kapsam: Bağımlılık sırası, paralellik, hata yönetimi, zamanlama
+# ============================================================
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import pytest
+
+from stage_scheduler import StageScheduler
+
+
+@pytest.mark.unit
+class TestStageScheduler(unittest.TestCase):
+    """StageScheduler testleri"""
+
+    def test_dependency_results_passed(self):
+        """Aşama, bağımlılıklarının sonuçlarını almalı"""
+        sched = StageScheduler()
+        sched.add("a", lambda inp: 2)
+        sched.add("b", lambda inp: 3)
+        sched.add("c", lambda inp: inp["a"] * inp["b"], deps=["a", "b"])
+        results = sched.run()
+        self.assertEqual(results["c"], 6)
+
+    def test_independent_stages_run_concurrently(self):
+        """Bağımsız aşamalar paralel çalışmalı"""
+        sched = StageScheduler(max_workers=4)
+        for name in ["news", "commodities", "dxy", "holidays"]:
+            sched.add(name, lambda inp: time.sleep(0.2))
+        start = time.perf_counter()
+        sched.run()
+        self.assertLess(time.perf_counter() - start, 0.6)
+
+    def test_dependent_starts_after_dependencies(self):
+        """Bağımlı aşama, bağımlılıkları bittikten sonra başlamalı"""
+        sched = StageScheduler()
+        sched.add("a", lambda inp: time.sleep(0.05))
+        sched.add("b", lambda inp: None, deps=["a"])
+        sched.run()
+        self.assertGreaterEqual(sched.stages["b"].started_at, sched.stages["a"].finished_at)
+
+    def test_failed_stage_uses_default(self):
+        """Hata veren aşama default sonuç üretmeli, bağımlılar çalışmalı"""
+        sched = StageScheduler()
+
+        def boom(inp):
+            raise RuntimeError("api down")
+
+        sched.add("news", boom, default={})
+        sched.add("sectors", lambda inp: len(inp["news"]), deps=["news"])
+        results = sched.run()
+        self.assertEqual(results["news"], {})
+        self.assertEqual(results["sectors"], 0)
+        self.assertIsNotNone(sched.stages["news"].error)
+
+    def test_unknown_dependency_rejected(self):
+        """Tanımsız bağımlılık hata vermeli"""
+        sched = StageScheduler()
+        with self.assertRaises(ValueError):
+            sched.add("b", lambda inp: None, deps=["missing"])
+
+    def test_timings_and_critical_path(self):
+        """Her aşamanın zamanları kaydedilmeli ve kritik yol bulunmalı"""
+        sched = StageScheduler()
+        sched.add("fast", lambda inp: None)
+        sched.add("slow", lambda inp: time.sleep(0.1))
+        sched.add("final", lambda inp: None, deps=["fast", "slow"])
+        sched.run()
+        for row in sched.timings():
+            self.assertIsNotNone(row["started_at"])
+            self.assertIsNotNone(row["finished_at"])
+        self.assertEqual(sched.critical_path(), ["slow", "final"])
+
+
+@pytest.mark.unit
+class TestAnalysisPipeline(unittest.TestCase):
+    """main_bot.build_analysis_pipeline() grafik yapısı"""
+
+    def test_normal_mode_graph(self):
+        """Normal modda teknik analiz sadece sektörlere bağlı olmalı"""
+        from main_bot import build_analysis_pipeline
+        stages = build_analysis_pipeline(quick=False).stages
+        for name in ["news", "commodities", "dxy", "holidays"]:
+            self.assertEqual(stages[name].deps, [])
+        self.assertEqual(stages["technical"].deps, ["sectors"])
+
+    def test_quick_mode_technical_has_no_deps(self):
+        """Quick modda teknik analiz hiçbir aşamayı beklememeli"""
+        from main_bot import build_analysis_pipeline
+        stages = build_analysis_pipeline(quick=True).stages
+        self.assertEqual(stages["technical"].deps, [])
+        self.assertNotIn("sectors", stages)
+
+
+if __name__ == "__main__":
+    unittest.main()
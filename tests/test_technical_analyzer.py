@@ -499,5 +499,384 @@ class TestAnalyzeSingleStockFallback(unittest.TestCase):
                 self.assertLessEqual(score, 100)
 
 
+# ─────────────────────────────────────────────
+# Tek geçişli gösterge çekirdeği testleri
+# ─────────────────────────────────────────────
+
+@pytest.mark.unit
+class TestCalculateIndicators(unittest.TestCase):
+    """TechnicalAnalyzer.calculate_indicators() eski fonksiyonlarla eşlik testleri"""
+
+    @staticmethod
+    def _legacy(df):
+        import config
+        close = df["close"]
+        macd = TechnicalAnalyzer.calculate_macd(close)
+        bollinger = TechnicalAnalyzer.calculate_bollinger_bands(close, period=config.BOLLINGER_PERIOD)
+        fibonacci = TechnicalAnalyzer.calculate_fibonacci(df, lookback=config.FIBONACCI_LOOKBACK)
+        trend = TechnicalAnalyzer.analyze_trend(df)
+        breakout = TechnicalAnalyzer.detect_breakout(df, fibonacci, float(close.iloc[-1]))
+        return {
+            "rsi": TechnicalAnalyzer.calculate_rsi(close, period=config.RSI_PERIOD),
+            "macd_line": macd["macd_line"],
+            "signal_line": macd["signal_line"],
+            "macd_histogram": macd["histogram"],
+            "bollinger_upper": bollinger["upper_band"],
+            "bollinger_middle": bollinger["middle_band"],
+            "bollinger_lower": bollinger["lower_band"],
+            "bollinger_position": bollinger["position"],
+            "sma_short": TechnicalAnalyzer.calculate_sma(close, config.SMA_SHORT),
+            "sma_long": TechnicalAnalyzer.calculate_sma(close, config.SMA_LONG),
+            "momentum_pct": TechnicalAnalyzer.calculate_momentum(close, period=config.MOMENTUM_PERIOD),
+            "atr": TechnicalAnalyzer.calculate_atr(df),
+            "fibonacci": fibonacci,
+            "trend": trend["trend"],
+            "trend_strength": trend["strength"],
+            "volume_surge": breakout["volume_surge"],
+        }
+
+    def test_matches_legacy_functions(self):
+        """Farklı uzunluklarda tüm değerler birebir eşleşmeli"""
+        for n, seed in [(20, 1), (25, 2), (30, 3), (70, 4), (100, 5), (250, 6)]:
+            df = make_ohlcv_df(n, seed=seed)
+            with self.subTest(bars=n):
+                self.assertEqual(TechnicalAnalyzer.calculate_indicators(df), self._legacy(df))
+
+    def test_flat_prices(self):
+        """Sabit fiyatta SMA/trend pandas ile aynı olmalı"""
+        df = make_ohlcv_df(120).assign(close=42.0, high=42.0, low=42.0)
+        result = TechnicalAnalyzer.calculate_indicators(df)
+        self.assertEqual(result, self._legacy(df))
+        self.assertEqual(result["trend"], "Nötr")
+        self.assertEqual(result["rsi"], 0.0)
+
+    def test_volume_surge_detected(self):
+        """Son bar hacmi 20 günlük ortalamanın 1.5 katını aşarsa işaretlenmeli"""
+        df = make_ohlcv_df(100)
+        df.iloc[-1, df.columns.get_loc("volume")] = df["volume"].mean() * 5
+        self.assertTrue(TechnicalAnalyzer.calculate_indicators(df)["volume_surge"])
+
+    def test_analyze_single_stock_uses_kernel(self):
+        """analyze_single_stock ayrı gösterge fonksiyonlarını çağırmamalı"""
+        from unittest.mock import patch
+        df = make_ohlcv_df(250)
+        with patch.object(TechnicalAnalyzer, "calculate_macd") as mock_macd, \
+             patch.object(TechnicalAnalyzer, "analyze_trend") as mock_trend:
+            result = TechnicalAnalyzer.analyze_single_stock("TEST", data={"df": df, "source": "historical"})
+        mock_macd.assert_not_called()
+        mock_trend.assert_not_called()
+        self.assertFalse(result["skip"])
+
+# ─────────────────────────────────────────────
+# Vektörel skor / sinyal testleri
+# ─────────────────────────────────────────────
+
+@pytest.mark.unit
+class TestVectorizedScoring(unittest.TestCase):
+    """calculate_technical_scores / generate_signal_masks skaler eşlik testleri"""
+
+    def setUp(self):
+        from indicator_engine import BOLLINGER_POSITION_CODES
+        self.codes = BOLLINGER_POSITION_CODES
+        rng = np.random.default_rng(17)
+        n = 5000
+        # Eşik değerleri ve 0/NaN özellikle karıştırılır
+        self.rsi = rng.choice([0.0, 34.9, 35.0, 39.9, 40.0, 60.0, 60.1, 65.0, 65.1, np.nan, 50.0], n)
+        self.rsi = np.where(rng.random(n) < 0.5, rng.uniform(0, 100, n).round(1), self.rsi)
+        self.hist = rng.choice([-0.5, 0.0, 0.3, np.nan], n)
+        self.position = rng.choice(list(self.codes), n)
+        self.price = rng.choice([0.0, 100.0, 101.0, 99.0], n)
+        self.sma20 = rng.choice([0.0, 100.0, 98.0, 102.0, np.nan], n)
+        self.sma50 = rng.choice([0.0, 100.0, 95.0, 105.0], n)
+        self.momentum = rng.choice([0.0, 5.0, 5.1, -5.1, 10.0, 10.5, -10.0, -10.5, 0.2, -0.2, np.nan], n)
+
+    def _scalar_inputs(self, i):
+        macd = {"histogram": self.hist[i]}
+        bollinger = {"position": self.position[i]}
+        return (self.rsi[i], macd, bollinger, self.sma20[i], self.sma50[i], self.momentum[i], self.price[i])
+
+    def _vector_inputs(self):
+        codes = np.array([self.codes[p] for p in self.position])
+        return (self.rsi, self.hist, codes, self.sma20, self.sma50, self.momentum, self.price)
+
+    def test_scores_match_scalar(self):
+        """Skor vektörü skaler fonksiyonla birebir aynı olmalı"""
+        scores = TechnicalAnalyzer.calculate_technical_scores(*self._vector_inputs())
+        for i in range(len(scores)):
+            self.assertEqual(scores[i], TechnicalAnalyzer.calculate_technical_score(*self._scalar_inputs(i)))
+
+    def test_signals_match_scalar(self):
+        """Bit maskeleri skaler sinyal listesine birebir çevrilmeli"""
+        masks = TechnicalAnalyzer.generate_signal_masks(*self._vector_inputs())
+        for i in range(len(masks)):
+            expected = TechnicalAnalyzer.generate_signals(*self._scalar_inputs(i))
+            decoded = TechnicalAnalyzer.signals_from_mask(masks[i], self.rsi[i], self.momentum[i])
+            self.assertEqual(decoded, expected)
+
+    def test_broadcasts_2d(self):
+        """Tarih × hisse panelleri de skorlanabilmeli"""
+        rsi = np.full((3, 4), 30.0)
+        scores = TechnicalAnalyzer.calculate_technical_scores(rsi, 0.1, 0, 100, 95, 2.0, 101)
+        self.assertEqual(scores.shape, (3, 4))
+        self.assertTrue((scores == TechnicalAnalyzer.calculate_technical_score(
+            30.0, {"histogram": 0.1}, {"position": "orta"}, 100, 95, 2.0, 101)).all())
+
+# ─────────────────────────────────────────────
+# Toplu veri indirme testleri
+# ─────────────────────────────────────────────
+
+def _make_bulk_download(tickers, n=60):
+    """yfinance group_by='ticker' formatında MultiIndex DataFrame üret."""
+    frames = {}
+    for i, ticker in enumerate(tickers):
+        df = make_ohlcv_df(n, seed=i)
+        df.columns = [c.capitalize() for c in df.columns]
+        frames[ticker] = df
+    return pd.concat(frames, axis=1)
+
+
+@pytest.mark.unit
+class TestGetBulkStockData(unittest.TestCase):
+    """TechnicalAnalyzer.get_bulk_stock_data() testleri"""
+
+    def test_splits_into_normalized_frames(self):
+        """Her hisse için lower-case close/high/low/volume frame dönmeli"""
+        from unittest.mock import patch
+        raw = _make_bulk_download(["AAA", "BBB"])
+        with patch("technical_analyzer.yf.download", return_value=raw):
+            bulk = TechnicalAnalyzer.get_bulk_stock_data(["AAA", "BBB"])
+        self.assertEqual(set(bulk["data"].keys()), {"AAA", "BBB"})
+        for item in bulk["data"].values():
+            for col in ["close", "high", "low", "volume"]:
+                self.assertIn(col, item["df"].columns)
+            self.assertEqual(item["source"], "historical")
+
+    def test_missing_ticker_reported_as_failed(self):
+        """Veri dönmeyen hisse failed içinde raporlanmalı, diğerleri etkilenmemeli"""
+        from unittest.mock import patch
+        raw = _make_bulk_download(["AAA"])
+        with patch("technical_analyzer.yf.download", return_value=raw):
+            bulk = TechnicalAnalyzer.get_bulk_stock_data(["AAA", "NOPE"])
+        self.assertIn("AAA", bulk["data"])
+        self.assertIn("NOPE", bulk["failed"])
+
+    def test_chunk_error_does_not_fail_batch(self):
+        """Bir grubun indirme hatası diğer grupları etkilememeli"""
+        from unittest.mock import patch
+        raw = _make_bulk_download(["BBB"])
+        with patch("technical_analyzer.yf.download",
+                   side_effect=[Exception("network"), raw]):
+            bulk = TechnicalAnalyzer.get_bulk_stock_data(["AAA", "BBB"], chunk_size=1)
+        self.assertIn("AAA", bulk["failed"])
+        self.assertIn("BBB", bulk["data"])
+
+    def test_price_store_avoids_redownload(self):
+        """Depoda güncel veri varsa ikinci toplu çağrı ağa çıkmamalı"""
+        from unittest.mock import patch
+        raw = _make_bulk_download(["AAA", "BBB"])
+        with patch("technical_analyzer.yf.download", return_value=raw):
+            TechnicalAnalyzer.get_bulk_stock_data(["AAA", "BBB"])
+        with patch("technical_analyzer.yf.download") as mock_dl:
+            bulk = TechnicalAnalyzer.get_bulk_stock_data(["AAA", "BBB"])
+            mock_dl.assert_not_called()
+        self.assertEqual(set(bulk["data"].keys()), {"AAA", "BBB"})
+
+    def test_price_store_rebase_redownloads_full_history(self):
+        """Artımlı indirmede yeniden ölçeklenmiş geçmiş tam indirmeyle onarılmalı"""
+        from unittest.mock import patch
+        import time
+        from price_store import get_price_store
+        raw = _make_bulk_download(["AAA", "BBB"])
+        with patch("technical_analyzer.yf.download", return_value=raw):
+            TechnicalAnalyzer.get_bulk_stock_data(["AAA", "BBB"])
+        store = get_price_store()
+        old = time.time() - 7 * 3600
+        for ticker in ["AAA", "BBB"]:
+            os.utime(store._path(ticker), (old, old))
+
+        # AAA bölünme ile yarıya ölçeklenir, BBB değişmez
+        rescaled = raw.copy()
+        for col in ["Close", "High", "Low"]:
+            rescaled[("AAA", col)] = rescaled[("AAA", col)] / 2
+        calls = []
+
+        def download(tickers, **kwargs):
+            calls.append((list(tickers), kwargs))
+            if "start" in kwargs:
+                return rescaled.loc[kwargs["start"]:]
+            return rescaled[["AAA"]]
+
+        with patch("technical_analyzer.yf.download", side_effect=download):
+            bulk = TechnicalAnalyzer.get_bulk_stock_data(["AAA", "BBB"])
+
+        self.assertEqual(calls[-1][0], ["AAA"])
+        self.assertIn("period", calls[-1][1])
+        np.testing.assert_allclose(bulk["data"]["AAA"]["df"]["close"].to_numpy()[-5:],
+                                   rescaled[("AAA", "Close")].to_numpy()[-5:])
+        self.assertIn("BBB", bulk["data"])
+
+    def test_prefetched_data_skips_download(self):
+        """analyze_single_stock verilen veriyi kullanmalı, tekrar indirmemeli"""
+        from unittest.mock import patch
+        data = {"df": make_ohlcv_df(250), "source": "historical"}
+        with patch.object(TechnicalAnalyzer, "get_stock_data") as mock_get:
+            result = TechnicalAnalyzer.analyze_single_stock("AAA", data=data)
+            mock_get.assert_not_called()
+        self.assertFalse(result["skip"])
+
+
+@pytest.mark.unit
+class TestAnalyzeAllStocksConcurrent(unittest.TestCase):
+    """analyze_all_stocks() paralel çalışma testleri"""
+
+    def setUp(self):
+        from unittest.mock import patch
+        patcher = patch.object(TechnicalAnalyzer, "get_bulk_stock_data",
+                               return_value={"data": {}, "failed": {}})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _fake_analyze(ticker, data=None, cancel=None):
+        import time
+        # Sondaki hisseler önce bitsin → sıra korunuyor mu?
+        time.sleep(0.05 if ticker.endswith("0") else 0.01)
+        return {"ticker": ticker, "skip": False, "score": 50.0, "source": "test"}
+
+    def test_results_keep_input_order(self):
+        """Paralel modda sonuç sırası girdi sırası olmalı"""
+        from unittest.mock import patch
+        from technical_analyzer import analyze_all_stocks
+        tickers = [f"T{i}" for i in range(12)]
+        with patch.object(TechnicalAnalyzer, "analyze_single_stock", side_effect=self._fake_analyze):
+            results = analyze_all_stocks(tickers, max_workers=4)
+        self.assertEqual([r["ticker"] for r in results], tickers)
+
+    def test_parallel_faster_than_sequential(self):
+        """I/O bekleyen hisseler paralelde daha hızlı bitmeli"""
+        import time
+        from unittest.mock import patch
+        from technical_analyzer import analyze_all_stocks
+
+        def slow(ticker, data=None, cancel=None):
+            time.sleep(0.05)
+            return {"ticker": ticker, "skip": False, "score": 50.0}
+
+        tickers = [f"T{i}" for i in range(10)]
+        with patch.object(TechnicalAnalyzer, "analyze_single_stock", side_effect=slow):
+            start = time.perf_counter()
+            analyze_all_stocks(tickers, max_workers=10)
+            elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, 0.4)
+
+    def test_timeout_marks_ticker_skipped(self):
+        """Zaman aşımına uğrayan hisse skip olmalı, diğerleri etkilenmemeli"""
+        import time
+        from unittest.mock import patch
+        from technical_analyzer import analyze_all_stocks
+
+        def maybe_hang(ticker, data=None, cancel=None):
+            time.sleep(1.5 if ticker == "HANG" else 0.0)
+            return {"ticker": ticker, "skip": False, "score": 50.0}
+
+        with patch.object(TechnicalAnalyzer, "analyze_single_stock", side_effect=maybe_hang):
+            results = analyze_all_stocks(["OK1", "HANG", "OK2"], max_workers=3, timeout=0.2)
+        self.assertFalse(results[0]["skip"])
+        self.assertTrue(results[1]["skip"])
+        self.assertIn("Zaman aşımı", results[1]["reason"])
+        self.assertFalse(results[2]["skip"])
+
+    def test_stage_deadline_when_all_workers_hang(self):
+        """Tüm işçiler takılsa bile kuyruktakiler dahil aşama süresi sınırlı olmalı"""
+        import threading
+        import time
+        from unittest.mock import patch
+        from technical_analyzer import analyze_all_stocks
+        release = threading.Event()
+        cancels = []
+
+        def hang(ticker, data=None, cancel=None):
+            cancels.append(cancel)
+            release.wait(5)
+            return {"ticker": ticker, "skip": False, "score": 50.0}
+
+        try:
+            with patch.object(TechnicalAnalyzer, "analyze_single_stock", side_effect=hang):
+                start = time.perf_counter()
+                results = analyze_all_stocks([f"T{i}" for i in range(6)], max_workers=2, timeout=0.2)
+                elapsed = time.perf_counter() - start
+        finally:
+            release.set()
+        self.assertLess(elapsed, 1.5)
+        self.assertTrue(all(r["skip"] for r in results))
+        self.assertEqual(len(cancels), 2)
+        self.assertTrue(all(c.is_set() for c in cancels))
+
+    def test_worker_exception_becomes_skip(self):
+        """İşçide oluşan hata skip sonucu olarak dönmeli"""
+        from unittest.mock import patch
+        from technical_analyzer import analyze_all_stocks
+        with patch.object(TechnicalAnalyzer, "analyze_single_stock", side_effect=RuntimeError("boom")):
+            results = analyze_all_stocks(["A", "B"], max_workers=2)
+        self.assertTrue(all(r["skip"] for r in results))
+
+
+@pytest.mark.unit
+class TestAnalysisRegistry(unittest.TestCase):
+    """AnalysisRegistry çalıştırma kapsamlı kayıt testleri"""
+
+    def test_second_pass_served_from_registry(self):
+        """Aynı kayıtla ikinci çağrı indirme/analiz yapmamalı"""
+        from unittest.mock import patch
+        from technical_analyzer import analyze_all_stocks, AnalysisRegistry
+        registry = AnalysisRegistry()
+        fake = lambda ticker, data=None, cancel=None: {"ticker": ticker, "skip": False, "score": 55.0}
+        with patch.object(TechnicalAnalyzer, "get_bulk_stock_data",
+                          return_value={"data": {}, "failed": {}}) as mock_bulk, \
+             patch.object(TechnicalAnalyzer, "analyze_single_stock", side_effect=fake) as mock_analyze:
+            analyze_all_stocks(["A", "B"], max_workers=2, registry=registry)
+            results = analyze_all_stocks(["B", "A", "C"], max_workers=2, registry=registry)
+
+        self.assertEqual([r["ticker"] for r in results], ["B", "A", "C"])
+        self.assertEqual(mock_analyze.call_count, 3)
+        self.assertEqual(mock_bulk.call_args_list[-1].args[0], ["C"])
+        stats = registry.stats()
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 3)
+
+    def test_timestamp_mismatch_is_miss(self):
+        """Farklı veri zaman damgası istenirse kayıt kullanılmamalı"""
+        from technical_analyzer import AnalysisRegistry
+        registry = AnalysisRegistry()
+        df = pd.DataFrame({"close": [1.0, 2.0]}, index=pd.date_range("2024-01-01", periods=2))
+        registry.put("X", {"ticker": "X", "dataframe": df})
+        self.assertIsNotNone(registry.get("X", df.index[-1]))
+        self.assertIsNone(registry.get("X", pd.Timestamp("2023-12-31")))
+        self.assertIsNone(registry.get("X", None))
+
+    def test_refreshed_store_invalidates_registry(self):
+        """Depo yeni barla yenilenince kayıtlı eski analiz yeniden hesaplanmalı"""
+        from unittest.mock import patch
+        from technical_analyzer import analyze_all_stocks, AnalysisRegistry
+        from price_store import get_price_store
+        store = get_price_store()
+        df = make_ohlcv_df(60)
+        store.save("X", df.iloc[:-1])
+        fake = lambda ticker, data=None, cancel=None: {"ticker": ticker, "skip": False, "score": 55.0,
+                                                       "dataframe": store.load(ticker)}
+        registry = AnalysisRegistry()
+        with patch.object(TechnicalAnalyzer, "get_bulk_stock_data",
+                          return_value={"data": {}, "failed": {}}), \
+             patch.object(TechnicalAnalyzer, "analyze_single_stock", side_effect=fake) as mock_analyze:
+            analyze_all_stocks(["X"], max_workers=1, registry=registry)
+            analyze_all_stocks(["X"], max_workers=1, registry=registry)
+            self.assertEqual(mock_analyze.call_count, 1)
+
+            store.save("X", df)
+            results = analyze_all_stocks(["X"], max_workers=1, registry=registry)
+        self.assertEqual(mock_analyze.call_count, 2)
+        self.assertEqual(results[0]["dataframe"].index[-1], df.index[-1])
+
+
 if __name__ == "__main__":
     unittest.main()